@@ -1,6 +1,14 @@
+import asyncio
+import contextvars
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any
 
 import anthropic
+from prompt_usage import PromptUsage
+from search_tools import add_sources, current_sources
+from tool_loop import ToolLoop
 
 
 class AIGenerator:
@@ -17,7 +25,7 @@ Available Tools:
    - Returns course title, course link, instructor, and complete lesson list with numbers and titles
 
 Tool Usage Guidelines:
-- **One tool use per query maximum**
+- Use as few tool calls as needed; search again only if the results so far cannot answer the question
 - Choose the appropriate tool based on the question type:
   - Content questions → search_course_content
   - Structure/outline questions → get_course_outline
@@ -40,17 +48,55 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        prompt_caching: bool = True,
+        tool_workers: int = 4,
+        max_tool_rounds: int = 3,
+        tool_deadline: float = 20.0,
+        input_token_budget: int = 30_000,
+    ):
+        """
+        Args:
+            api_key: Anthropic API key
+            model: Claude model name
+            prompt_caching: Whether to mark the tools, system prompt and
+                conversation history as a cacheable prompt prefix
+            tool_workers: Threads running the tool calls of one turn concurrently;
+                a call that misses its deadline holds its thread until it ends
+            max_tool_rounds: Maximum rounds of tool calls per query
+            tool_deadline: Seconds into a query after which no tool round starts
+            input_token_budget: Input tokens a query's requests may use in total
+                before Claude must answer from the tool results so far
+        """
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = model
+        self.prompt_caching = prompt_caching
+        self.max_tool_rounds = max_tool_rounds
+        self.tool_deadline = tool_deadline
+        self.input_token_budget = input_token_budget
+        self.usage = PromptUsage()
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=tool_workers, thread_name_prefix="tool-call"
+        )
 
         # Pre-build base API parameters
         self.base_params = {"model": self.model, "temperature": 0, "max_tokens": 800}
 
+        # The system prompt never changes, so it ends the cached prefix that
+        # starts with the tool definitions (tools come before system in a prompt)
+        system_block = {"type": "text", "text": self.SYSTEM_PROMPT}
+        if prompt_caching:
+            system_block["cache_control"] = {"type": "ephemeral"}
+        self.system = [system_block]
+
     def generate_response(
         self,
         query: str,
-        conversation_history: str | None = None,
+        conversation_history: list[dict[str, str]] | None = None,
         tools: list | None = None,
         tool_manager=None,
     ) -> str:
@@ -59,26 +105,145 @@ Provide only the direct answer to what was asked.
 
         Args:
             query: The user's question or request
-            conversation_history: Previous messages for context
+            conversation_history: Previous messages ({role, content} dicts)
             tools: Available tools the AI can use
             tool_manager: Manager to execute tools
 
         Returns:
             Generated response as string
         """
+        api_params = self._build_params(query, conversation_history, tools)
 
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history
-            else self.SYSTEM_PROMPT
-        )
+        # Get response from Claude
+        response = self._create(api_params)
+
+        # Handle tool execution if needed
+        if response.stop_reason == "tool_use" and tool_manager:
+            return self._handle_tool_execution(response, api_params, tool_manager)
+
+        # Return direct response
+        self.usage.record_query(0, "answered")
+        return response.content[0].text
+
+    async def agenerate_response(
+        self,
+        query: str,
+        conversation_history: list[dict[str, str]] | None = None,
+        tools: list | None = None,
+        tool_manager=None,
+    ) -> str:
+        """
+        Generate an AI response without blocking the event loop.
+
+        Same as generate_response, but uses the async Anthropic client and runs
+        tools through tool_manager.aexecute_tool.
+        """
+        loop = self._tool_loop(self._build_params(query, conversation_history, tools))
+        while True:
+            response = await self._acreate(loop.next_params())
+            if not (loop.record_response(response) and tool_manager):
+                break
+            loop.add_round(
+                response,
+                await self._arun_tools(response, tool_manager, loop.remaining()),
+            )
+
+        self.usage.record_query(loop.rounds, loop.finish())
+        return response.content[0].text
+
+    async def astream_response(
+        self,
+        query: str,
+        conversation_history: list[dict[str, str]] | None = None,
+        tools: list | None = None,
+        tool_manager=None,
+    ) -> AsyncIterator[tuple[str, str | None]]:
+        """
+        Stream an AI response as it is generated.
+
+        Yields ("text", delta) events for answer text as the API streams it.
+        When Claude uses tools, the tools run through tool_manager.aexecute_tool
+        once the response is complete, a ("tool_results", None) event is
+        yielded, and the next response is streamed, for up to max_tool_rounds
+        rounds as in generate_response.
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages ({role, content} dicts)
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+
+        Yields:
+            (event type, text) tuples
+        """
+        loop = self._tool_loop(self._build_params(query, conversation_history, tools))
+        while True:
+            started = time.perf_counter()
+            async with self.async_client.messages.stream(
+                **loop.next_params()
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield "text", text
+                response = await stream.get_final_message()
+            self.usage.record(response.usage, time.perf_counter() - started)
+
+            if not (loop.record_response(response) and tool_manager):
+                break
+            loop.add_round(
+                response,
+                await self._arun_tools(response, tool_manager, loop.remaining()),
+            )
+            yield "tool_results", None
+
+        self.usage.record_query(loop.rounds, loop.finish())
+
+    def _create(self, api_params: dict[str, Any]):
+        """Send a request and record its token usage and latency"""
+        started = time.perf_counter()
+        response = self.client.messages.create(**api_params)
+        self.usage.record(response.usage, time.perf_counter() - started)
+        return response
+
+    async def _acreate(self, api_params: dict[str, Any]):
+        """Send a request with the async client and record its usage and latency"""
+        started = time.perf_counter()
+        response = await self.async_client.messages.create(**api_params)
+        self.usage.record(response.usage, time.perf_counter() - started)
+        return response
+
+    def _build_params(
+        self,
+        query: str,
+        conversation_history: list[dict[str, str]] | None,
+        tools: list | None,
+    ) -> dict[str, Any]:
+        """
+        Build the API parameters for the first request of a query.
+
+        Tools, system prompt and history are laid out as a prefix that stays
+        the same across the requests of a query and the turns of a session;
+        only the new question follows the last cache breakpoint.
+        """
+        messages = [
+            {"role": message["role"], "content": message["content"]}
+            for message in conversation_history or []
+        ]
+        if messages and self.prompt_caching:
+            # Cache the history too, so the next turn only adds this exchange
+            messages[-1]["content"] = [
+                {
+                    "type": "text",
+                    "text": messages[-1]["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        messages.append({"role": "user", "content": query})
 
         # Prepare API call parameters efficiently
         api_params = {
             **self.base_params,
-            "messages": [{"role": "user", "content": query}],
-            "system": system_content,
+            "messages": messages,
+            "system": self.system,
         }
 
         # Add tools if available
@@ -86,21 +251,18 @@ Provide only the direct answer to what was asked.
             api_params["tools"] = tools
             api_params["tool_choice"] = {"type": "auto"}
 
-        # Get response from Claude
-        response = self.client.messages.create(**api_params)
-
-        # Handle tool execution if needed
-        if response.stop_reason == "tool_use" and tool_manager:
-            return self._handle_tool_execution(response, api_params, tool_manager)
-
-        # Return direct response
-        return response.content[0].text
+        return api_params
 
     def _handle_tool_execution(
         self, initial_response, base_params: dict[str, Any], tool_manager
     ):
         """
-        Handle execution of tool calls and get follow-up response.
+        Handle execution of tool calls and get follow-up responses.
+
+        Claude may call tools again after seeing the results, for up to
+        max_tool_rounds rounds, until tool_deadline seconds have passed, or
+        until the next request would likely exceed input_token_budget; the
+        last request then asks for an answer from the results gathered.
 
         Args:
             initial_response: The response containing tool use requests
@@ -110,39 +272,173 @@ Provide only the direct answer to what was asked.
         Returns:
             Final response text after tool execution
         """
-        # Start with existing messages
-        messages = base_params["messages"].copy()
+        loop = self._tool_loop(base_params)
+        response = initial_response
+        while loop.record_response(response):
+            # Execute all tool calls and collect results
+            loop.add_round(
+                response, self._run_tools(response, tool_manager, loop.remaining())
+            )
+            response = self._create(loop.next_params())
 
-        # Add AI's tool use response
-        messages.append({"role": "assistant", "content": initial_response.content})
+        self.usage.record_query(loop.rounds, loop.finish())
+        return response.content[0].text
 
-        # Execute all tool calls and collect results
-        tool_results = []
-        for content_block in initial_response.content:
-            if content_block.type == "tool_use":
-                tool_result = tool_manager.execute_tool(
-                    content_block.name, **content_block.input
-                )
+    def _tool_loop(self, api_params: dict[str, Any]) -> ToolLoop:
+        """Start the tool rounds of a query with the configured limits"""
+        return ToolLoop(
+            api_params,
+            self.max_tool_rounds,
+            self.tool_deadline,
+            self.input_token_budget,
+        )
 
-                tool_results.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": content_block.id,
-                        "content": tool_result,
-                    }
+    def _run_tools(
+        self, response, tool_manager, timeout: float | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Run a response's tool calls concurrently on the tool thread pool.
+
+        Each call runs in a copy of the caller's context and collects its
+        sources apart; they are added to the request's collector (see
+        ToolManager.collect_sources) only if the call finished in time. Calls
+        still running after timeout seconds are answered with an error
+        tool_result and their sources are dropped. Queued calls are cancelled,
+        but running ones can't be interrupted and keep their pool thread until
+        they end.
+
+        Returns:
+            tool_result blocks in the order of the tool_use blocks
+        """
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        started = time.perf_counter()
+        if len(tool_uses) == 1 and timeout is None:
+            timed = [self._timed_tool_call(tool_manager, tool_uses[0])]
+        else:
+            futures = [
+                self._tool_executor.submit(
+                    contextvars.copy_context().run,
+                    self._buffered_tool_call,
+                    tool_manager,
+                    block,
                 )
+                for block in tool_uses
+            ]
+            wait(futures, timeout)
+            timed = []
+            for future in futures:
+                if future.done():
+                    result, seconds, sources = future.result()
+                    if sources:
+                        add_sources(sources)
+                    timed.append((result, seconds))
+                else:
+                    future.cancel()
+                    timed.append((None, timeout))
+        return self._collect_tool_results(tool_uses, timed, started)
+
+    async def _arun_tools(
+        self, response, tool_manager, timeout: float | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Run a response's tool calls concurrently as asyncio tasks.
 
-        # Add tool results as single message
-        if tool_results:
-            messages.append({"role": "user", "content": tool_results})
+        Calls still running after timeout seconds are cancelled and answered
+        with an error tool_result.
 
-        # Prepare final API call without tools
-        final_params = {
-            **self.base_params,
-            "messages": messages,
-            "system": base_params["system"],
-        }
+        Returns:
+            tool_result blocks in the order of the tool_use blocks
+        """
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        started = time.perf_counter()
+        timed = await asyncio.gather(
+            *(
+                self._atimed_tool_call(tool_manager, block, timeout)
+                for block in tool_uses
+            )
+        )
+        return self._collect_tool_results(tool_uses, timed, started)
+
+    def _timed_tool_call(self, tool_manager, tool_use) -> tuple[str, float]:
+        """Execute a tool call, returning its result and duration"""
+        started = time.perf_counter()
+        result = tool_manager.execute_tool(tool_use.name, **tool_use.input)
+        return result, time.perf_counter() - started
+
+    def _buffered_tool_call(
+        self, tool_manager, tool_use
+    ) -> tuple[str, float, list | None]:
+        """
+        Execute a tool call on a pool thread, collecting its sources apart.
+
+        Runs in a copied context, so the call gets its own source list when
+        the request collects sources (None otherwise).
+
+        Returns:
+            The call's result, duration and sources
+        """
+        sources = [] if current_sources.get() is not None else None
+        current_sources.set(sources)
+        result, seconds = self._timed_tool_call(tool_manager, tool_use)
+        return result, seconds, sources
+
+    async def _atimed_tool_call(
+        self, tool_manager, tool_use, timeout: float | None = None
+    ) -> tuple[str | None, float]:
+        """
+        Execute a tool call asynchronously, returning its result and duration.
+
+        The result is None if the call did not finish within timeout seconds.
+        """
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                tool_manager.aexecute_tool(tool_use.name, **tool_use.input), timeout
+            )
+        except TimeoutError:
+            result = None
+        return result, time.perf_counter() - started
+
+    def _collect_tool_results(
+        self,
+        tool_uses: list,
+        timed: list[tuple[str | None, float]],
+        started: float,
+    ) -> list[dict[str, Any]]:
+        """
+        Build the tool_result blocks of a turn and log the tool timings.
+
+        A None result marks a call that timed out.
+        """
+        timed_out = any(result is None for result, _ in timed)
+        if len(tool_uses) > 1 or timed_out:
+            timings = ", ".join(
+                f"{tool_use.name} {seconds:.2f}s"
+                + (" (timed out)" if result is None else "")
+                for tool_use, (result, seconds) in zip(tool_uses, timed, strict=True)
+            )
+            print(
+                f"Ran {len(tool_uses)} tools in "
+                f"{time.perf_counter() - started:.2f}s ({timings})"
+            )
+        return [
+            (
+                self._tool_result(tool_use, result)
+                if result is not None
+                else self._tool_result(
+                    tool_use,
+                    f"Tool call timed out after {seconds:.1f}s",
+                    is_error=True,
+                )
+            )
+            for tool_use, (result, seconds) in zip(tool_uses, timed, strict=True)
+        ]
 
-        # Get final response
-        final_response = self.client.messages.create(**final_params)
-        return final_response.content[0].text
+    def _tool_result(
+        self, tool_use, result: str, is_error: bool = False
+    ) -> dict[str, Any]:
+        """Build the tool_result block answering a tool_use block"""
+        block = {"type": "tool_result", "tool_use_id": tool_use.id, "content": result}
+        if is_error:
+            block["is_error"] = True
+        return block
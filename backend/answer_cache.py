@@ -0,0 +1,157 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+import numpy as np
+from result_diversity import unit_rows
+
+
+class AnswerCache:
+    """
+    Thread-safe cache of answers keyed by question embedding.
+
+    A lookup returns the answer to the most similar cached question when its
+    cosine similarity reaches the threshold and whose scope is equal, so
+    questions that differ in a detail embeddings barely register (e.g. a
+    lesson number) never share an answer. Entries expire after ttl seconds
+    and the least recently used entry is evicted when the cache is full.
+    Answers are tagged with the index version they were generated against;
+    once the index changes, every older answer is dropped.
+    """
+
+    def __init__(self, max_size: int, threshold: float = 0.95, ttl: float = 3600.0):
+        """
+        Args:
+            max_size: Maximum number of cached answers
+            threshold: Minimum cosine similarity of a matching question
+            ttl: Seconds an answer stays valid
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._version = 0
+        self._ids = itertools.count()
+        # Entry id -> (unit question embedding, answer, sources, expiry time, scope)
+        self._entries: OrderedDict[
+            int, tuple[np.ndarray, str, list, float, Hashable]
+        ] = OrderedDict()
+        self._matrix: np.ndarray | None = None  # Stacked embeddings, rebuilt lazily
+        self._matrix_ids: list[int] = []
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, embedding: Any, version: int, scope: Hashable = None
+    ) -> tuple[str, list] | None:
+        """
+        Get the cached answer to the most similar question, if similar enough.
+
+        Args:
+            embedding: Question embedding
+            version: Current index version
+            scope: Details the question's answer must have been cached under
+
+        Returns:
+            (answer, sources), or None on a miss
+        """
+        with self._lock:
+            self._sync_version(version)
+            self._drop_expired()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries)
+                self._matrix = np.stack([self._entries[i][0] for i in self._matrix_ids])
+            similarity = self._matrix @ unit_rows(embedding)
+            for i, entry_id in enumerate(self._matrix_ids):
+                if self._entries[entry_id][4] != scope:
+                    similarity[i] = -np.inf
+            best = int(np.argmax(similarity))
+            if similarity[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entry_id = self._matrix_ids[best]
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            _, answer, sources, _, _ = self._entries[entry_id]
+            return answer, list(sources)
+
+    def put(
+        self,
+        embedding: Any,
+        answer: str,
+        sources: list,
+        version: int,
+        scope: Hashable = None,
+    ):
+        """
+        Cache an answer, evicting the least recently used entry when full.
+
+        Answers generated against an index version older than the latest seen
+        are discarded, since the index changed while they were generated.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._sync_version(version)
+            if version < self._version:
+                return
+            expires = time.monotonic() + self.ttl
+            self._entries[next(self._ids)] = (
+                unit_rows(embedding),
+                answer,
+                list(sources),
+                expires,
+                scope,
+            )
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def _sync_version(self, version: int):
+        """Drop every entry once a newer index version is seen"""
+        if version > self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._version = version
+            self._entries.clear()
+            self._matrix = None
+
+    def _drop_expired(self):
+        """Remove entries whose ttl has passed"""
+        now = time.monotonic()
+        expired = [i for i, entry in self._entries.items() if entry[3] <= now]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        if expired:
+            self._matrix = None
+
+    def stats(self) -> dict[str, Any]:
+        """Get hit/miss counters, hit rate, invalidations and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
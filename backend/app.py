@@ -1,11 +1,15 @@
+import asyncio
+import json
 import os
+import time
 import warnings
 
 from config import config
+from docs_watcher import DocsWatcher
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from rag_system import RAGSystem
@@ -30,6 +34,11 @@ app.add_middleware(
 
 # Initialize RAG system
 rag_system = RAGSystem(config)
+docs_watcher: DocsWatcher | None = None
+
+# Background startup progress, reported by /readyz
+startup_state = {"phase": "starting", "error": None}
+startup_task: asyncio.Task | None = None
 
 
 # Pydantic models for request/response
@@ -55,6 +64,18 @@ class CourseStats(BaseModel):
     course_titles: list[str]
 
 
+class IngestStatus(BaseModel):
+    """Response model for the docs watcher status"""
+
+    enabled: bool
+    running: bool = False
+    folder: str | None = None
+    queue_depth: int = 0
+    last_scan: str | None = None
+    last_indexed: dict[str, str] = {}  # File name -> ISO timestamp
+    last_error: str | None = None
+
+
 # API Endpoints
 
 
@@ -68,18 +89,67 @@ async def query_documents(request: QueryRequest):
             session_id = rag_system.session_manager.create_session()
 
         # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        answer, sources = await rag_system.aquery(request.query, session_id)
 
         return QueryResponse(answer=answer, sources=sources, session_id=session_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+def format_sse(event: str, data: dict) -> str:
+    """Format a server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/query/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Process a query and stream the response as server-sent events.
+
+    Events, in order: session ({session_id}), sources ({sources}) once the
+    search has run, token ({text}) per piece of the answer, then done
+    ({ttft_ms, total_ms}) or error ({detail}).
+    """
+    session_id = request.session_id
+    if not session_id:
+        session_id = rag_system.session_manager.create_session()
+
+    async def events():
+        started = time.perf_counter()
+        first_token = None
+        yield format_sse("session", {"session_id": session_id})
+        try:
+            async for event, payload in rag_system.astream_query(
+                request.query, session_id
+            ):
+                if event == "token":
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    yield format_sse("token", {"text": payload})
+                else:
+                    yield format_sse(event, {event: payload})
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+            return
+
+        finished = time.perf_counter()
+        ttft_ms = round(((first_token or finished) - started) * 1000, 1)
+        total_ms = round((finished - started) * 1000, 1)
+        print(f"Streamed query: first token {ttft_ms} ms, total {total_ms} ms")
+        yield format_sse("done", {"ttft_ms": ttft_ms, "total_ms": total_ms})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/courses", response_model=CourseStats)
 async def get_course_stats():
     """Get course analytics and statistics"""
     try:
-        analytics = rag_system.get_course_analytics()
+        analytics = await rag_system.aget_course_analytics()
         return CourseStats(
             total_courses=analytics["total_courses"],
             course_titles=analytics["course_titles"],
@@ -88,6 +158,23 @@ async def get_course_stats():
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get hit/miss counters of the embedding caches and prompt cache usage"""
+    try:
+        return await rag_system.aget_cache_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@app.get("/api/ingest/status", response_model=IngestStatus)
+async def get_ingest_status():
+    """Get the docs watcher's queue depth and last-indexed times"""
+    if not docs_watcher:
+        return IngestStatus(enabled=False)
+    return IngestStatus(enabled=True, **docs_watcher.status())
+
+
 @app.delete("/api/sessions/{session_id}")
 async def clear_session(session_id: str):
     """Clear a conversation session"""
@@ -98,11 +185,33 @@ async def clear_session(session_id: str):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Load initial documents on startup"""
-    docs_path = "../docs"
+@app.get("/healthz")
+async def healthz():
+    """Liveness check: the server is up and handling requests"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness check: the model is warm and initial documents are loaded"""
+    body = {"status": startup_state["phase"], "error": startup_state["error"]}
+    if startup_state["phase"] != "ready":
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+def initialize_rag_system(docs_path: str):
+    """Warm up the embedding model, load initial documents and start the watcher"""
+    startup_state["phase"] = "warming_up"
+    try:
+        rag_system.warmup()
+    except Exception as e:
+        print(f"Error warming up embedding model: {e}")
+        startup_state.update(phase="failed", error=str(e))
+        return
+
     if os.path.exists(docs_path):
+        startup_state["phase"] = "loading_documents"
         print("Loading initial documents...")
         try:
             courses, chunks = rag_system.add_course_folder(
@@ -111,6 +220,37 @@ async def startup_event():
             print(f"Loaded {courses} courses with {chunks} chunks")
         except Exception as e:
             print(f"Error loading documents: {e}")
+            startup_state.update(phase="failed", error=str(e))
+            return
+
+        if config.DOCS_WATCH:
+            global docs_watcher
+            docs_watcher = DocsWatcher(
+                rag_system,
+                docs_path,
+                config.DOCS_WATCH_INTERVAL,
+                config.DOCS_WATCH_DEBOUNCE,
+            )
+            docs_watcher.start()
+
+    startup_state["phase"] = "ready"
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize in the background so the server can respond immediately"""
+    global startup_task
+    startup_task = asyncio.create_task(
+        asyncio.to_thread(initialize_rag_system, "../docs")
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the docs watcher and the vector store's thread pool"""
+    if docs_watcher:
+        docs_watcher.stop()
+    rag_system.async_vector_store.shutdown(wait=False)
 
 
 # Custom static file handler with no-cache headers for development
@@ -0,0 +1,127 @@
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from models import Course
+from vector_store import SearchRequest, SearchResults, VectorStore
+
+T = TypeVar("T")
+
+
+class AsyncVectorStore:
+    """
+    Awaitable facade over VectorStore for request handlers.
+
+    ChromaDB queries and embedding calls block, so every call runs on a
+    dedicated thread pool of max_workers threads instead of the event loop.
+    The pool bounds how many searches run at once; further calls wait for a
+    free thread without holding up other requests.
+    """
+
+    def __init__(self, store: VectorStore, max_workers: int = 4):
+        """
+        Args:
+            store: Vector store to delegate to
+            max_workers: Threads running vector store calls concurrently
+        """
+        self.store = store
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vector-store"
+        )
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking call on the vector store's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def search(
+        self,
+        query: str,
+        course_name: str | None = None,
+        lesson_number: int | None = None,
+        limit: int | None = None,
+        mode: str | None = None,
+    ) -> SearchResults:
+        """Search course content (see VectorStore.search)"""
+        return await self._run(
+            self.store.search, query, course_name, lesson_number, limit, mode
+        )
+
+    async def search_many(
+        self,
+        requests: list[SearchRequest | tuple[str, str | None, int | None]],
+        limit: int | None = None,
+        mode: str | None = None,
+    ) -> list[SearchResults]:
+        """Run several searches with one embedding call (see VectorStore.search_many)"""
+        return await self._run(self.store.search_many, requests, limit, mode)
+
+    async def embed_query(self, text: str):
+        """Embed a query text (see VectorStore.embed_query)"""
+        return await self._run(self.store.embed_query, text)
+
+    async def resolve_course_name(self, course_name: str) -> str | None:
+        """Resolve a partial course name to a catalog title"""
+        return await self._run(self.store._resolve_course_name, course_name)
+
+    async def closest_course(self, embedding) -> str | None:
+        """Find the course title most similar to an embedded text"""
+        return await self._run(self.store.closest_course, embedding)
+
+    async def get_course(self, course_title: str) -> Course | None:
+        """Get a course with its lessons from the catalog"""
+        return await self._run(self.store.get_course, course_title)
+
+    async def get_course_link(self, course_title: str) -> str | None:
+        """Get the link of a course"""
+        return await self._run(self.store.get_course_link, course_title)
+
+    async def get_lesson_link(
+        self, course_title: str, lesson_number: int
+    ) -> str | None:
+        """Get the link of a lesson"""
+        return await self._run(self.store.get_lesson_link, course_title, lesson_number)
+
+    async def get_lesson_links(
+        self, lessons: list[tuple[str, int | None]]
+    ) -> list[str | None]:
+        """
+        Get the links of several lessons in one call.
+
+        The links come from the in-memory catalog cache, so they are looked up
+        together rather than each taking its own trip to the thread pool.
+
+        Args:
+            lessons: (course title, lesson number) pairs; a None lesson number
+                gets a None link
+
+        Returns:
+            Lesson links in the order of lessons
+        """
+        return await self._run(self._lesson_links, lessons)
+
+    def _lesson_links(self, lessons: list[tuple[str, int | None]]) -> list[str | None]:
+        return [
+            None if number is None else self.store.get_lesson_link(title, number)
+            for title, number in lessons
+        ]
+
+    async def get_existing_course_titles(self) -> list[str]:
+        """Get all course titles in the catalog"""
+        return await self._run(self.store.get_existing_course_titles)
+
+    async def get_course_count(self) -> int:
+        """Get the number of courses in the catalog"""
+        return await self._run(self.store.get_course_count)
+
+    async def get_all_courses_metadata(self) -> list[dict[str, Any]]:
+        """Get the metadata of every course in the catalog"""
+        return await self._run(self.store.get_all_courses_metadata)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the thread pool, optionally waiting for running calls"""
+        self._executor.shutdown(wait=wait)
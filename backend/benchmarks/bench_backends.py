@@ -0,0 +1,109 @@
+"""
+Query latency of the ChromaDB and NumPy course content backends.
+
+Fills both backends with the same random unit vectors (no embedding model
+needed), then times single and filtered top-k queries and checks that the
+NumPy backend's exact results agree with ChromaDB's approximate ones.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_backends [--chunks 20000] [--dim 384]
+        [--queries 200]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+from numpy_backend import NumpyCollection
+
+
+def fill(collection, vectors: np.ndarray, courses: int, batch_size: int = 5000):
+    """Write vectors with course/lesson metadata spread across courses"""
+    for start in range(0, len(vectors), batch_size):
+        ids = [
+            f"chunk_{i}" for i in range(start, min(start + batch_size, len(vectors)))
+        ]
+        collection.add(
+            ids=ids,
+            documents=ids,
+            metadatas=[
+                {"course_title": f"Course {i % courses}", "lesson_number": i % 10}
+                for i in range(start, start + len(ids))
+            ],
+            embeddings=vectors[start : start + len(ids)],
+        )
+
+
+def time_queries(collection, queries: np.ndarray, where: dict | None, k: int):
+    """Per-query latencies (ms) and result ids"""
+    latencies = []
+    ids = []
+    for query in queries:
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[query], n_results=k, where=where)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append(results["ids"][0])
+    return latencies, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(args.chunks, args.queries)] + 0.05 * (
+        rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    )
+
+    with tempfile.TemporaryDirectory() as path:
+        client = chromadb.PersistentClient(
+            path=path, settings=Settings(anonymized_telemetry=False)
+        )
+        backends = {
+            "chroma": client.create_collection("bench", embedding_function=None),
+            "numpy": NumpyCollection(f"{path}/numpy"),
+        }
+        for name, collection in backends.items():
+            start = time.perf_counter()
+            fill(collection, vectors, courses=8)
+            print(
+                f"{name:>6}: indexed {args.chunks} chunks in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+
+        for label, where in (
+            ("unfiltered", None),
+            (
+                "course+lesson",
+                {"$and": [{"course_title": "Course 3"}, {"lesson_number": 3}]},
+            ),
+        ):
+            results = {}
+            for name, collection in backends.items():
+                time_queries(collection, queries[:5], where, args.k)  # warm up
+                latencies, ids = time_queries(collection, queries, where, args.k)
+                results[name] = ids
+                latencies.sort()
+                print(
+                    f"{name:>6} {label}: p50 {statistics.median(latencies):.2f} ms  "
+                    f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms"
+                )
+            overlap = statistics.mean(
+                len(set(a) & set(b)) / args.k
+                for a, b in zip(results["chroma"], results["numpy"], strict=True)
+            )
+            print(f"  top-{args.k} agreement: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Microbenchmark for DocumentProcessor.chunk_text.
+
+Compares the prefix-sum chunker against the previous implementation on the
+lesson texts of the docs/ transcripts, checks that both produce identical
+chunks and reports the speedup.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_chunking [--docs ../docs] [--repeat 20]
+"""
+
+import argparse
+import os
+import re
+import time
+
+from config import config
+from document_processor import LESSON_RE, DocumentProcessor
+
+
+def reference_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """The previous chunk_text implementation, kept as the correctness reference"""
+    text = re.sub(r"\s+", " ", text.strip())
+    sentence_endings = re.compile(
+        r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
+    )
+    sentences = sentence_endings.split(text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    chunks = []
+    i = 0
+    while i < len(sentences):
+        current_chunk = []
+        current_size = 0
+        for j in range(i, len(sentences)):
+            sentence = sentences[j]
+            space_size = 1 if current_chunk else 0
+            total_addition = len(sentence) + space_size
+            if current_size + total_addition > chunk_size and current_chunk:
+                break
+            current_chunk.append(sentence)
+            current_size += total_addition
+
+        if current_chunk:
+            chunks.append(" ".join(current_chunk))
+            if chunk_overlap > 0:
+                overlap_size = 0
+                overlap_sentences = 0
+                for k in range(len(current_chunk) - 1, -1, -1):
+                    sentence_len = len(current_chunk[k]) + (
+                        1 if k < len(current_chunk) - 1 else 0
+                    )
+                    if overlap_size + sentence_len <= chunk_overlap:
+                        overlap_size += sentence_len
+                        overlap_sentences += 1
+                    else:
+                        break
+                next_start = i + len(current_chunk) - overlap_sentences
+                i = max(next_start, i + 1)
+            else:
+                i += len(current_chunk)
+        else:
+            i += 1
+
+    return chunks
+
+
+def load_lesson_texts(docs_path: str) -> list[str]:
+    """Split every transcript in the docs folder into its lesson texts"""
+    lessons = []
+    for file_name in sorted(os.listdir(docs_path)):
+        if not file_name.endswith(".txt"):
+            continue
+        with open(os.path.join(docs_path, file_name), encoding="utf-8") as file:
+            current = []
+            for line in file:
+                if LESSON_RE.match(line.strip()):
+                    if current:
+                        lessons.append("".join(current))
+                    current = []
+                else:
+                    current.append(line)
+            if current:
+                lessons.append("".join(current))
+    return lessons
+
+
+def best_time(func, texts: list[str], repeat: int) -> float:
+    """Best wall-clock time of chunking all texts, over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", default="../docs", help="Folder of transcripts")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    lessons = load_lesson_texts(args.docs)
+    cases = {
+        f"{len(lessons)} lessons": lessons,
+        "all lessons as one text": [" ".join(lessons)],
+    }
+
+    print(f"chunk_size={processor.chunk_size} chunk_overlap={processor.chunk_overlap}")
+    print(f"{'case':<28}{'chunks':>8}{'reference':>12}{'current':>12}{'speedup':>9}")
+    for name, texts in cases.items():
+        expected = [
+            reference_chunk_text(text, processor.chunk_size, processor.chunk_overlap)
+            for text in texts
+        ]
+        actual = [processor.chunk_text(text) for text in texts]
+        if actual != expected:
+            raise SystemExit(f"Chunk mismatch for case '{name}'")
+
+        reference_time = best_time(
+            lambda text: reference_chunk_text(
+                text, processor.chunk_size, processor.chunk_overlap
+            ),
+            texts,
+            args.repeat,
+        )
+        current_time = best_time(processor.chunk_text, texts, args.repeat)
+        print(
+            f"{name:<28}{sum(map(len, actual)):>8}"
+            f"{reference_time * 1000:>10.2f}ms{current_time * 1000:>10.2f}ms"
+            f"{reference_time / current_time:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Sweep of ChromaDB HNSW parameters on a generated corpus.
+
+Builds a course_content-like collection from clustered random unit vectors for
+every combination of space, max_neighbors (M) and ef_construction, then
+queries it at each ef_search. Reports build time, on-disk index size, p50/p99
+query latency and recall@k against exact (brute-force) search, to pick the
+HNSW_CONFIG for a corpus size and latency budget.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_hnsw [--chunks 20000] [--dim 384]
+        [--space l2,cosine] [--m 16,32] [--ef-construction 100,200]
+        [--ef-search 10,50,100] [--queries 500] [--k 5] [--spread 2.0]
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings
+
+
+def generate_corpus(
+    chunks: int, dim: int, queries: int, spread: float, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clustered unit vectors (like chunks of related lessons) and queries.
+
+    spread is the noise around each cluster centre relative to the centres;
+    larger values give a harder, less clustered corpus.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(chunks // 100, 1), dim), dtype=np.float32)
+    assignment = rng.integers(len(centers), size=chunks + queries)
+    vectors = centers[assignment] + spread * rng.standard_normal(
+        (chunks + queries, dim), dtype=np.float32
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors[:chunks], vectors[chunks:]
+
+
+def exact_neighbors(
+    corpus: np.ndarray, queries: np.ndarray, k: int, space: str
+) -> list[set[int]]:
+    """Brute-force top-k rows per query for the given distance space"""
+    scores = queries @ corpus.T
+    if space == "l2":
+        scores = scores - 0.5 * np.einsum("ij,ij->i", corpus, corpus)[None, :]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def directory_size(path: str) -> int:
+    """Total size of the files under path"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _ints(value: str) -> list[int]:
+    return [int(item) for item in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--spread", type=float, default=2.0)
+    parser.add_argument("--space", default="l2")
+    parser.add_argument("--m", type=_ints, default=[16, 32])
+    parser.add_argument("--ef-construction", type=_ints, default=[100, 200])
+    parser.add_argument("--ef-search", type=_ints, default=[10, 50, 100])
+    args = parser.parse_args()
+
+    corpus, queries = generate_corpus(args.chunks, args.dim, args.queries, args.spread)
+    ids = [str(i) for i in range(len(corpus))]
+    print(f"{args.chunks} chunks, dim {args.dim}, {args.queries} queries, k={args.k}")
+    print(
+        f"{'space':>6} {'M':>3} {'ef_c':>5} {'ef_s':>5} {'build s':>8} "
+        f"{'size MB':>8} {'p50 ms':>7} {'p99 ms':>7} {'recall':>7}"
+    )
+
+    for space, m, ef_construction in itertools.product(
+        args.space.split(","), args.m, args.ef_construction
+    ):
+        expected = exact_neighbors(corpus, queries, args.k, space)
+        with tempfile.TemporaryDirectory() as path:
+            client = chromadb.PersistentClient(
+                path=path, settings=Settings(anonymized_telemetry=False)
+            )
+            hnsw = {
+                "space": space,
+                "max_neighbors": m,
+                "ef_construction": ef_construction,
+            }
+            collection = client.create_collection(
+                "course_content", configuration={"hnsw": hnsw}, embedding_function=None
+            )
+            start = time.perf_counter()
+            for offset in range(0, len(corpus), 5000):
+                collection.add(
+                    ids=ids[offset : offset + 5000],
+                    embeddings=corpus[offset : offset + 5000],
+                )
+            build_time = time.perf_counter() - start
+            size = directory_size(path) / 1024 / 1024
+
+            for ef_search in args.ef_search:
+                # A loaded index keeps its ef_search, so reopen the database
+                # and change it before the index is loaded again
+                SharedSystemClient.clear_system_cache()
+                client = chromadb.PersistentClient(
+                    path=path, settings=Settings(anonymized_telemetry=False)
+                )
+                collection = client.get_collection("course_content")
+                collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+                collection.query(query_embeddings=queries[:10], n_results=args.k)
+                latencies = []
+                hits = 0
+                for query, relevant in zip(queries, expected, strict=True):
+                    start = time.perf_counter()
+                    results = collection.query(
+                        query_embeddings=[query], n_results=args.k
+                    )
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    hits += len({int(i) for i in results["ids"][0]} & relevant)
+                p50, p99 = np.percentile(latencies, [50, 99])
+                print(
+                    f"{space:>6} {m:>3} {ef_construction:>5} {ef_search:>5} "
+                    f"{build_time:>8.2f} {size:>8.1f} {p50:>7.2f} {p99:>7.2f} "
+                    f"{hits / (len(queries) * args.k):>7.3f}"
+                )
+            SharedSystemClient.clear_system_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Latency and recall benchmark for hybrid (BM25 + vector) vs pure vector search.
+
+Indexes the docs/ transcripts into a temporary ChromaDB, then queries for rare
+identifier-like tokens (API names, model ids, snake_case names) taken from the
+chunks themselves. A chunk is relevant if it contains the token, so recall@k
+measures how often search surfaces the exact term the user asked about.
+
+Usage (from backend/):
+    uv run python -m benchmarks.bench_hybrid [--docs ../docs] [--k 5]
+        [--queries 200]
+"""
+
+import argparse
+import random
+import re
+import statistics
+import tempfile
+import time
+
+from bm25_index import tokenize
+from config import config
+from rag_system import RAGSystem
+
+IDENTIFIER_RE = re.compile(r"[_.\-/]|\d|[a-z][A-Z]")
+
+
+def identifier_queries(
+    documents: dict[str, str], max_queries: int
+) -> list[tuple[str, set[str]]]:
+    """Rare identifier tokens with the ids of the chunks containing them"""
+    postings: dict[str, set[str]] = {}
+    for chunk_id, document in documents.items():
+        for token in set(tokenize(document)):
+            postings.setdefault(token, set()).add(chunk_id)
+
+    queries = [
+        (token, chunk_ids)
+        for token, chunk_ids in postings.items()
+        if len(token) > 3 and IDENTIFIER_RE.search(token) and len(chunk_ids) <= 3
+    ]
+    random.Random(0).shuffle(queries)
+    return queries[:max_queries]
+
+
+def run(store, queries, k: int, mode: str) -> tuple[float, list[float]]:
+    """Mean recall@k and per-query latencies (ms) for one search mode"""
+    recalls = []
+    latencies = []
+    for token, relevant in queries:
+        start = time.perf_counter()
+        results = store.search(f"What is {token}?", limit=k, mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # Relevance is judged by content: a result is a hit if it has the token
+        hits = sum(token in set(tokenize(document)) for document in results.documents)
+        recalls.append(hits / min(len(relevant), k))
+    return statistics.mean(recalls), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", default="../docs")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as chroma_path:
+        config.CHROMA_PATH = chroma_path
+        config.EMBEDDING_CACHE_SIZE = 0
+        rag = RAGSystem(config)
+        rag.add_course_folder(args.docs, clear_existing=True)
+        store = rag.vector_store
+
+        stored = store.course_content.get(include=["documents"])
+        documents = dict(zip(stored["ids"], stored["documents"], strict=True))
+        queries = identifier_queries(documents, args.queries)
+        print(f"{len(documents)} chunks, {len(queries)} identifier queries, k={args.k}")
+
+        # Build the lexical index up front so it isn't counted as query latency
+        store._get_lexical_index()
+        for mode in ("vector", "hybrid"):
+            run(store, queries[:5], args.k, mode)  # warm up
+            recall, latencies = run(store, queries, args.k, mode)
+            latencies.sort()
+            print(
+                f"{mode:>7}: recall@{args.k} {recall:.3f}  "
+                f"p50 {statistics.median(latencies):.2f} ms  "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
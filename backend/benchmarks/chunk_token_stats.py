@@ -0,0 +1,89 @@
+"""
+Token statistics for character-based vs token-aware chunking.
+
+Chunks the docs/ transcripts the way ingestion does and reports how many
+character-based chunks exceed the embedding model's sequence length (and are
+silently truncated when embedded), alongside the chunk count and packing of
+token mode.
+
+Usage (from backend/):
+    uv run python -m benchmarks.chunk_token_stats [--docs ../docs]
+        [--tokenizer path/to/tokenizer.json]
+"""
+
+import argparse
+import os
+import statistics
+
+from config import config
+from document_processor import DocumentProcessor
+from token_chunker import TokenChunker
+from tokenizers import Tokenizer
+
+
+def load_chunks(processor: DocumentProcessor, docs_path: str) -> list[str]:
+    """Chunk every transcript in the docs folder, including context prefixes"""
+    contents = []
+    for file_name in sorted(os.listdir(docs_path)):
+        if file_name.endswith(".txt"):
+            _, chunks = processor.process_course_document(
+                os.path.join(docs_path, file_name)
+            )
+            contents.extend(chunk.content for chunk in chunks)
+    return contents
+
+
+def report(name: str, chunks: list[str], chunker: TokenChunker):
+    """Print token statistics for one chunking mode"""
+    # Tokens the model sees, including special tokens
+    lengths = [chunker.count_tokens(chunk) + chunker.special_tokens for chunk in chunks]
+    over = [length for length in lengths if length > chunker.max_tokens]
+    truncated = sum(length - chunker.max_tokens for length in over)
+    print(
+        f"{name:<8}{len(chunks):>8}{statistics.mean(lengths):>10.1f}"
+        f"{max(lengths):>8}{len(over):>7} ({len(over) / len(chunks):>5.1%})"
+        f"{truncated:>11}{sum(lengths) / (len(chunks) * chunker.max_tokens):>9.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", default="../docs", help="Folder of transcripts")
+    parser.add_argument(
+        "--tokenizer",
+        help="tokenizer.json to use instead of the embedding model's",
+    )
+    args = parser.parse_args()
+
+    if args.tokenizer:
+        chunker = TokenChunker(
+            Tokenizer.from_file(args.tokenizer),
+            config.CHUNK_MAX_TOKENS,
+            config.CHUNK_OVERLAP_TOKENS,
+        )
+    else:
+        chunker = TokenChunker.for_embedding_model(
+            config.EMBEDDING_MODEL, config.CHUNK_MAX_TOKENS, config.CHUNK_OVERLAP_TOKENS
+        )
+
+    char_chunks = load_chunks(
+        DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP), args.docs
+    )
+    token_chunks = load_chunks(
+        DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP, chunker), args.docs
+    )
+
+    print(
+        f"max_tokens={chunker.max_tokens} chars: {config.CHUNK_SIZE}/"
+        f"{config.CHUNK_OVERLAP} tokens: {config.CHUNK_OVERLAP_TOKENS} overlap"
+    )
+    print(
+        f"{'mode':<8}{'chunks':>8}{'mean tok':>10}{'max':>8}"
+        f"{'over max':>16}{'cut tok':>11}{'fill':>9}"
+    )
+    report("chars", char_chunks, chunker)
+    report("tokens", token_chunks, chunker)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Memory and recall report for quantized course content embeddings.
+
+Embeds the docs/ transcripts once, loads the vectors into a float, an int8 and
+a binary NumPy collection, and queries all three with the opening words of a
+sample of chunks. Recall@k is measured against the float index's results;
+memory is the size of the first-pass index each query scans.
+
+Usage (from backend/):
+    uv run python -m benchmarks.quantization_report [--docs ../docs] [--k 5]
+        [--queries 200] [--rerank-factor 8]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from config import config
+from document_processor import DocumentProcessor
+from numpy_backend import NumpyCollection
+from vector_store import VectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", default="../docs")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank-factor", type=int, default=8)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    chunks = []
+    for file_name in sorted(os.listdir(args.docs)):
+        if file_name.endswith(".txt"):
+            _, course_chunks = processor.process_course_document(
+                os.path.join(args.docs, file_name)
+            )
+            chunks.extend(course_chunks)
+
+    with tempfile.TemporaryDirectory() as path:
+        store = VectorStore(os.path.join(path, "chroma"), config.EMBEDDING_MODEL)
+        start = time.perf_counter()
+        embeddings = store.embedding_function([chunk.content for chunk in chunks])
+        print(f"Embedded {len(chunks)} chunks in {time.perf_counter() - start:.1f}s")
+
+        sample = random.Random(0).sample(chunks, min(args.queries, len(chunks)))
+        queries = store.embedding_function(
+            [" ".join(chunk.content.split()[:12]) for chunk in sample]
+        )
+
+        results = {}
+        for quantization in ("none", "int8", "binary"):
+            collection = NumpyCollection(
+                os.path.join(path, quantization),
+                quantization=quantization,
+                rerank_factor=args.rerank_factor,
+            )
+            collection.add(
+                ids=[chunk.vector_id() for chunk in chunks],
+                documents=[chunk.content for chunk in chunks],
+                metadatas=[
+                    {
+                        "course_title": chunk.course_title,
+                        "lesson_number": chunk.lesson_number,
+                    }
+                    for chunk in chunks
+                ],
+                embeddings=embeddings,
+            )
+            latencies = []
+            ids = []
+            for query in queries:
+                start = time.perf_counter()
+                found = collection.query(query_embeddings=[query], n_results=args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                ids.append(set(found["ids"][0]))
+            results[quantization] = (collection.first_pass_nbytes(), ids, latencies)
+            collection.close()
+
+    float_bytes, float_ids, _ = results["none"]
+    print(
+        f"{'index':>7} {'memory':>10} {'saving':>7} {'recall@' + str(args.k):>9} "
+        f"{'p50 ms':>7}"
+    )
+    for quantization, (nbytes, ids, latencies) in results.items():
+        recall = statistics.mean(
+            len(found & expected) / args.k
+            for found, expected in zip(ids, float_ids, strict=True)
+        )
+        print(
+            f"{quantization if quantization != 'none' else 'float32':>7} "
+            f"{nbytes / 1024:>8.0f}KB {float_bytes / nbytes:>6.1f}x "
+            f"{recall:>9.3f} {statistics.median(latencies):>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
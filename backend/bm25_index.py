@@ -0,0 +1,244 @@
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Iterator
+
+import numpy as np
+
+# Words plus dotted/dashed/slashed identifiers such as "tool_use",
+# "claude-3-5-sonnet" or "client.messages.create"
+TOKEN_RE = re.compile(r"\w+(?:[.\-/]\w+)*")
+TOKEN_PART_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    Lowercased lexical tokens of text.
+
+    Compound identifiers are emitted whole and as their parts, so both
+    "tool_use" and "tool" match a chunk mentioning tool_use.
+    """
+    for match in TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        yield token
+        parts = TOKEN_PART_RE.findall(token)
+        if len(parts) > 1:
+            yield from parts
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over course content chunks.
+
+    Postings are kept per term in compact typed arrays (document slot and term
+    frequency), and per-document lengths and filter fields in parallel arrays,
+    so scoring a query is a few vectorized NumPy operations per query term.
+    Removed documents leave a tombstone until enough accumulate to compact.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Drop all documents"""
+        self._term_ids: dict[str, int] = {}
+        self._postings: list[array] = []  # Term -> document slots ("I")
+        self._frequencies: list[array] = []  # Term -> term frequencies ("H")
+        self._doc_freq = array("I")  # Term -> live documents containing it
+
+        self._slots: dict[str, int] = {}  # Document id -> slot
+        self._doc_ids: list[str | None] = []  # Slot -> id (None if removed)
+        self._doc_terms: list[array | None] = []  # Slot -> distinct term ids
+        self._doc_len = array("I")
+        self._course = array("i")  # Slot -> course id
+        self._lesson = array("i")  # Slot -> lesson number (-1 if none)
+        self._alive = array("B")
+        self._course_ids: dict[str, int] = {}
+
+        self._total_len = 0
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self):
+        """Remove all documents"""
+        with self._lock:
+            self._reset()
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict],
+    ):
+        """
+        Index documents, replacing any existing documents with the same ids.
+
+        Args:
+            ids: Chunk ids
+            documents: Chunk texts
+            metadatas: Chunk metadata with course_title and lesson_number
+        """
+        with self._lock:
+            for doc_id, document, metadata in zip(
+                ids, documents, metadatas, strict=True
+            ):
+                self._remove(doc_id)
+                self._add(doc_id, document, metadata)
+
+    def _add(self, doc_id: str, document: str, metadata: dict):
+        slot = len(self._doc_ids)
+        counts = Counter(tokenize(document))
+        terms = array("I")
+        for term, count in counts.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._postings)
+                self._postings.append(array("I"))
+                self._frequencies.append(array("H"))
+                self._doc_freq.append(0)
+            self._postings[term_id].append(slot)
+            self._frequencies[term_id].append(min(count, 0xFFFF))
+            self._doc_freq[term_id] += 1
+            terms.append(term_id)
+
+        length = sum(counts.values())
+        course_title = metadata.get("course_title") or ""
+        lesson_number = metadata.get("lesson_number")
+        self._slots[doc_id] = slot
+        self._doc_ids.append(doc_id)
+        self._doc_terms.append(terms)
+        self._doc_len.append(length)
+        self._course.append(
+            self._course_ids.setdefault(course_title, len(self._course_ids))
+        )
+        self._lesson.append(-1 if lesson_number is None else lesson_number)
+        self._alive.append(1)
+        self._total_len += length
+
+    def remove(self, ids: list[str]):
+        """Remove documents by id (unknown ids are ignored)"""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+            self._maybe_compact()
+
+    def remove_course(self, course_title: str):
+        """Remove every document of a course"""
+        with self._lock:
+            course_id = self._course_ids.get(course_title)
+            if course_id is None:
+                return
+            for slot, doc_id in enumerate(self._doc_ids):
+                if doc_id is not None and self._course[slot] == course_id:
+                    self._remove(doc_id)
+            self._maybe_compact()
+
+    def _remove(self, doc_id: str):
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        for term_id in self._doc_terms[slot]:
+            self._doc_freq[term_id] -= 1
+        self._total_len -= self._doc_len[slot]
+        self._doc_ids[slot] = None
+        self._doc_terms[slot] = None
+        self._alive[slot] = 0
+        self._removed += 1
+
+    def _maybe_compact(self):
+        """Rebuild the arrays without tombstones once they outnumber live docs"""
+        if self._removed < 1024 or self._removed < len(self._slots):
+            return
+
+        live = [slot for slot, doc_id in enumerate(self._doc_ids) if doc_id is not None]
+        new_slot = {old: new for new, old in enumerate(live)}
+        for term_id, (postings, frequencies) in enumerate(
+            zip(self._postings, self._frequencies, strict=True)
+        ):
+            kept = [
+                (new_slot[slot], frequency)
+                for slot, frequency in zip(postings, frequencies, strict=True)
+                if slot in new_slot
+            ]
+            self._postings[term_id] = array("I", (slot for slot, _ in kept))
+            self._frequencies[term_id] = array("H", (freq for _, freq in kept))
+
+        self._doc_ids = [self._doc_ids[slot] for slot in live]
+        self._doc_terms = [self._doc_terms[slot] for slot in live]
+        self._doc_len = array("I", (self._doc_len[slot] for slot in live))
+        self._course = array("i", (self._course[slot] for slot in live))
+        self._lesson = array("i", (self._lesson[slot] for slot in live))
+        self._alive = array("B", [1] * len(live))
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._doc_ids)}
+        self._removed = 0
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        course_title: str | None = None,
+        lesson_number: int | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Rank documents matching a query by BM25 score.
+
+        Args:
+            query: Query text
+            limit: Maximum number of results
+            course_title: Only return chunks of this course
+            lesson_number: Only return chunks of this lesson
+
+        Returns:
+            (chunk id, score) pairs, best first; only documents sharing at least
+            one term with the query are returned
+        """
+        with self._lock:
+            doc_count = len(self._slots)
+            if not doc_count or limit <= 0:
+                return []
+            term_ids = {
+                self._term_ids[term]
+                for term in tokenize(query)
+                if term in self._term_ids
+            }
+            if not term_ids:
+                return []
+
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32).astype(np.float32)
+            norm = self.k1 * (
+                1 - self.b + self.b * doc_len / (self._total_len / doc_count)
+            )
+            scores = np.zeros(len(self._doc_ids), dtype=np.float32)
+            for term_id in term_ids:
+                df = self._doc_freq[term_id]
+                if not df:
+                    continue
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                slots = np.frombuffer(self._postings[term_id], dtype=np.uint32)
+                tf = np.frombuffer(self._frequencies[term_id], dtype=np.uint16)
+                tf = tf.astype(np.float32)
+                scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm[slots])
+
+            mask = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            if course_title is not None:
+                course_id = self._course_ids.get(course_title)
+                if course_id is None:
+                    return []
+                mask &= np.frombuffer(self._course, dtype=np.int32) == course_id
+            if lesson_number is not None:
+                mask &= np.frombuffer(self._lesson, dtype=np.int32) == lesson_number
+            scores[~mask] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+                candidates = candidates[top]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_ids[slot], float(scores[slot])) for slot in ranked]
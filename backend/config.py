@@ -1,5 +1,6 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
 
 from dotenv import load_dotenv
 
@@ -14,6 +15,7 @@ class Config:
     # Anthropic API settings
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
+    PROMPT_CACHING: bool = True  # Cache tools, system prompt and history prefix
 
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
@@ -21,11 +23,47 @@ class Config:
     # Document processing settings
     CHUNK_SIZE: int = 800  # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100  # Characters to overlap between chunks
+    CHUNK_MODE: str = "chars"  # "chars" or "tokens" (embedding-model tokenizer)
+    CHUNK_MAX_TOKENS: int = 256  # Embedding model's max sequence length (token mode)
+    CHUNK_OVERLAP_TOKENS: int = 32  # Tokens to overlap between chunks (token mode)
     MAX_RESULTS: int = 5  # Maximum search results to return
+    SEARCH_MODE: str = "vector"  # "vector" or "hybrid" (BM25 + vector fused)
+    MMR_LAMBDA: float = 0.7  # Relevance vs. diversity of results (1.0 = relevance)
+    MMR_FETCH_FACTOR: int = 4  # Candidates fetched per result for re-ranking
+    MERGE_ADJACENT_CHUNKS: bool = True  # Return neighbouring chunk hits as one
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "numpy" (brute-force, mmap)
+    EMBEDDING_QUANTIZATION: str = "none"  # "none", "int8" or "binary" (numpy only)
+    QUANTIZATION_RERANK_FACTOR: int = 8  # Candidates re-scored exactly per result
     MAX_HISTORY: int = 2  # Number of conversation messages to remember
+    QUERY_CACHE_SIZE: int = 1024  # Recent query embeddings kept in memory
+    ANSWER_CACHE_SIZE: int = 256  # Answers reused for similar questions (0 = off)
+    ANSWER_CACHE_THRESHOLD: float = 0.95  # Cosine similarity of a matching question
+    ANSWER_CACHE_TTL: float = 3600.0  # Seconds a cached answer stays valid
+    VECTOR_STORE_WORKERS: int = 4  # Threads serving request-path vector searches
+    TOOL_WORKERS: int = 4  # Threads running one turn's tool calls concurrently
+    MAX_TOOL_ROUNDS: int = 3  # Rounds of tool calls Claude may make per query
+    TOOL_DEADLINE: float = 20.0  # Seconds into a query after which tools stop
+    TOOL_INPUT_TOKEN_BUDGET: int = 30_000  # Input tokens per query across rounds
+
+    # Ingestion settings
+    INGEST_WORKERS: int = 1  # Processes used to parse documents (1 = in-process)
+    EMBEDDING_CACHE_SIZE: int = 100_000  # Cached chunk embeddings on disk (0 = off)
+    INGEST_BATCH_SIZE: int = 64  # Chunks embedded and written per batch
+    INGEST_QUEUE_SIZE: int = 2  # Embedded batches buffered ahead of the writer
+    DOCS_WATCH: bool = os.getenv("DOCS_WATCH", "").lower() in ("1", "true", "yes")
+    DOCS_WATCH_INTERVAL: float = 2.0  # Seconds between docs folder scans
+    DOCS_WATCH_DEBOUNCE: float = 1.0  # Seconds a file must be unchanged to index
 
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
 
+    # HNSW settings per ChromaDB collection (empty = Chroma's defaults), e.g.
+    # {"space": "cosine", "max_neighbors": 32, "ef_construction": 200,
+    # "ef_search": 64}. space, max_neighbors (M) and ef_construction only apply
+    # when a collection is created; ef_search is updated on existing indexes.
+    HNSW_CONFIG: dict[str, dict[str, Any]] = field(
+        default_factory=lambda: {"course_catalog": {}, "course_content": {}}
+    )
+
 
 config = Config()
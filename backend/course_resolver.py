@@ -0,0 +1,124 @@
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+
+def _normalize(text: str) -> str:
+    """Case-fold and collapse whitespace"""
+    return " ".join(text.casefold().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    """Character trigrams of normalized text, padded so short words count"""
+    padded = f" {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class CourseResolver:
+    """
+    Maps user-supplied course names (e.g. "MCP") to catalog titles in memory.
+
+    Matches are tried from cheapest to most expensive: exact, case-insensitive,
+    prefix, then trigram overlap. Only if none of those match is the name
+    embedded and compared by cosine similarity against the cached title
+    embeddings, which always yields the closest course.
+    """
+
+    # Fraction of the name's trigrams that must appear in a title to match
+    MIN_TRIGRAM_CONTAINMENT = 0.7
+
+    def __init__(
+        self,
+        titles: list[str],
+        title_embeddings: Any,
+        embed: Callable[[list[str]], Any],
+    ):
+        """
+        Args:
+            titles: Course titles in the catalog
+            title_embeddings: One embedding per title
+            embed: Embedding function used for the semantic fallback
+        """
+        self.titles = list(titles)
+        self.embed = embed
+        self._title_set = set(self.titles)
+        self._by_normalized = {}
+        for title in self.titles:
+            self._by_normalized.setdefault(_normalize(title), title)
+        self._trigrams = [_trigrams(_normalize(title)) for title in self.titles]
+
+        # Unit-length rows, so a dot product is the cosine similarity
+        self._matrix = None
+        if self.titles:
+            matrix = np.asarray(title_embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+    def resolve(self, course_name: str) -> str | None:
+        """
+        Find the catalog title that best matches a course name.
+
+        Args:
+            course_name: Full or partial course name
+
+        Returns:
+            Matching course title, or None if the catalog is empty
+        """
+        if not self.titles:
+            return None
+        if course_name in self._title_set:
+            return course_name
+
+        name = _normalize(course_name)
+        if not name:
+            return None
+        if name in self._by_normalized:
+            return self._by_normalized[name]
+
+        # Prefer the shortest title starting with the name, e.g. "MCP"
+        prefixed = [
+            title
+            for normalized, title in self._by_normalized.items()
+            if normalized.startswith(name)
+        ]
+        if prefixed:
+            return min(prefixed, key=len)
+
+        match = self._trigram_match(name)
+        if match:
+            return match
+
+        return self._semantic_match(course_name)
+
+    def _trigram_match(self, name: str) -> str | None:
+        """Best title containing most of the name's trigrams (typos, substrings)"""
+        name_trigrams = _trigrams(name)
+        best_title = None
+        best_score = (0.0, 0.0)
+        for title, title_trigrams in zip(self.titles, self._trigrams, strict=True):
+            shared = len(name_trigrams & title_trigrams)
+            containment = shared / len(name_trigrams)
+            if containment < self.MIN_TRIGRAM_CONTAINMENT:
+                continue
+            # Break ties in favour of titles with fewer unrelated trigrams
+            score = (containment, shared / len(name_trigrams | title_trigrams))
+            if score > best_score:
+                best_title, best_score = title, score
+        return best_title
+
+    def _semantic_match(self, course_name: str) -> str:
+        """Title whose cached embedding is most similar to the name's"""
+        return self.closest(self.embed([course_name])[0])
+
+    def closest(self, embedding: Any) -> str | None:
+        """
+        Find the title whose cached embedding is most similar to an embedding.
+
+        Returns:
+            Closest course title, or None if the catalog is empty
+        """
+        if not self.titles:
+            return None
+        similarities = self._matrix @ np.asarray(embedding, dtype=np.float32)
+        return self.titles[int(np.argmax(similarities))]
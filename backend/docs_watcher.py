@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from datetime import UTC, datetime
+
+from rag_system import RAGSystem, is_course_file
+
+
+class DocsWatcher:
+    """
+    Background poller that keeps the vector store in sync with a docs folder.
+
+    Every poll_interval seconds the folder is scanned for added, changed and
+    deleted course documents. A file is processed once it has not changed for
+    debounce seconds, so half-written files are not indexed. Indexing runs on
+    the watcher thread, off the request path.
+    """
+
+    def __init__(
+        self,
+        rag_system: RAGSystem,
+        folder_path: str,
+        poll_interval: float = 2.0,
+        debounce: float = 1.0,
+    ):
+        self.rag_system = rag_system
+        self.folder_path = folder_path
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        self._snapshot: dict[str, tuple[int, int]] = {}  # path -> (size, mtime_ns)
+        self._pending: dict[str, float] = {}  # path -> monotonic time of last change
+        self._last_indexed: dict[str, str] = {}  # file name -> ISO timestamp
+        self._last_scan: str | None = None
+        self._last_error: str | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Start watching; files already in the folder are treated as indexed"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._snapshot = self._scan()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="docs-watcher", daemon=True
+        )
+        self._thread.start()
+        print(f"Watching {self.folder_path} for course document changes")
+
+    def stop(self, timeout: float | None = None):
+        """Stop watching and wait for the current indexing step to finish"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        """Get the watcher's queue depth, last scan and last-indexed times"""
+        with self._lock:
+            return {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "folder": self.folder_path,
+                "queue_depth": len(self._pending),
+                "last_scan": self._last_scan,
+                "last_indexed": dict(self._last_indexed),
+                "last_error": self._last_error,
+            }
+
+    def poll(self):
+        """Scan the folder once and process files that have settled"""
+        snapshot = self._scan()
+        now = time.monotonic()
+        with self._lock:
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            for path in changed:
+                self._pending[path] = now
+            self._snapshot = snapshot
+            self._last_scan = _now_iso()
+            ready = [
+                path
+                for path, changed_at in self._pending.items()
+                if now - changed_at >= self.debounce
+            ]
+
+        if not ready:
+            return
+
+        deleted = [path for path in ready if path not in snapshot]
+        present = [path for path in ready if path in snapshot]
+        try:
+            if deleted:
+                self.rag_system.remove_files(deleted)
+            if present:
+                courses, chunks = self.rag_system.index_files(present)
+                print(f"Watcher indexed {courses} courses with {chunks} chunks")
+            error = None
+        except Exception as e:
+            print(f"Error indexing watched files: {e}")
+            error = str(e)
+
+        with self._lock:
+            self._last_error = error
+            for path in ready:
+                self._pending.pop(path, None)
+                if error is None:
+                    self._last_indexed[os.path.basename(path)] = _now_iso()
+
+    def _run(self):
+        """Poll until stopped"""
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error watching {self.folder_path}: {e}")
+                with self._lock:
+                    self._last_error = str(e)
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Size and mtime of every course document in the folder"""
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.folder_path))
+        except OSError:
+            return snapshot
+        for entry in entries:
+            if not is_course_file(entry.name):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(UTC).isoformat(timespec="seconds")
@@ -1,15 +1,39 @@
+import bisect
+import itertools
 import os
 import re
+import time
+from collections.abc import Iterator
+from typing import TextIO
 
 from models import Course, CourseChunk, Lesson
+from token_chunker import TokenChunker
+
+# Patterns are compiled once rather than on every call / line
+# Sentence breaks in whitespace-normalized text: a space after a period, "!" or
+# "?" that precedes a capital letter, ignoring common abbreviations. Matching the
+# literal space first keeps the lookbehinds off the hot path.
+SENTENCE_END_RE = re.compile(r" (?=[A-Z])(?<=[.!?] )(?<!\w\.\w. )(?<![A-Z][a-z]\. )")
+COURSE_TITLE_RE = re.compile(r"^Course Title:\s*(.+)$", re.IGNORECASE)
+COURSE_LINK_RE = re.compile(r"^Course Link:\s*(.+)$", re.IGNORECASE)
+COURSE_INSTRUCTOR_RE = re.compile(r"^Course Instructor:\s*(.+)$", re.IGNORECASE)
+LESSON_RE = re.compile(r"^Lesson\s+(\d+):\s*(.+)$", re.IGNORECASE)
+LESSON_LINK_RE = re.compile(r"^Lesson Link:\s*(.+)$", re.IGNORECASE)
 
 
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
 
-    def __init__(self, chunk_size: int, chunk_overlap: int):
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        token_chunker: TokenChunker | None = None,
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # When set, chunks are measured in embedding-model tokens instead of characters
+        self.token_chunker = token_chunker
 
     def read_file(self, file_path: str) -> str:
         """Read content from file with UTF-8 encoding"""
@@ -21,75 +45,51 @@ class DocumentProcessor:
             with open(file_path, encoding="utf-8", errors="ignore") as file:
                 return file.read()
 
-    def chunk_text(self, text: str) -> list[str]:
-        """Split text into sentence-based chunks with overlap using config settings"""
+    def chunk_text(self, text: str, reserved_tokens: int = 0) -> list[str]:
+        """
+        Split text into sentence-based chunks with overlap using config settings.
+
+        Args:
+            text: Text to chunk
+            reserved_tokens: In token mode, tokens kept free in each chunk for
+                context that is prepended later
+
+        Returns:
+            List of chunk texts
+        """
 
         # Clean up the text
-        text = re.sub(r"\s+", " ", text.strip())  # Normalize whitespace
+        text = " ".join(text.split())  # Normalize whitespace
 
-        # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(
-            r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
-        )
-        sentences = sentence_endings.split(text)
+        # Split into sentences, ignoring common abbreviations
+        sentences = [s.strip() for s in SENTENCE_END_RE.split(text)]
+        sentences = [s for s in sentences if s]
 
-        # Clean sentences
-        sentences = [s.strip() for s in sentences if s.strip()]
+        if self.token_chunker:
+            return self.token_chunker.chunk_sentences(sentences, reserved_tokens)
+
+        # prefix[k] is the length of the first k sentences, each followed by a
+        # space, so " ".join(sentences[i:j]) has length prefix[j] - prefix[i] - 1
+        prefix = list(itertools.accumulate((len(s) + 1 for s in sentences), initial=0))
 
         chunks = []
         i = 0
 
         while i < len(sentences):
-            current_chunk = []
-            current_size = 0
-
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
-
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
-
-                # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
-                    break
-
-                current_chunk.append(sentence)
-                current_size += total_addition
-
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(" ".join(current_chunk))
-
-                # Calculate overlap for next chunk
-                if hasattr(self, "chunk_overlap") and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (
-                            1 if k < len(current_chunk) - 1 else 0
-                        )
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
+            # Take as many sentences as fit in the chunk size (always at least one)
+            end = bisect.bisect_right(prefix, prefix[i] + self.chunk_size + 1, lo=i + 1)
+            end = max(end - 1, i + 1)
+            chunks.append(" ".join(sentences[i:end]))
+
+            if self.chunk_overlap > 0:
+                # Start the next chunk at the trailing sentences that fit in the overlap
+                overlap_start = bisect.bisect_left(
+                    prefix, prefix[end] - 1 - self.chunk_overlap, lo=i, hi=end
+                )
+                i = max(overlap_start, i + 1)  # Ensure we make progress
             else:
-                # No sentences fit, move to next
-                i += 1
+                # No overlap - move to next sentence after current chunk
+                i = end
 
         return chunks
 
@@ -103,42 +103,59 @@ class DocumentProcessor:
         Line 3: Course Instructor: [instructor]
         Following lines: Lesson markers and content
         """
-        content = self.read_file(file_path)
-        filename = os.path.basename(file_path)
+        course, chunk_batches = self.iter_course_document(file_path)
+        course_chunks = [chunk for batch in chunk_batches for chunk in batch]
+        return course, course_chunks
+
+    def iter_course_document(
+        self, file_path: str
+    ) -> tuple[Course, Iterator[list[CourseChunk]]]:
+        """
+        Stream a course document one lesson at a time.
+
+        Only the metadata header is read up front. The returned iterator reads
+        the rest of the file line by line and yields each lesson's chunks as
+        soon as the lesson ends, so memory is bounded by the largest lesson
+        rather than the whole transcript. The course's lessons list fills in as
+        the iterator is consumed.
 
-        lines = content.strip().split("\n")
+        Args:
+            file_path: Path to the course document
 
-        # Extract course metadata from first three lines
+        Returns:
+            Tuple of (Course object, iterator of per-lesson chunk lists)
+        """
+        filename = os.path.basename(file_path)
+
+        # Extract course metadata from the first lines (after leading blank lines)
+        with self._open_text(file_path) as file:
+            header = list(itertools.islice(self._iter_lines(file), 4))
         course_title = filename  # Default fallback
         course_link = None
         instructor_name = "Unknown"
 
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
-            title_match = re.match(
-                r"^Course Title:\s*(.+)$", lines[0].strip(), re.IGNORECASE
-            )
+        if len(header) >= 1 and header[0].strip():
+            title_match = COURSE_TITLE_RE.match(header[0].strip())
             if title_match:
                 course_title = title_match.group(1).strip()
             else:
-                course_title = lines[0].strip()
+                course_title = header[0].strip()
 
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
+        for line in header[1:4]:  # Check first 4 lines for metadata
+            line = line.strip()
             if not line:
                 continue
 
             # Try to match course link
-            link_match = re.match(r"^Course Link:\s*(.+)$", line, re.IGNORECASE)
+            link_match = COURSE_LINK_RE.match(line)
             if link_match:
                 course_link = link_match.group(1).strip()
                 continue
 
             # Try to match instructor
-            instructor_match = re.match(
-                r"^Course Instructor:\s*(.+)$", line, re.IGNORECASE
-            )
+            instructor_match = COURSE_INSTRUCTOR_RE.match(line)
             if instructor_match:
                 instructor_name = instructor_match.group(1).strip()
                 continue
@@ -150,121 +167,193 @@ class DocumentProcessor:
             instructor=instructor_name if instructor_name != "Unknown" else None,
         )
 
-        # Process lessons and create chunks
-        course_chunks = []
-        current_lesson = None
-        lesson_title = None
-        lesson_link = None
-        lesson_content = []
-        chunk_counter = 0
-
         # Start processing from line 4 (after metadata)
         start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
+        if len(header) > 3 and not header[3].strip():
             start_index = 4  # Skip empty line after instructor
 
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
+        return course, self._iter_lesson_chunks(file_path, course, header, start_index)
+
+    def _open_text(self, file_path: str) -> TextIO:
+        """Open a file for streaming; invalid UTF-8 is dropped, as in read_file"""
+        return open(file_path, encoding="utf-8", errors="ignore")
+
+    def _iter_lines(self, file: TextIO) -> Iterator[str]:
+        """Yield a file's lines without newlines, skipping leading blank lines"""
+        lines = (line.removesuffix("\n") for line in file)
+        return itertools.dropwhile(lambda line: not line.strip(), lines)
+
+    def _iter_lesson_chunks(
+        self, file_path: str, course: Course, header: list[str], start_index: int
+    ) -> Iterator[list[CourseChunk]]:
+        """Parse lesson markers from the document body and yield each lesson's chunks"""
+        with self._open_text(file_path) as file:
+            # Continue after the header lines that were already parsed
+            lines = self._iter_lines(file)
+            for _ in header:
+                next(lines)
+            lines = itertools.chain(header[start_index:], lines)
+
+            current_lesson = None
+            lesson_title = None
+            lesson_link = None
+            lesson_content = []
+            chunk_counter = 0
+
+            # Raw body lines are only kept until the first chunk is produced, in
+            # case the document has no lessons and must be chunked as a whole
+            body_lines = []
+
+            line = next(lines, None)
+            while line is not None:
+                if body_lines is not None:
+                    body_lines.append(line)
+                next_line = next(lines, None)
+
+                # Check for lesson markers (e.g., "Lesson 0: Introduction")
+                lesson_match = LESSON_RE.match(line.strip())
+
+                if lesson_match:
+                    # Emit previous lesson if it exists
+                    if current_lesson is not None and lesson_content:
+                        chunks = self._build_lesson_chunks(
+                            course,
+                            current_lesson,
+                            lesson_title,
+                            lesson_link,
+                            lesson_content,
+                            chunk_counter,
+                            is_last=False,
+                        )
+                        if chunks:
+                            body_lines = None
+                            chunk_counter += len(chunks)
+                            yield chunks
+
+                    # Start new lesson
+                    current_lesson = int(lesson_match.group(1))
+                    lesson_title = lesson_match.group(2).strip()
+                    lesson_link = None
+
+                    # Check if next line is a lesson link
+                    if next_line is not None:
+                        link_match = LESSON_LINK_RE.match(next_line.strip())
+                        if link_match:
+                            lesson_link = link_match.group(1).strip()
+                            # Skip the link line so it's not added to content
+                            if body_lines is not None:
+                                body_lines.append(next_line)
+                            next_line = next(lines, None)
+
+                    lesson_content = []
+                else:
+                    # Add line to current lesson content
+                    lesson_content.append(line)
+
+                line = next_line
+
+            # Emit the last lesson
+            if current_lesson is not None and lesson_content:
+                chunks = self._build_lesson_chunks(
+                    course,
+                    current_lesson,
+                    lesson_title,
+                    lesson_link,
+                    lesson_content,
+                    chunk_counter,
+                    is_last=True,
+                )
+                if chunks:
+                    chunk_counter += len(chunks)
+                    yield chunks
+
+            # If no lessons found, treat entire content as one document
+            if not chunk_counter and body_lines:
+                remaining_content = "\n".join(body_lines).strip()
+                if remaining_content:
+                    yield [
+                        CourseChunk(
+                            content=chunk,
+                            course_title=course.title,
+                            chunk_index=idx,
+                        )
+                        for idx, chunk in enumerate(self.chunk_text(remaining_content))
+                    ]
+
+    def _build_lesson_chunks(
+        self,
+        course: Course,
+        lesson_number: int,
+        lesson_title: str,
+        lesson_link: str | None,
+        lesson_content: list[str],
+        first_chunk_index: int,
+        is_last: bool,
+    ) -> list[CourseChunk]:
+        """Add a finished lesson to the course and chunk its content"""
+        lesson_text = "\n".join(lesson_content).strip()
+        if not lesson_text:
+            return []
+
+        # Add lesson to course
+        course.lessons.append(
+            Lesson(
+                lesson_number=lesson_number, title=lesson_title, lesson_link=lesson_link
+            )
+        )
 
-            # Check for lesson markers (e.g., "Lesson 0: Introduction")
-            lesson_match = re.match(
-                r"^Lesson\s+(\d+):\s*(.+)$", line.strip(), re.IGNORECASE
+        # Leave room for the context prefix added below
+        reserved_tokens = 0
+        if self.token_chunker:
+            reserved_tokens = self.token_chunker.count_tokens(
+                f"Course {course.title} Lesson {lesson_number} content:"
             )
 
-            if lesson_match:
-                # Process previous lesson if it exists
-                if current_lesson is not None and lesson_content:
-                    lesson_text = "\n".join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link,
-                        )
-                        course.lessons.append(lesson)
-
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = (
-                                    f"Lesson {current_lesson} content: {chunk}"
-                                )
-                            else:
-                                chunk_with_context = chunk
-
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter,
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
-
-                # Start new lesson
-                current_lesson = int(lesson_match.group(1))
-                lesson_title = lesson_match.group(2).strip()
-                lesson_link = None
-
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(
-                        r"^Lesson Link:\s*(.+)$", next_line, re.IGNORECASE
-                    )
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-
-                lesson_content = []
+        course_chunks = []
+        for idx, chunk in enumerate(self.chunk_text(lesson_text, reserved_tokens)):
+            if is_last:
+                # For any chunk of the last lesson, add lesson context & course title
+                chunk_with_context = (
+                    f"Course {course.title} Lesson {lesson_number} content: {chunk}"
+                )
+            elif idx == 0:
+                # For the first chunk of each lesson, add lesson context
+                chunk_with_context = f"Lesson {lesson_number} content: {chunk}"
             else:
-                # Add line to current lesson content
-                lesson_content.append(line)
-
-            i += 1
-
-        # Process the last lesson
-        if current_lesson is not None and lesson_content:
-            lesson_text = "\n".join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link,
+                chunk_with_context = chunk
+
+            course_chunks.append(
+                CourseChunk(
+                    content=chunk_with_context,
+                    course_title=course.title,
+                    lesson_number=lesson_number,
+                    chunk_index=first_chunk_index + idx,
                 )
-                course.lessons.append(lesson)
-
-                chunks = self.chunk_text(lesson_text)
-                for chunk in chunks:
-                    # For any chunk of each lesson, add lesson context & course title
-
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
-
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter,
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
-
-        # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = "\n".join(lines[start_index:]).strip()
-            if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
-                        content=chunk,
-                        course_title=course.title,
-                        chunk_index=chunk_counter,
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
+            )
 
-        return course, course_chunks
+        return course_chunks
+
+
+# Per-process state for parallel ingestion (see RAGSystem.add_course_folder)
+_worker_processor: DocumentProcessor | None = None
+
+
+def init_ingest_worker(processor: DocumentProcessor):
+    """Install the document processor used by an ingestion worker process"""
+    global _worker_processor
+    _worker_processor = processor
+
+
+def parse_in_worker(file_path: str) -> tuple[Course, list[CourseChunk], float]:
+    """
+    Parse a course document inside an ingestion worker process.
+
+    Args:
+        file_path: Path to the course document
+
+    Returns:
+        Tuple of (Course object, course chunks, parse time in seconds)
+    """
+    start = time.perf_counter()
+    course, course_chunks = _worker_processor.process_course_document(file_path)
+    return course, course_chunks, time.perf_counter() - start
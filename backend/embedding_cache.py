@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model name, text hash).
+
+    Vectors are stored as float32 blobs in SQLite. The cache is capped at
+    max_entries; when full, the least recently used vectors are evicted.
+    """
+
+    def __init__(self, db_path: str, max_entries: int):
+        """
+        Args:
+            db_path: SQLite database file
+            max_entries: Maximum number of cached vectors
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared across ingestion threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "last_used INTEGER NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+        # Logical clock for LRU order, continuing from the last run
+        (last_used,) = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()
+        self._clock = last_used
+
+    def get_many(self, model: str, text_hashes: list[str]) -> dict[str, np.ndarray]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            model: Embedding model name
+            text_hashes: Hashes of the texts to look up
+
+        Returns:
+            Mapping of text hash to vector for the hashes that were cached
+        """
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32)
+
+            if found:
+                self._clock += 1
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? "
+                    "WHERE model = ? AND text_hash = ?",
+                    [(self._clock, model, text_hash) for text_hash in found],
+                )
+                self._conn.commit()
+
+            hits = sum(1 for text_hash in text_hashes if text_hash in found)
+            self.hits += hits
+            self.misses += len(text_hashes) - hits
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, np.ndarray]):
+        """
+        Store vectors, evicting the least recently used entries over the cap.
+
+        Args:
+            model: Embedding model name
+            vectors: Mapping of text hash to vector
+        """
+        if not vectors:
+            return
+        with self._lock:
+            self._clock += 1
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        model,
+                        text_hash,
+                        np.asarray(vector, dtype=np.float32).tobytes(),
+                        self._clock,
+                    )
+                    for text_hash, vector in vectors.items()
+                ],
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN "
+                    "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        """Get hit/miss counters and the number of cached vectors"""
+        with self._lock:
+            (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+
+
+@dataclass
+class ManifestEntry:
+    """What was indexed for a single course file"""
+
+    size: int  # File size in bytes when indexed
+    mtime_ns: int  # File modification time (ns) when indexed
+    content_hash: str  # SHA-256 of the file contents
+    course_title: str  # Course the file was indexed as
+    chunk_ids: list[str]  # Vector store ids of the file's chunks
+
+    def matches_stat(self, stat: os.stat_result) -> bool:
+        """Check whether a file's size and mtime still match this entry"""
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+
+def hash_file(file_path: str) -> str:
+    """Compute the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """Persistent record of indexed course files, keyed by absolute path"""
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.entries: dict[str, ManifestEntry] = {}
+        self._load()
+
+    def _load(self):
+        """Load entries from disk, starting empty if the manifest is missing or corrupt"""
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                raw_entries = json.load(file)
+            self.entries = {
+                path: ManifestEntry(**entry) for path, entry in raw_entries.items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Error loading ingest manifest {self.manifest_path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {path: asdict(entry) for path, entry in self.entries.items()}, file
+            )
+        os.replace(tmp_path, self.manifest_path)
+
+    def get(self, file_path: str) -> ManifestEntry | None:
+        """Get the entry recorded for a file, if any"""
+        return self.entries.get(os.path.abspath(file_path))
+
+    def record(
+        self,
+        file_path: str,
+        stat: os.stat_result,
+        content_hash: str,
+        course_title: str,
+        chunk_ids: list[str],
+    ):
+        """Record what a file was indexed as"""
+        self.entries[os.path.abspath(file_path)] = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash,
+            course_title=course_title,
+            chunk_ids=chunk_ids,
+        )
+
+    def remove(self, file_path: str) -> ManifestEntry | None:
+        """Forget a file, returning its previous entry"""
+        return self.entries.pop(os.path.abspath(file_path), None)
+
+    def clear(self):
+        """Forget all files"""
+        self.entries = {}
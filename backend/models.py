@@ -25,3 +25,7 @@ class CourseChunk(BaseModel):
     course_title: str  # Which course this chunk belongs to
     lesson_number: int | None = None  # Which lesson this chunk is from
     chunk_index: int  # Position of this chunk in the document
+
+    def vector_id(self) -> str:
+        """Vector store ID for this chunk: course title with chunk index"""
+        return f"{self.course_title.replace(' ', '_')}_{self.chunk_index}"
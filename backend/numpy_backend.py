@@ -0,0 +1,539 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+# Rows allocated when the embedding matrix is first created
+INITIAL_CAPACITY = 1024
+# Rows scored per block by the quantized first pass, bounding temporary memory
+QUANTIZED_BLOCK_ROWS = 16384
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+
+class NumpyCollection:
+    """
+    Brute-force vector collection backed by a memory-mapped float32 matrix.
+
+    A drop-in replacement for the subset of the ChromaDB collection API used
+    by VectorStore for course content (add, upsert, get, query, delete,
+    count). Each query is one matrix product over all rows, with course and
+    lesson filters applied as a boolean mask over int32 columns and top-k
+    selected with argpartition, which for tens of thousands of chunks is
+    faster than an HNSW index behind SQLite.
+
+    On disk, in folder_path:
+        embeddings.f32  (capacity, dim) float32 matrix, memory-mapped
+        course.i32      course id per row (-1 for a free row), memory-mapped
+        lesson.i32      lesson number per row (-1 for none), memory-mapped
+        records.sqlite3 chunk ids, documents and metadata, and course titles
+
+    Deleted rows are reused by later writes, so the files never need compacting.
+
+    With quantization, the first pass scans compact in-memory codes instead of
+    the float matrix: int8 codes with a per-row scale (a quarter of the
+    memory), or sign bits compared by Hamming distance (a thirty-second). The
+    best rerank_factor * n_results candidates are then re-scored exactly
+    against their full-precision rows, read from the memory-mapped file.
+    """
+
+    def __init__(
+        self,
+        folder_path: str,
+        embedding_function: Callable[[list[str]], Any] | None = None,
+        quantization: str = "none",
+        rerank_factor: int = 8,
+    ):
+        """
+        Args:
+            folder_path: Folder holding the collection's files
+            embedding_function: Embeds query_texts passed to query()
+            quantization: First-pass codes: "none", "int8" or "binary"
+            rerank_factor: Candidates re-scored exactly per requested result
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.folder_path = folder_path
+        self.embedding_function = embedding_function
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        os.makedirs(folder_path, exist_ok=True)
+
+        # Shared across ingestion and request threads, serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(folder_path, "records.sqlite3"), check_same_thread=False
+        )
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS chunks (slot INTEGER PRIMARY KEY, "
+            "id TEXT NOT NULL UNIQUE, document TEXT, metadata TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS courses (id INTEGER PRIMARY KEY, "
+            "title TEXT NOT NULL UNIQUE);"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        """Open the memory-mapped columns and rebuild the in-memory lookups"""
+        self._slots: dict[str, int] = dict(
+            self._conn.execute("SELECT id, slot FROM chunks")
+        )
+        self._course_ids: dict[str, int] = {
+            title: course_id
+            for course_id, title in self._conn.execute("SELECT id, title FROM courses")
+        }
+        self._size = max(self._slots.values(), default=-1) + 1  # Rows in use
+
+        row = self._conn.execute(
+            "SELECT value FROM settings WHERE key = 'dim'"
+        ).fetchone()
+        self._dim = int(row[0]) if row else None
+        self._embeddings = self._course = self._lesson = None
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._codes = self._scales = None
+        if self._dim is None:
+            self._free: list[int] = []
+            return
+
+        capacity = os.path.getsize(self._path("embeddings.f32")) // (self._dim * 4)
+        self._open_columns(capacity)
+
+        # Rows written without their record (e.g. interrupted write) are free
+        live = np.zeros(self._size, dtype=bool)
+        live[list(self._slots.values())] = True
+        self._course[: self._size][~live] = -1
+        self._free = np.flatnonzero(~live).tolist()
+
+        self._sq_norms = np.zeros(capacity, dtype=np.float32)
+        self._grow_codes(capacity)
+        for start in range(0, self._size, QUANTIZED_BLOCK_ROWS):
+            rows = np.arange(start, min(start + QUANTIZED_BLOCK_ROWS, self._size))
+            self._set_derived(rows, np.asarray(self._embeddings[rows]))
+
+    def _grow_codes(self, capacity: int):
+        """(Re)allocate the quantized codes for capacity rows, keeping old rows"""
+        if self.quantization == "none":
+            return
+        width = self._dim if self.quantization == "int8" else (self._dim + 7) // 8
+        dtype = np.int8 if self.quantization == "int8" else np.uint8
+        codes = np.zeros((capacity, width), dtype=dtype)
+        if self._codes is not None:
+            codes[: len(self._codes)] = self._codes
+        self._codes = codes
+        if self.quantization == "int8":
+            scales = np.zeros(capacity, dtype=np.float32)
+            if self._scales is not None:
+                scales[: len(self._scales)] = self._scales
+            self._scales = scales
+
+    def _set_derived(self, rows: np.ndarray, vectors: np.ndarray):
+        """Store the squared norms and quantized codes of rows"""
+        self._sq_norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+        if self.quantization == "int8":
+            # Symmetric per-row scale: code * scale reconstructs the vector
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            self._codes[rows] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        elif self.quantization == "binary":
+            self._codes[rows] = np.packbits(vectors > 0, axis=1)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.folder_path, name)
+
+    def _open_columns(self, capacity: int):
+        """Memory-map the column files, growing them to capacity rows"""
+        for name, width in (
+            ("embeddings.f32", self._dim * 4),
+            ("course.i32", 4),
+            ("lesson.i32", 4),
+        ):
+            with open(self._path(name), "ab") as file:
+                if file.tell() < capacity * width:
+                    file.truncate(capacity * width)
+        self._embeddings = np.memmap(
+            self._path("embeddings.f32"),
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self._dim),
+        )
+        self._course = np.memmap(
+            self._path("course.i32"), dtype=np.int32, mode="r+", shape=(capacity,)
+        )
+        self._lesson = np.memmap(
+            self._path("lesson.i32"), dtype=np.int32, mode="r+", shape=(capacity,)
+        )
+
+    def _reserve(self, rows: int):
+        """Make room for rows more rows, doubling the capacity as needed"""
+        capacity = len(self._course)
+        needed = self._size + rows
+        if needed <= capacity:
+            return
+        new_capacity = max(capacity * 2, needed)
+        self._embeddings.flush()
+        self._course.flush()
+        self._lesson.flush()
+        self._open_columns(new_capacity)
+        # Free rows past the old end are marked as such
+        self._course[capacity:] = -1
+        sq_norms = np.zeros(new_capacity, dtype=np.float32)
+        sq_norms[:capacity] = self._sq_norms
+        self._sq_norms = sq_norms
+        self._grow_codes(new_capacity)
+
+    def first_pass_nbytes(self) -> int:
+        """Bytes scanned per query: the float matrix, or the quantized codes"""
+        if self._dim is None:
+            return 0
+        if self.quantization == "none":
+            return self._size * self._dim * 4
+        nbytes = self._codes[: self._size].nbytes
+        if self._scales is not None:
+            nbytes += self._scales[: self._size].nbytes
+        return nbytes
+
+    def count(self) -> int:
+        """Number of stored chunks"""
+        return len(self._slots)
+
+    def add(
+        self,
+        ids: list[str],
+        embeddings: Any,
+        metadatas: list[dict[str, Any]],
+        documents: list[str] | None = None,
+    ):
+        """Add chunks, skipping ids that are already stored (as ChromaDB does)"""
+        with self._lock:
+            new = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._slots]
+            if len(new) < len(ids):
+                print(f"Skipping {len(ids) - len(new)} existing chunk ids")
+            self._write(
+                [ids[i] for i in new],
+                [embeddings[i] for i in new],
+                [metadatas[i] for i in new],
+                [documents[i] for i in new] if documents is not None else None,
+            )
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: Any,
+        metadatas: list[dict[str, Any]],
+        documents: list[str] | None = None,
+    ):
+        """Add chunks, overwriting stored chunks with the same ids in place"""
+        with self._lock:
+            self._write(ids, embeddings, metadatas, documents)
+
+    def _write(
+        self,
+        ids: list[str],
+        embeddings: Any,
+        metadatas: list[dict[str, Any]],
+        documents: list[str] | None,
+    ):
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+            self._conn.execute(
+                "INSERT INTO settings (key, value) VALUES ('dim', ?)", (str(self._dim),)
+            )
+            self._open_columns(INITIAL_CAPACITY)
+            self._course[:] = -1
+            self._sq_norms = np.zeros(INITIAL_CAPACITY, dtype=np.float32)
+            self._grow_codes(INITIAL_CAPACITY)
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"collection dimension {self._dim}"
+            )
+
+        # Existing ids keep their row, new ids take free rows, then new rows
+        new_ids = [
+            chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id not in self._slots
+        ]
+        self._reserve(max(0, len(new_ids) - len(self._free)))
+        for chunk_id in new_ids:
+            if self._free:
+                self._slots[chunk_id] = self._free.pop()
+            else:
+                self._slots[chunk_id] = self._size
+                self._size += 1
+        rows = np.array([self._slots[chunk_id] for chunk_id in ids], dtype=np.int64)
+
+        self._embeddings[rows] = vectors
+        self._set_derived(rows, vectors)
+        self._course[rows] = [
+            self._course_id(metadata.get("course_title") or "")
+            for metadata in metadatas
+        ]
+        self._lesson[rows] = [
+            -1 if metadata.get("lesson_number") is None else metadata["lesson_number"]
+            for metadata in metadatas
+        ]
+        self._embeddings.flush()
+        self._course.flush()
+        self._lesson.flush()
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO chunks (slot, id, document, metadata) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    int(row),
+                    chunk_id,
+                    documents[i] if documents is not None else None,
+                    json.dumps(metadata),
+                )
+                for i, (row, chunk_id, metadata) in enumerate(
+                    zip(rows, ids, metadatas, strict=True)
+                )
+            ],
+        )
+        self._conn.commit()
+
+    def _course_id(self, title: str) -> int:
+        """Integer id of a course title, assigned on first use"""
+        course_id = self._course_ids.get(title)
+        if course_id is None:
+            course_id = self._course_ids[title] = len(self._course_ids)
+            self._conn.execute(
+                "INSERT INTO courses (id, title) VALUES (?, ?)", (course_id, title)
+            )
+        return course_id
+
+    def _where_mask(self, where: dict[str, Any] | None) -> np.ndarray:
+        """Boolean mask of live rows matching a ChromaDB-style filter"""
+        mask = self._course[: self._size] >= 0
+        if not where:
+            return mask
+        conditions = where["$and"] if "$and" in where else [where]
+        for condition in conditions:
+            for field, value in condition.items():
+                if field == "course_title":
+                    course_id = self._course_ids.get(value)
+                    if course_id is None:
+                        return np.zeros(self._size, dtype=bool)
+                    mask &= self._course[: self._size] == course_id
+                elif field == "lesson_number":
+                    mask &= self._lesson[: self._size] == value
+                else:
+                    raise ValueError(f"Unsupported filter field: {field}")
+        return mask
+
+    def _records(self, rows: list[int]) -> dict[int, tuple[str, str, dict]]:
+        """Id, document and metadata of each row"""
+        records = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(rows), 500):
+            batch = rows[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for slot, chunk_id, document, metadata in self._conn.execute(
+                "SELECT slot, id, document, metadata FROM chunks "
+                f"WHERE slot IN ({placeholders})",
+                batch,
+            ):
+                records[slot] = (chunk_id, document, json.loads(metadata))
+        return records
+
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        include: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Get stored chunks by id and/or filter.
+
+        Returns:
+            ChromaDB-style result with "ids" and the included fields
+            ("documents" and "metadatas" by default, optionally "embeddings")
+        """
+        include = include if include is not None else ["documents", "metadatas"]
+        with self._lock:
+            if self._dim is None:
+                rows = []
+            else:
+                mask = self._where_mask(where)
+                if ids is not None:
+                    rows = [
+                        self._slots[chunk_id]
+                        for chunk_id in ids
+                        if chunk_id in self._slots
+                    ]
+                    rows = [row for row in rows if mask[row]]
+                else:
+                    rows = np.flatnonzero(mask).tolist()
+            records = self._records(rows)
+            embeddings = (
+                np.array(self._embeddings[rows]) if "embeddings" in include else None
+            )
+
+        return {
+            "ids": [records[row][0] for row in rows],
+            "documents": (
+                [records[row][1] for row in rows] if "documents" in include else None
+            ),
+            "metadatas": (
+                [records[row][2] for row in rows] if "metadatas" in include else None
+            ),
+            "embeddings": embeddings,
+        }
+
+    def query(
+        self,
+        query_embeddings: Any = None,
+        query_texts: list[str] | None = None,
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+        include: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Find the nearest chunks to each query by squared L2 distance.
+
+        Returns:
+            ChromaDB-style result with one list of ids, documents, metadatas and
+            distances per query, plus embeddings if included
+        """
+        if query_embeddings is None:
+            query_embeddings = self.embedding_function(query_texts)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+
+        with self._lock:
+            ranked_rows = [[] for _ in queries]
+            distances = [[] for _ in queries]
+            if self._dim is not None:
+                mask = self._where_mask(where)
+                k = min(n_results, int(mask.sum()))
+                if k:
+                    for i, (rows, scores) in enumerate(self._nearest(queries, mask, k)):
+                        ranked_rows[i] = rows.tolist()
+                        distances[i] = np.maximum(scores, 0).tolist()
+            records = self._records(
+                sorted({row for rows in ranked_rows for row in rows})
+            )
+            embeddings = None
+            if include and "embeddings" in include:
+                embeddings = [
+                    (
+                        np.array(self._embeddings[rows])
+                        if rows
+                        else np.zeros((0, self._dim or 0), dtype=np.float32)
+                    )
+                    for rows in ranked_rows
+                ]
+
+        return {
+            "ids": [[records[row][0] for row in rows] for rows in ranked_rows],
+            "documents": [[records[row][1] for row in rows] for rows in ranked_rows],
+            "metadatas": [[records[row][2] for row in rows] for rows in ranked_rows],
+            "distances": distances,
+            "embeddings": embeddings,
+        }
+
+    def _nearest(self, queries: np.ndarray, mask: np.ndarray, k: int):
+        """Yield the k nearest masked rows and their distances for each query"""
+        # |q - x|^2 = |q|^2 + |x|^2 - 2 q.x
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        if self.quantization == "none":
+            matrix = self._embeddings[: self._size]
+            scores = (
+                self._sq_norms[: self._size][None, :] - 2 * (queries @ matrix.T)
+            ) + query_norms[:, None]
+            scores[:, ~mask] = np.inf
+            for row_scores in scores:
+                yield _top_k(np.arange(self._size), row_scores, k)
+            return
+
+        candidates = min(k * self.rerank_factor, int(mask.sum()))
+        approximate = self._approximate_scores(queries)
+        approximate[:, ~mask] = np.inf
+        for query, query_norm, row_scores in zip(
+            queries, query_norms, approximate, strict=True
+        ):
+            rows = np.sort(np.argpartition(row_scores, candidates - 1)[:candidates])
+            # Re-score candidates against their full-precision rows
+            exact = self._sq_norms[rows] - 2 * (self._embeddings[rows] @ query)
+            yield _top_k(rows, exact + query_norm, k)
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """First-pass scores from the quantized codes (lower is nearer)"""
+        scores = np.empty((len(queries), self._size), dtype=np.float32)
+        if self.quantization == "binary":
+            query_codes = np.packbits(queries > 0, axis=1)
+        for start in range(0, self._size, QUANTIZED_BLOCK_ROWS):
+            end = min(start + QUANTIZED_BLOCK_ROWS, self._size)
+            codes = self._codes[start:end]
+            if self.quantization == "int8":
+                dots = (queries @ codes.T.astype(np.float32)) * self._scales[start:end]
+                scores[:, start:end] = self._sq_norms[start:end] - 2 * dots
+            else:
+                for i, query_code in enumerate(query_codes):
+                    scores[i, start:end] = np.bitwise_count(codes ^ query_code).sum(
+                        axis=1
+                    )
+        return scores
+
+    def delete(self, ids: list[str] | None = None, where: dict[str, Any] | None = None):
+        """Delete chunks by id and/or filter; their rows are reused by later writes"""
+        with self._lock:
+            if self._dim is None:
+                return
+            mask = self._where_mask(where)
+            if ids is not None:
+                candidates = [self._slots[i] for i in ids if i in self._slots]
+                rows = [row for row in candidates if mask[row]]
+            else:
+                rows = np.flatnonzero(mask).tolist()
+            if not rows:
+                return
+
+            self._course[rows] = -1
+            self._course.flush()
+            records = self._records(rows)
+            for row in rows:
+                del self._slots[records[row][0]]
+            self._free.extend(rows)
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE slot = ?", [(row,) for row in rows]
+            )
+            self._conn.commit()
+
+    def reset(self):
+        """Delete every chunk and the collection's files"""
+        with self._lock:
+            self._embeddings = self._course = self._lesson = None
+            self._conn.executescript(
+                "DELETE FROM chunks; DELETE FROM courses; DELETE FROM settings;"
+            )
+            self._conn.commit()
+            for name in ("embeddings.f32", "course.i32", "lesson.i32"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._load()
+
+    def close(self):
+        """Flush the memory-mapped columns and close the record database"""
+        with self._lock:
+            if self._embeddings is not None:
+                self._embeddings.flush()
+                self._course.flush()
+                self._lesson.flush()
+            self._conn.close()
+
+
+def _top_k(
+    rows: np.ndarray, scores: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """The k lowest-scoring rows and their scores, best first"""
+    top = np.argpartition(scores, k - 1)[:k]
+    top = top[np.argsort(scores[top], kind="stable")]
+    return rows[top], scores[top]
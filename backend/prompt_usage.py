@@ -0,0 +1,113 @@
+import threading
+from collections import Counter
+from typing import Any
+
+# Token counters reported in Anthropic's response.usage
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def prompt_tokens(usage: Any) -> int:
+    """Input tokens of a request, cached or not (non-integer counts are zero)"""
+    total = 0
+    for field in (
+        "input_tokens",
+        "cache_creation_input_tokens",
+        "cache_read_input_tokens",
+    ):
+        value = getattr(usage, field, None)
+        total += value if isinstance(value, int) else 0
+    return total
+
+
+class PromptUsage:
+    """Thread-safe token and latency counters of Messages API requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = dict.fromkeys(USAGE_FIELDS, 0)
+        self._requests = 0
+        self._cached_requests = 0  # Requests that read the prompt cache
+        self._latency = 0.0
+        self._cached_latency = 0.0
+        self._queries = 0  # Queries answered through the tool loop
+        self._tool_rounds = 0
+        self._loop_stops: Counter[str] = Counter()  # Why each tool loop ended
+
+    def record(self, usage: Any, seconds: float):
+        """
+        Add one response's usage to the counters.
+
+        Args:
+            usage: The response's usage object; missing or non-integer counts
+                are treated as zero
+            seconds: Time from sending the request to the complete response
+        """
+        counts = {}
+        for field in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            counts[field] = value if isinstance(value, int) else 0
+
+        with self._lock:
+            for field, value in counts.items():
+                self._totals[field] += value
+            self._requests += 1
+            self._latency += seconds
+            if counts["cache_read_input_tokens"]:
+                self._cached_requests += 1
+                self._cached_latency += seconds
+
+    def record_query(self, tool_rounds: int, stop_reason: str):
+        """
+        Add one query's tool loop to the counters.
+
+        Args:
+            tool_rounds: Rounds of tool calls made
+            stop_reason: "answered" when Claude answered on its own, otherwise
+                the limit that ended the loop
+        """
+        with self._lock:
+            self._queries += 1
+            self._tool_rounds += tool_rounds
+            self._loop_stops[stop_reason] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get token totals, cache hit rate, latencies and tool loop counters"""
+        with self._lock:
+            total_prompt = (
+                self._totals["input_tokens"]
+                + self._totals["cache_creation_input_tokens"]
+                + self._totals["cache_read_input_tokens"]
+            )
+            uncached = self._requests - self._cached_requests
+            return {
+                "requests": self._requests,
+                **self._totals,
+                "cache_read_ratio": (
+                    self._totals["cache_read_input_tokens"] / total_prompt
+                    if total_prompt
+                    else 0.0
+                ),
+                "mean_latency_ms": (
+                    self._latency / self._requests * 1000 if self._requests else 0.0
+                ),
+                "mean_cached_latency_ms": (
+                    self._cached_latency / self._cached_requests * 1000
+                    if self._cached_requests
+                    else 0.0
+                ),
+                "mean_uncached_latency_ms": (
+                    (self._latency - self._cached_latency) / uncached * 1000
+                    if uncached
+                    else 0.0
+                ),
+                "queries": self._queries,
+                "mean_tool_rounds": (
+                    self._tool_rounds / self._queries if self._queries else 0.0
+                ),
+                "loop_stops": dict(self._loop_stops),
+            }
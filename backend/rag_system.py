@@ -1,12 +1,31 @@
+import asyncio
+import multiprocessing
 import os
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
 from ai_generator import AIGenerator
-from document_processor import DocumentProcessor
-from models import Course
+from answer_cache import AnswerCache
+from async_vector_store import AsyncVectorStore
+from document_processor import DocumentProcessor, init_ingest_worker, parse_in_worker
+from ingest_manifest import IngestManifest, hash_file
+from models import Course, CourseChunk
 from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
 from session_manager import SessionManager
+from token_chunker import TokenChunker
 from vector_store import VectorStore
 
+# Document types picked up from the docs folder
+COURSE_FILE_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+def is_course_file(file_path: str) -> bool:
+    """Check whether a file has a supported course document extension"""
+    return file_path.lower().endswith(COURSE_FILE_EXTENSIONS)
+
 
 class RAGSystem:
     """Main orchestrator for the Retrieval-Augmented Generation system"""
@@ -15,24 +34,80 @@ class RAGSystem:
         self.config = config
 
         # Initialize core components
+        token_chunker = None
+        if config.CHUNK_MODE == "tokens":
+            token_chunker = TokenChunker.for_embedding_model(
+                config.EMBEDDING_MODEL,
+                config.CHUNK_MAX_TOKENS,
+                config.CHUNK_OVERLAP_TOKENS,
+            )
         self.document_processor = DocumentProcessor(
-            config.CHUNK_SIZE, config.CHUNK_OVERLAP
+            config.CHUNK_SIZE, config.CHUNK_OVERLAP, token_chunker
         )
         self.vector_store = VectorStore(
-            config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS
+            config.CHROMA_PATH,
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            config.EMBEDDING_CACHE_SIZE,
+            config.INGEST_BATCH_SIZE,
+            config.INGEST_QUEUE_SIZE,
+            config.QUERY_CACHE_SIZE,
+            config.SEARCH_MODE,
+            config.VECTOR_BACKEND,
+            config.EMBEDDING_QUANTIZATION,
+            config.QUANTIZATION_RERANK_FACTOR,
+            config.HNSW_CONFIG,
+            config.MMR_LAMBDA,
+            config.MMR_FETCH_FACTOR,
+            config.MERGE_ADJACENT_CHUNKS,
+        )
+        # Request handlers use this to keep vector store calls off the event loop
+        self.async_vector_store = AsyncVectorStore(
+            self.vector_store, config.VECTOR_STORE_WORKERS
         )
         self.ai_generator = AIGenerator(
-            config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            config.PROMPT_CACHING,
+            config.TOOL_WORKERS,
+            config.MAX_TOOL_ROUNDS,
+            config.TOOL_DEADLINE,
+            config.TOOL_INPUT_TOKEN_BUDGET,
         )
         self.session_manager = SessionManager(config.MAX_HISTORY)
 
+        # Answers to earlier questions, reused for near-duplicates (None = off)
+        self.answer_cache = None
+        if config.ANSWER_CACHE_SIZE > 0:
+            self.answer_cache = AnswerCache(
+                config.ANSWER_CACHE_SIZE,
+                config.ANSWER_CACHE_THRESHOLD,
+                config.ANSWER_CACHE_TTL,
+            )
+
+        # Serializes ingestion from startup, the docs watcher and API calls
+        self.ingest_lock = threading.RLock()
+
+        # Track indexed files so unchanged ones are skipped before parsing
+        self.manifest = IngestManifest(
+            os.path.join(config.CHROMA_PATH, "ingest_manifest.json")
+        )
+
         # Initialize search tools
         self.tool_manager = ToolManager()
-        self.search_tool = CourseSearchTool(self.vector_store)
-        self.outline_tool = CourseOutlineTool(self.vector_store)
+        self.search_tool = CourseSearchTool(self.vector_store, self.async_vector_store)
+        self.outline_tool = CourseOutlineTool(
+            self.vector_store, self.async_vector_store
+        )
         self.tool_manager.register_tool(self.search_tool)
         self.tool_manager.register_tool(self.outline_tool)
 
+    def warmup(self):
+        """Load the embedding model and exercise the search path once"""
+        start = time.perf_counter()
+        self.vector_store.warmup()
+        print(f"Warmed up embedding model in {time.perf_counter() - start:.2f}s")
+
     def add_course_document(self, file_path: str) -> tuple[Course, int]:
         """
         Add a single course document to the knowledge base.
@@ -61,69 +136,303 @@ class RAGSystem:
             return None, 0
 
     def add_course_folder(
-        self, folder_path: str, clear_existing: bool = False
+        self,
+        folder_path: str,
+        clear_existing: bool = False,
+        workers: int | None = None,
     ) -> tuple[int, int]:
         """
         Add all course documents from a folder.
 
+        Documents are parsed and chunked in a pool of worker processes when
+        more than one worker is requested; the calling process stays the single
+        writer that embeds each course's chunks and pushes them into the
+        vector store. Files whose size and mtime (or content hash) match the
+        ingest manifest are skipped without being parsed, and files that
+        changed since they were indexed are updated chunk by chunk.
+
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
+            workers: Number of parsing processes (defaults to config.INGEST_WORKERS)
 
         Returns:
             Tuple of (total courses added, total chunks created)
         """
-        total_courses = 0
-        total_chunks = 0
+        with self.ingest_lock:
+            # Clear existing data if requested
+            if clear_existing:
+                print("Clearing existing data for fresh rebuild...")
+                self.vector_store.clear_all_data()
+                self.manifest.clear()
+
+            if not os.path.exists(folder_path):
+                print(f"Folder {folder_path} does not exist")
+                return 0, 0
+
+            file_paths = [
+                os.path.join(folder_path, file_name)
+                for file_name in os.listdir(folder_path)
+            ]
+            return self.index_files(file_paths, workers)
+
+    def index_files(
+        self, file_paths: list[str], workers: int | None = None
+    ) -> tuple[int, int]:
+        """
+        Index new or changed course documents.
 
-        # Clear existing data if requested
-        if clear_existing:
-            print("Clearing existing data for fresh rebuild...")
-            self.vector_store.clear_all_data()
+        Unsupported and unchanged files are skipped; see add_course_folder.
 
-        if not os.path.exists(folder_path):
-            print(f"Folder {folder_path} does not exist")
-            return 0, 0
+        Args:
+            file_paths: Paths of the course documents to index
+            workers: Number of parsing processes (defaults to config.INGEST_WORKERS)
+
+        Returns:
+            Tuple of (total courses added or updated, total chunks created)
+        """
+        with self.ingest_lock:
+            return self._index_files(file_paths, workers)
+
+    def _index_files(
+        self, file_paths: list[str], workers: int | None
+    ) -> tuple[int, int]:
+        """Index course documents; the caller holds the ingest lock"""
+        total_courses = 0
+        total_chunks = 0
 
         # Get existing course titles to avoid re-processing
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
 
-        # Process each file in the folder
-        for file_name in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(
-                (".pdf", ".docx", ".txt")
-            ):
+        # Collect the course documents that are new or changed since last indexed
+        pending = {}  # file path -> (stat, content hash, previous manifest entry)
+        for file_path in file_paths:
+            file_name = os.path.basename(file_path)
+            if os.path.isfile(file_path) and is_course_file(file_path):
                 try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = (
-                        self.document_processor.process_course_document(file_path)
+                    stat = os.stat(file_path)
+                    entry = self.manifest.get(file_path)
+                    if entry and entry.course_title in existing_course_titles:
+                        # Unchanged size and mtime - skip without reading the file
+                        if entry.matches_stat(stat):
+                            continue
+                        content_hash = hash_file(file_path)
+                        if content_hash == entry.content_hash:
+                            # Touched but not modified - just refresh size/mtime
+                            self.manifest.record(
+                                file_path,
+                                stat,
+                                content_hash,
+                                entry.course_title,
+                                entry.chunk_ids,
+                            )
+                            continue
+                    else:
+                        entry = None
+                        content_hash = hash_file(file_path)
+                    pending[file_path] = (stat, content_hash, entry)
+                except OSError as e:
+                    print(f"Error processing {file_name}: {e}")
+
+        if workers is None:
+            workers = self.config.INGEST_WORKERS
+
+        # Parse documents (possibly in parallel) and write them one at a time
+        for file_path, course, chunk_batches, parse_time in self._parse_documents(
+            list(pending), workers
+        ):
+            file_name = os.path.basename(file_path)
+            stat, content_hash, previous = pending[file_path]
+            write_start = time.perf_counter()
+            index_time = 0.0
+            try:
+                if not course:
+                    continue
+
+                if previous and not previous.chunk_ids:
+                    # The file was skipped as a duplicate and never owned its
+                    # course - handle it like a new file
+                    previous = None
+
+                if previous and previous.course_title != course.title:
+                    # The file now holds a different course - replace the old one
+                    self.vector_store.delete_course(previous.course_title)
+                    existing_course_titles.discard(previous.course_title)
+                    previous = None
+
+                chunk_ids = []
+                if previous:
+                    # The file changed since it was indexed - apply only the delta
+                    course_chunks = [
+                        chunk for batch in chunk_batches for chunk in batch
+                    ]
+                    index_start = time.perf_counter()
+                    delta = self.vector_store.update_course(course, course_chunks)
+                    index_time = time.perf_counter() - index_start
+                    chunk_ids = [chunk.vector_id() for chunk in course_chunks]
+                    total_courses += 1
+                    total_chunks += delta["embedded"] + delta["reused"]
+                    summary = (
+                        f"Updated changed course: {course.title} "
+                        f"({delta['embedded']} embedded, {delta['reused']} reused, "
+                        f"{delta['unchanged']} unchanged, {delta['deleted']} deleted)"
                     )
+                elif course.title not in existing_course_titles:
+                    # This is a new course - stream its chunks into the vector store
+                    # as lessons are parsed, then add the completed course metadata
+                    def iter_chunks(chunk_batches=chunk_batches, chunk_ids=chunk_ids):
+                        for batch in chunk_batches:
+                            chunk_ids.extend(chunk.vector_id() for chunk in batch)
+                            yield from batch
 
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
+                    try:
+                        # Streamed lessons are parsed while the pipeline embeds
+                        # and writes, so their parse time counts as index time
+                        index_start = time.perf_counter()
+                        self.vector_store.add_course_content(iter_chunks())
                         self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(
-                            f"Added new course: {course.title} ({len(course_chunks)} chunks)"
-                        )
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
-                except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
+                        index_time = time.perf_counter() - index_start
+                    except Exception:
+                        # Don't leave a partially indexed course behind
+                        self.vector_store.delete_course(course.title)
+                        raise
+                    total_courses += 1
+                    total_chunks += len(chunk_ids)
+                    existing_course_titles.add(course.title)
+                    summary = (
+                        f"Added new course: {course.title} ({len(chunk_ids)} chunks)"
+                    )
+                else:
+                    # Only the header has been read, so the body is never parsed
+                    print(f"Course already exists: {course.title} - skipping")
+                    summary = None
+
+                if summary:
+                    parse_time += time.perf_counter() - write_start - index_time
+                    print(
+                        f"{summary} [parse {parse_time:.2f}s, index {index_time:.2f}s]"
+                    )
+
+                self.manifest.record(
+                    file_path, stat, content_hash, course.title, chunk_ids
+                )
+            except Exception as e:
+                print(f"Error processing {file_name}: {e}")
+
+        try:
+            self.manifest.save()
+        except OSError as e:
+            print(f"Error saving ingest manifest: {e}")
+
+        if total_courses:
+            cache_summary = self.vector_store.describe_embedding_cache()
+            if cache_summary:
+                print(cache_summary)
 
         return total_courses, total_chunks
 
-    def query(
-        self, query: str, session_id: str | None = None
-    ) -> tuple[str, list[str]]:
+    def remove_files(self, file_paths: list[str]) -> list[str]:
+        """
+        Remove the courses indexed from files that were deleted.
+
+        A course is kept if another indexed file still holds its chunks.
+        Otherwise it is deleted and re-indexed from any remaining file that
+        was skipped as a duplicate of it (same course title).
+
+        Args:
+            file_paths: Paths of the deleted course documents
+
+        Returns:
+            Titles of the removed courses that no remaining file holds
+        """
+        removed = []
+        with self.ingest_lock:
+            for file_path in file_paths:
+                entry = self.manifest.remove(file_path)
+                if not entry:
+                    continue
+                duplicates = [
+                    path
+                    for path, other in self.manifest.entries.items()
+                    if other.course_title == entry.course_title
+                ]
+                if any(self.manifest.entries[path].chunk_ids for path in duplicates):
+                    continue
+                # Forget files skipped as duplicates so they index as new files
+                for path in duplicates:
+                    self.manifest.remove(path)
+                try:
+                    self.vector_store.delete_course(entry.course_title)
+                    print(f"Removed deleted course: {entry.course_title}")
+                    if not duplicates or not self._index_files(duplicates, None)[0]:
+                        removed.append(entry.course_title)
+                except Exception as e:
+                    print(f"Error removing {os.path.basename(file_path)}: {e}")
+
+            try:
+                self.manifest.save()
+            except OSError as e:
+                print(f"Error saving ingest manifest: {e}")
+
+        return removed
+
+    def _parse_documents(
+        self, file_paths: list[str], workers: int
+    ) -> Iterator[tuple[str, Course | None, Iterable[list[CourseChunk]], float]]:
+        """
+        Parse course documents, yielding results in input order.
+
+        In-process parsing streams each document: only its header has been read
+        when it is yielded, and its chunks are produced lesson by lesson as the
+        batches are consumed. Worker processes return each document's chunks as
+        a single batch.
+
+        Args:
+            file_paths: Paths of the course documents to parse
+            workers: Number of parsing processes (1 parses in-process)
+
+        Yields:
+            Tuples of (file path, Course object, chunk batches, parse time in seconds);
+            the course is None when the document could not be parsed
+        """
+        if workers <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                start = time.perf_counter()
+                try:
+                    course, chunk_batches = (
+                        self.document_processor.iter_course_document(file_path)
+                    )
+                except Exception as e:
+                    print(f"Error processing {os.path.basename(file_path)}: {e}")
+                    course, chunk_batches = None, []
+                yield file_path, course, chunk_batches, time.perf_counter() - start
+            return
+
+        # Spawn (rather than fork) so workers don't inherit the vector store's threads
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(file_paths)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_ingest_worker,
+            initargs=(self.document_processor,),
+        ) as executor:
+            futures = [
+                executor.submit(parse_in_worker, file_path) for file_path in file_paths
+            ]
+            for file_path, future in zip(file_paths, futures, strict=True):
+                try:
+                    course, course_chunks, parse_time = future.result()
+                except Exception as e:
+                    print(f"Error processing {os.path.basename(file_path)}: {e}")
+                    course, course_chunks, parse_time = None, [], 0.0
+                yield file_path, course, [course_chunks], parse_time
+
+    def query(self, query: str, session_id: str | None = None) -> tuple[str, list[str]]:
         """
         Process a user query using the RAG system with tool-based search.
 
+        Questions asked without conversation history are answered from the
+        answer cache when a similar enough question was answered before.
+
         Args:
             query: User's question
             session_id: Optional session ID for conversation context
@@ -137,21 +446,31 @@ class RAGSystem:
         # Get conversation history if session exists
         history = None
         if session_id:
-            history = self.session_manager.get_conversation_history(session_id)
-
-        # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
-            query=prompt,
-            conversation_history=history,
-            tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager,
-        )
+            history = self.session_manager.get_messages(session_id)
 
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
+        # Reuse the answer to a near-identical question, unless the answer
+        # could depend on the conversation so far
+        cache_key, cached = None, None
+        if self.answer_cache is not None and not history:
+            cache_key, cached = self._lookup_answer(query)
+            if cached:
+                response, sources = cached
+                if session_id:
+                    self.session_manager.add_exchange(session_id, query, response)
+                return response, sources
 
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+        # Generate response using AI with tools, collecting the sources of
+        # every search it makes
+        with self.tool_manager.collect_sources() as sources:
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+            )
+
+        if cache_key is not None:
+            self.answer_cache.put(cache_key[0], response, sources, *cache_key[1:])
 
         # Update conversation history
         if session_id:
@@ -160,9 +479,185 @@ class RAGSystem:
         # Return response with sources from tool searches
         return response, sources
 
+    async def aquery(
+        self, query: str, session_id: str | None = None
+    ) -> tuple[str, list[str]]:
+        """
+        Process a user query without blocking the event loop.
+
+        Same as query, but the AI call is async and tools search through the
+        async vector store. Sources are collected per call, so concurrent
+        queries don't see each other's sources.
+        """
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        history = None
+        if session_id:
+            history = self.session_manager.get_messages(session_id)
+
+        cache_key, cached = None, None
+        if self.answer_cache is not None and not history:
+            cache_key, cached = await self._alookup_answer(query)
+            if cached:
+                response, sources = cached
+                if session_id:
+                    self.session_manager.add_exchange(session_id, query, response)
+                return response, sources
+
+        with self.tool_manager.collect_sources() as sources:
+            response = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+            )
+
+        if cache_key is not None:
+            self.answer_cache.put(cache_key[0], response, sources, *cache_key[1:])
+
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
+
+        return response, sources
+
+    async def astream_query(
+        self, query: str, session_id: str | None = None
+    ) -> AsyncIterator[tuple[str, list | str]]:
+        """
+        Process a user query, streaming the answer as it is generated.
+
+        Yields ("token", text) for each piece of the answer. When Claude
+        searches, ("sources", sources) is yielded as soon as the tools have
+        run, before the answer streams; any text streamed before it is not
+        part of the answer. A cached answer comes as its sources and a
+        single token. The exchange is added to the session once the answer
+        is complete.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Yields:
+            (event type, payload) tuples
+        """
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        history = None
+        if session_id:
+            history = self.session_manager.get_messages(session_id)
+
+        cache_key, cached = None, None
+        if self.answer_cache is not None and not history:
+            cache_key, cached = await self._alookup_answer(query)
+            if cached:
+                response, sources = cached
+                yield "sources", sources
+                yield "token", response
+                if session_id:
+                    self.session_manager.add_exchange(session_id, query, response)
+                return
+
+        answer = []
+        with self.tool_manager.collect_sources() as sources:
+            async for event, text in self.ai_generator.astream_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+            ):
+                if event == "tool_results":
+                    yield "sources", list(sources)
+                    answer.clear()
+                    continue
+                answer.append(text)
+                yield "token", text
+
+        response = "".join(answer)
+        if cache_key is not None:
+            self.answer_cache.put(cache_key[0], response, sources, *cache_key[1:])
+
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
+
+    def _lookup_answer(self, query: str) -> tuple[tuple | None, tuple | None]:
+        """
+        Look up a cached answer to a query.
+
+        Returns:
+            ((query embedding, index version, scope) to cache the answer under,
+            or None if the query could not be embedded; (answer, sources) or
+            None)
+        """
+        try:
+            version = self.vector_store.index_version
+            embedding = self.vector_store.embed_query(query)
+            scope = self._answer_scope(
+                query, self.vector_store.closest_course(embedding)
+            )
+            return (embedding, version, scope), self.answer_cache.lookup(
+                embedding, version, scope
+            )
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            return None, None
+
+    async def _alookup_answer(self, query: str) -> tuple[tuple | None, tuple | None]:
+        """Look up a cached answer, embedding on the vector store's thread pool"""
+        try:
+            version = self.vector_store.index_version
+            embedding = await self.async_vector_store.embed_query(query)
+            scope = self._answer_scope(
+                query, await self.async_vector_store.closest_course(embedding)
+            )
+            return (embedding, version, scope), self.answer_cache.lookup(
+                embedding, version, scope
+            )
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            return None, None
+
+    @staticmethod
+    def _answer_scope(query: str, course: str | None) -> tuple:
+        """
+        Details a cached answer must match exactly besides the embedding.
+
+        Questions that differ only in a number ("lesson 1" vs "lesson 2") or
+        the course they name embed almost identically, so the numbers in the
+        question and its closest course are compared verbatim.
+        """
+        return tuple(re.findall(r"\d+", query)), course
+
     def get_course_analytics(self) -> dict:
         """Get analytics about the course catalog"""
         return {
             "total_courses": self.vector_store.get_course_count(),
             "course_titles": self.vector_store.get_existing_course_titles(),
         }
+
+    async def aget_course_analytics(self) -> dict:
+        """Get analytics about the course catalog without blocking the event loop"""
+        return {
+            "total_courses": await self.async_vector_store.get_course_count(),
+            "course_titles": await self.async_vector_store.get_existing_course_titles(),
+        }
+
+    async def aget_cache_stats(self) -> dict[str, dict]:
+        """
+        Get the cache counters without blocking the event loop.
+
+        Embedding cache stats query SQLite under a lock ingestion holds while
+        it reads and writes the cache, so they run on a worker thread.
+        """
+        return await asyncio.to_thread(self.get_cache_stats)
+
+    def get_cache_stats(self) -> dict[str, dict]:
+        """Get hit/miss counters of the system's caches and prompt cache usage"""
+        stats = {
+            "query_embeddings": self.vector_store.query_cache.stats(),
+            "prompt": self.ai_generator.usage.stats(),
+        }
+        if self.answer_cache is not None:
+            stats["answers"] = self.answer_cache.stats()
+        if self.vector_store.embedding_cache:
+            stats["chunk_embeddings"] = self.vector_store.embedding_cache.stats()
+        return stats
@@ -0,0 +1,132 @@
+import re
+from typing import Any
+
+import numpy as np
+
+# Lesson context DocumentProcessor prepends to some chunks
+CONTEXT_PREFIX_RE = re.compile(r"^(?:Course .+? )?Lesson \d+ content: ")
+
+
+def unit_rows(vectors: Any) -> np.ndarray:
+    """Vectors as float32 rows scaled to unit length"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def select_passages(
+    relevance: np.ndarray,
+    vectors: Any,
+    metadatas: list[dict[str, Any]],
+    limit: int,
+    lambda_mult: float = 0.7,
+    merge_adjacent: bool = True,
+    max_merged: int = 3,
+) -> list[list[int]]:
+    """
+    Pick up to limit passages from ranked candidates by maximal marginal relevance.
+
+    Each step picks the candidate maximizing
+    lambda_mult * relevance - (1 - lambda_mult) * (max similarity to the picks
+    so far), using one precomputed similarity matrix. With merge_adjacent, a
+    hit (one of the limit most relevant candidates) that is the neighbouring
+    chunk (chunk_index +/- 1, same course and lesson) of an earlier passage
+    joins that passage instead of taking a slot, up to max_merged chunks per
+    passage. Selection stops once limit passages have been picked.
+
+    Args:
+        relevance: Relevance of each candidate to the query (higher is better)
+        vectors: Candidate embeddings, used for candidate-candidate similarity
+        metadatas: Candidate metadata with course_title, lesson_number and
+            chunk_index
+        limit: Maximum number of passages
+        lambda_mult: Relevance weight; 1.0 ranks by relevance alone
+        merge_adjacent: Whether to merge neighbouring chunks into passages
+        max_merged: Maximum chunks in a merged passage
+
+    Returns:
+        Candidate indexes of each passage, in chunk order, best passage first
+    """
+    count = len(metadatas)
+    if not count or limit <= 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    hits = np.zeros(count, dtype=bool)
+    hits[np.argsort(-relevance, kind="stable")[:limit]] = True
+
+    unit = unit_rows(vectors)
+    similarity = unit @ unit.T
+    scores = relevance * lambda_mult
+    max_similarity = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+
+    passages: list[list[int]] = []
+    while available.any() and len(passages) < limit:
+        mmr = np.where(available, scores - (1 - lambda_mult) * max_similarity, -np.inf)
+        pick = int(np.argmax(mmr))
+        available[pick] = False
+        max_similarity = np.maximum(max_similarity, similarity[pick])
+
+        passage = None
+        if merge_adjacent and hits[pick]:
+            passage = _adjacent_passage(passages, metadatas, pick, max_merged)
+        if passage is not None:
+            passage.append(pick)
+            passage.sort(key=lambda i: metadatas[i].get("chunk_index", 0))
+        else:
+            passages.append([pick])
+
+    return passages
+
+
+def _adjacent_passage(
+    passages: list[list[int]],
+    metadatas: list[dict[str, Any]],
+    candidate: int,
+    max_merged: int,
+) -> list[int] | None:
+    """The passage the candidate's chunk directly precedes or follows, if any"""
+    meta = metadatas[candidate]
+    index = meta.get("chunk_index")
+    if index is None:
+        return None
+    for passage in passages:
+        if len(passage) >= max_merged:
+            continue
+        first = metadatas[passage[0]]
+        last = metadatas[passage[-1]]
+        if (first.get("course_title"), first.get("lesson_number")) != (
+            meta.get("course_title"),
+            meta.get("lesson_number"),
+        ):
+            continue
+        if index in (first.get("chunk_index", 0) - 1, last.get("chunk_index", 0) + 1):
+            return passage
+    return None
+
+
+def merge_passage_text(texts: list[str]) -> str:
+    """
+    Join consecutive chunk texts, dropping the text they overlap by.
+
+    Chunks repeat the last sentences of the previous chunk, so the longest
+    whole-word prefix of each chunk that ends the previous one is removed,
+    along with the lesson context prefix of chunks after the first.
+    """
+    merged = texts[0]
+    previous = texts[0]
+    for text in texts[1:]:
+        text = CONTEXT_PREFIX_RE.sub("", text, count=1)
+        overlap = 0
+        for size in range(min(len(previous), len(text)), 0, -1):
+            if (
+                previous.endswith(text[:size])
+                and (size == len(text) or text[size].isspace())
+                and (size == len(previous) or previous[-size - 1].isspace())
+            ):
+                overlap = size
+                break
+        merged += text[overlap:] if overlap else " " + text
+        previous = text
+    return merged
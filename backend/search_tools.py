@@ -1,8 +1,37 @@
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
+from async_vector_store import AsyncVectorStore
+from models import Course
 from vector_store import SearchResults, VectorStore
 
+# Sources found by tool calls, scoped to the request being answered
+current_sources: ContextVar[list | None] = ContextVar("current_sources", default=None)
+_sources_lock = threading.Lock()
+
+
+def add_sources(sources: list[dict[str, str | None]]) -> bool:
+    """
+    Add sources to the current request's collector, skipping duplicates.
+
+    Searches of one request may run concurrently on several threads, so the
+    collector is only changed under a lock.
+
+    Returns:
+        False if no collector is active
+    """
+    collected = current_sources.get()
+    if collected is None:
+        return False
+    with _sources_lock:
+        collected.extend(source for source in sources if source not in collected)
+    return True
+
 
 class Tool(ABC):
     """Abstract base class for all tools"""
@@ -17,12 +46,19 @@ class Tool(ABC):
         """Execute the tool with given parameters"""
         pass
 
+    async def aexecute(self, **kwargs) -> str:
+        """Execute the tool without blocking the event loop"""
+        return await asyncio.to_thread(self.execute, **kwargs)
+
 
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
 
-    def __init__(self, vector_store: VectorStore):
+    def __init__(
+        self, vector_store: VectorStore, async_store: AsyncVectorStore | None = None
+    ):
         self.store = vector_store
+        self.async_store = async_store
         self.last_sources = []  # Track sources from last search
 
     def get_tool_definition(self) -> dict[str, Any]:
@@ -73,6 +109,54 @@ class CourseSearchTool(Tool):
             query=query, course_name=course_name, lesson_number=lesson_number
         )
 
+        message = self._empty_message(results, course_name, lesson_number)
+        if message:
+            return message
+
+        # Format and return results
+        return self._format_results(results)
+
+    async def aexecute(
+        self,
+        query: str,
+        course_name: str | None = None,
+        lesson_number: int | None = None,
+    ) -> str:
+        """
+        Execute the search on the async vector store's thread pool.
+
+        Sources go to the current request's collector (see
+        ToolManager.collect_sources); without one they are not kept.
+        """
+        if not self.async_store:
+            return await super().aexecute(
+                query=query, course_name=course_name, lesson_number=lesson_number
+            )
+
+        results = await self.async_store.search(
+            query=query, course_name=course_name, lesson_number=lesson_number
+        )
+        message = self._empty_message(results, course_name, lesson_number)
+        if message:
+            return message
+
+        lesson_links = await self.async_store.get_lesson_links(
+            [
+                (meta.get("course_title", "unknown"), meta.get("lesson_number"))
+                for meta in results.metadata
+            ]
+        )
+        text, sources = self._build_results(results, lesson_links)
+        add_sources(sources)
+        return text
+
+    def _empty_message(
+        self,
+        results: SearchResults,
+        course_name: str | None,
+        lesson_number: int | None,
+    ) -> str | None:
+        """Message to return instead of results on errors or no matches"""
         # Handle errors
         if results.error:
             return results.error
@@ -86,15 +170,40 @@ class CourseSearchTool(Tool):
                 filter_info += f" in lesson {lesson_number}"
             return f"No relevant content found{filter_info}."
 
-        # Format and return results
-        return self._format_results(results)
+        return None
 
     def _format_results(self, results: SearchResults) -> str:
         """Format search results with course and lesson context"""
+        # Get lesson links if lesson numbers are available
+        lesson_links = [
+            (
+                self.store.get_lesson_link(
+                    meta.get("course_title", "unknown"), meta["lesson_number"]
+                )
+                if meta.get("lesson_number") is not None
+                else None
+            )
+            for meta in results.metadata
+        ]
+        text, sources = self._build_results(results, lesson_links)
+
+        # Store structured sources for retrieval; last_sources is shared by
+        # all requests, so it is only used outside a source collector
+        if not add_sources(sources):
+            self.last_sources = sources
+
+        return text
+
+    def _build_results(
+        self, results: SearchResults, lesson_links: list[str | None]
+    ) -> tuple[str, list[dict[str, str | None]]]:
+        """Formatted results text and the structured sources for the UI"""
         formatted = []
         sources = []  # Track structured sources for the UI
 
-        for doc, meta in zip(results.documents, results.metadata, strict=False):
+        for doc, meta, lesson_link in zip(
+            results.documents, results.metadata, lesson_links, strict=False
+        ):
             course_title = meta.get("course_title", "unknown")
             lesson_num = meta.get("lesson_number")
 
@@ -109,28 +218,23 @@ class CourseSearchTool(Tool):
             if lesson_num is not None:
                 source_text += f" - Lesson {lesson_num}"
 
-            # Get lesson link if lesson number is available
-            lesson_link = None
-            if lesson_num is not None:
-                lesson_link = self.store.get_lesson_link(course_title, lesson_num)
-
             # Create structured source object
             source_obj = {"text": source_text, "link": lesson_link}
             sources.append(source_obj)
 
             formatted.append(f"{header}\n{doc}")
 
-        # Store structured sources for retrieval
-        self.last_sources = sources
-
-        return "\n\n".join(formatted)
+        return "\n\n".join(formatted), sources
 
 
 class CourseOutlineTool(Tool):
     """Tool for getting course outlines with metadata"""
 
-    def __init__(self, vector_store: VectorStore):
+    def __init__(
+        self, vector_store: VectorStore, async_store: AsyncVectorStore | None = None
+    ):
         self.store = vector_store
+        self.async_store = async_store
 
     def get_tool_definition(self) -> dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -160,48 +264,48 @@ class CourseOutlineTool(Tool):
             Formatted course outline or error message
         """
 
-        # Resolve course name using semantic search
+        # Resolve course name using the in-memory course resolver
         resolved_title = self.store._resolve_course_name(course_name)
         if not resolved_title:
             return f"No course found matching '{course_name}'"
 
-        # Get course metadata from catalog
-        try:
-            results = self.store.course_catalog.get(ids=[resolved_title])
-            if not results or not results.get("metadatas") or not results["metadatas"]:
-                return f"Course metadata not found for '{resolved_title}'"
+        # Get course metadata from the cached catalog
+        course = self.store.get_course(resolved_title)
+        if not course:
+            return f"Course metadata not found for '{resolved_title}'"
+
+        return self._format_outline(course)
 
-            metadata = results["metadatas"][0]
-            return self._format_outline(metadata)
+    async def aexecute(self, course_name: str) -> str:
+        """Execute the outline tool on the async vector store's thread pool"""
+        if not self.async_store:
+            return await super().aexecute(course_name=course_name)
 
-        except Exception as e:
-            return f"Error retrieving course outline: {str(e)}"
+        resolved_title = await self.async_store.resolve_course_name(course_name)
+        if not resolved_title:
+            return f"No course found matching '{course_name}'"
 
-    def _format_outline(self, metadata: dict[str, Any]) -> str:
-        """Format course outline from metadata"""
-        import json
+        course = await self.async_store.get_course(resolved_title)
+        if not course:
+            return f"Course metadata not found for '{resolved_title}'"
 
-        title = metadata.get("title", "Unknown Course")
-        course_link = metadata.get("course_link", "No link available")
-        instructor = metadata.get("instructor", "Unknown Instructor")
+        return self._format_outline(course)
+
+    def _format_outline(self, course: Course) -> str:
+        """Format course outline from catalog metadata"""
+        course_link = course.course_link or "No link available"
+        instructor = course.instructor or "Unknown Instructor"
 
         # Start building the outline
-        outline = f"Course: {title}\n"
+        outline = f"Course: {course.title}\n"
         outline += f"Instructor: {instructor}\n"
         outline += f"Course Link: {course_link}\n\n"
 
-        # Parse and format lessons
-        lessons_json = metadata.get("lessons_json")
-        if lessons_json:
-            try:
-                lessons = json.loads(lessons_json)
-                outline += "Lessons:\n"
-                for lesson in lessons:
-                    lesson_num = lesson.get("lesson_number", "?")
-                    lesson_title = lesson.get("lesson_title", "Unknown Lesson")
-                    outline += f"  Lesson {lesson_num}: {lesson_title}\n"
-            except json.JSONDecodeError:
-                outline += "Lessons: Unable to parse lesson information\n"
+        # Format lessons
+        if course.lessons:
+            outline += "Lessons:\n"
+            for lesson in course.lessons:
+                outline += f"  Lesson {lesson.lesson_number}: {lesson.title}\n"
         else:
             outline += "Lessons: No lesson information available\n"
 
@@ -233,6 +337,30 @@ class ToolManager:
 
         return self.tools[tool_name].execute(**kwargs)
 
+    async def aexecute_tool(self, tool_name: str, **kwargs) -> str:
+        """Execute a tool by name without blocking the event loop"""
+        if tool_name not in self.tools:
+            return f"Tool '{tool_name}' not found"
+
+        return await self.tools[tool_name].aexecute(**kwargs)
+
+    @contextmanager
+    def collect_sources(self) -> Iterator[list]:
+        """
+        Collect the sources of tool calls made inside the block.
+
+        Yields a list that holds the sources of every search made in the
+        block, without duplicates; concurrent requests each get their own list.
+        Tools executed on other threads must run in a copy of the block's
+        context (contextvars.copy_context) to be collected.
+        """
+        sources = []
+        token = current_sources.set(sources)
+        try:
+            yield sources
+        finally:
+            current_sources.reset(token)
+
     def get_last_sources(self) -> list:
         """Get sources from the last search operation"""
         # Check all tools for last_sources attribute
@@ -43,21 +43,14 @@ class SessionManager:
         self.add_message(session_id, "user", user_message)
         self.add_message(session_id, "assistant", assistant_message)
 
-    def get_conversation_history(self, session_id: str | None) -> str | None:
-        """Get formatted conversation history for a session"""
-        if not session_id or session_id not in self.sessions:
+    def get_messages(self, session_id: str | None) -> list[dict[str, str]] | None:
+        """Get a session's history as API messages ({role, content} dicts)"""
+        if not session_id or not self.sessions.get(session_id):
             return None
-
-        messages = self.sessions[session_id]
-        if not messages:
-            return None
-
-        # Format messages for context
-        formatted_messages = []
-        for msg in messages:
-            formatted_messages.append(f"{msg.role.title()}: {msg.content}")
-
-        return "\n".join(formatted_messages)
+        return [
+            {"role": msg.role, "content": msg.content}
+            for msg in self.sessions[session_id]
+        ]
 
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
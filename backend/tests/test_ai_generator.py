@@ -1,9 +1,11 @@
 import unittest
 import sys
 import os
+import time
+import asyncio
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from ai_generator import AIGenerator
 
 
@@ -61,12 +63,24 @@ class TestAIGenerator(unittest.TestCase):
         ai_gen = AIGenerator(self.api_key, self.model)
         
         # Generate response with history
-        history = "Previous conversation context"
+        history = [
+            {"role": "user", "content": "Previous question"},
+            {"role": "assistant", "content": "Previous answer"},
+        ]
         result = ai_gen.generate_response("Follow up question", conversation_history=history)
 
-        # Verify system prompt includes history
+        # Verify history is sent as messages before the question, and the
+        # system prompt stays the same cached prefix
         call_args = mock_client.messages.create.call_args[1]
-        self.assertIn(history, call_args["system"])
+        messages = call_args["messages"]
+        self.assertEqual([m["role"] for m in messages], ["user", "assistant", "user"])
+        self.assertEqual(messages[0]["content"], "Previous question")
+        self.assertEqual(messages[1]["content"][0]["text"], "Previous answer")
+        self.assertEqual(messages[1]["content"][0]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(messages[2]["content"], "Follow up question")
+        self.assertEqual(call_args["system"][0]["text"], AIGenerator.SYSTEM_PROMPT)
+        self.assertEqual(call_args["system"][0]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(history[1]["content"], "Previous answer")  # Not modified
 
     @patch('ai_generator.anthropic.Anthropic')
     def test_generate_response_with_tools_no_tool_use(self, mock_anthropic):
@@ -216,7 +230,7 @@ class TestAIGenerator(unittest.TestCase):
         self.assertIn("course materials", system_prompt.lower())
         self.assertIn("search_course_content", system_prompt)
         self.assertIn("get_course_outline", system_prompt)
-        self.assertIn("one tool use per query maximum", system_prompt.lower())
+        self.assertIn("search again only if", system_prompt.lower())
 
     @patch('ai_generator.anthropic.Anthropic')
     def test_multiple_tool_calls_in_response(self, mock_anthropic):
@@ -271,5 +285,312 @@ class TestAIGenerator(unittest.TestCase):
         self.assertEqual(len(tool_results_message["content"]), 2)  # Two tool results
 
 
+    @patch('ai_generator.anthropic.Anthropic')
+    def test_tool_follow_up_keeps_cached_prefix_and_records_usage(self, mock_anthropic):
+        """Test that the follow-up request keeps the tools and usage is recorded"""
+        mock_tool_content = Mock()
+        mock_tool_content.type = "tool_use"
+        mock_tool_content.name = "search_course_content"
+        mock_tool_content.input = {"query": "test query"}
+        mock_tool_content.id = "tool_123"
+        mock_initial_response = Mock(content=[mock_tool_content], stop_reason="tool_use")
+        mock_initial_response.usage = Mock(
+            input_tokens=20, output_tokens=10,
+            cache_creation_input_tokens=1500, cache_read_input_tokens=0,
+        )
+        mock_final_response = Mock(content=[Mock(text="Answer")], stop_reason="end_turn")
+        mock_final_response.usage = Mock(
+            input_tokens=300, output_tokens=50,
+            cache_creation_input_tokens=0, cache_read_input_tokens=1500,
+        )
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = [mock_initial_response, mock_final_response]
+        mock_anthropic.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "Tool result"
+
+        ai_gen = AIGenerator(self.api_key, self.model, max_tool_rounds=1)
+        tools = [{"name": "search_course_content"}]
+        ai_gen.generate_response("Search", tools=tools, tool_manager=tool_manager)
+
+        first_call, second_call = [c[1] for c in mock_client.messages.create.call_args_list]
+        self.assertEqual(second_call["tools"], tools)
+        self.assertEqual(second_call["tool_choice"], {"type": "none"})
+        self.assertEqual(second_call["system"], first_call["system"])
+
+        stats = ai_gen.usage.stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["cache_creation_input_tokens"], 1500)
+        self.assertEqual(stats["cache_read_input_tokens"], 1500)
+        self.assertAlmostEqual(stats["cache_read_ratio"], 1500 / 3320)
+
+    def test_prompt_caching_disabled(self):
+        """Test that no cache breakpoints are set when prompt caching is off"""
+        ai_gen = AIGenerator(self.api_key, self.model, prompt_caching=False)
+        params = ai_gen._build_params(
+            "Question", [{"role": "user", "content": "Earlier"}], None
+        )
+        self.assertNotIn("cache_control", params["system"][0])
+        self.assertEqual(params["messages"][0]["content"], "Earlier")
+
+    def test_multiple_tool_calls_run_concurrently(self):
+        """Test that a turn's tool calls overlap and keep their order"""
+        tool_uses = []
+        for i, delay in enumerate([0.3, 0.1, 0.2]):
+            tool_use = Mock(type="tool_use", input={"delay": delay}, id=f"tool_{i}")
+            tool_use.name = "search_course_content"
+            tool_uses.append(tool_use)
+
+        def execute_tool(name, delay):
+            time.sleep(delay)
+            return f"slept {delay}"
+
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = execute_tool
+
+        started = time.perf_counter()
+        results = self.ai_generator._run_tools(Mock(content=tool_uses), tool_manager)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([r["tool_use_id"] for r in results], ["tool_0", "tool_1", "tool_2"])
+        self.assertEqual([r["content"] for r in results],
+                         ["slept 0.3", "slept 0.1", "slept 0.2"])
+
+    def _tool_use_response(self, tool_id, input_tokens=100):
+        """Build a response asking for one search"""
+        tool_use = Mock(type="tool_use", input={"query": tool_id}, id=tool_id)
+        tool_use.name = "search_course_content"
+        response = Mock(content=[tool_use], stop_reason="tool_use")
+        response.usage = Mock(input_tokens=input_tokens, output_tokens=10,
+                              cache_creation_input_tokens=0, cache_read_input_tokens=0)
+        return response
+
+    @patch('ai_generator.anthropic.Anthropic')
+    def test_tool_rounds_continue_until_answered(self, mock_anthropic):
+        """Test that Claude can search again after seeing tool results"""
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = [
+            self._tool_use_response("tool_1"),
+            self._tool_use_response("tool_2"),
+            Mock(content=[Mock(text="Answer")], stop_reason="end_turn"),
+        ]
+        mock_anthropic.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "Tool result"
+
+        ai_gen = AIGenerator(self.api_key, self.model, max_tool_rounds=3)
+        result = ai_gen.generate_response(
+            "Compare", tools=[{"name": "search_course_content"}], tool_manager=tool_manager
+        )
+
+        self.assertEqual(result, "Answer")
+        self.assertEqual(tool_manager.execute_tool.call_count, 2)
+        calls = [c[1] for c in mock_client.messages.create.call_args_list]
+        self.assertEqual(calls[1]["tool_choice"], {"type": "auto"})
+        self.assertEqual(len(calls[2]["messages"]), 5)  # Question + two rounds
+        self.assertEqual(ai_gen.usage.stats()["loop_stops"], {"answered": 1})
+
+    @patch('ai_generator.anthropic.Anthropic')
+    def test_tool_rounds_stop_at_limits(self, mock_anthropic):
+        """Test that tools are withdrawn at the round limit and token budget"""
+        for limits, rounds, stop_reason in [
+            ({"max_tool_rounds": 2}, 2, "max_rounds"),
+            ({"max_tool_rounds": 5, "input_token_budget": 250}, 2, "token_budget"),
+            ({"max_tool_rounds": 5, "tool_deadline": 0.0}, 1, "deadline"),
+        ]:
+            with self.subTest(stop_reason=stop_reason):
+                mock_client = Mock()
+                mock_client.messages.create.side_effect = [
+                    *(self._tool_use_response(f"tool_{i}") for i in range(rounds)),
+                    Mock(content=[Mock(text="Best effort")], stop_reason="end_turn"),
+                ]
+                mock_anthropic.return_value = mock_client
+                tool_manager = Mock()
+                tool_manager.execute_tool.return_value = "Tool result"
+
+                ai_gen = AIGenerator(self.api_key, self.model, **limits)
+                result = ai_gen.generate_response(
+                    "Compare", tools=[{"name": "search_course_content"}],
+                    tool_manager=tool_manager,
+                )
+
+                self.assertEqual(result, "Best effort")
+                ai_gen._tool_executor.shutdown(wait=True)  # Let timed-out calls end
+                self.assertEqual(tool_manager.execute_tool.call_count, rounds)
+                last_call = mock_client.messages.create.call_args_list[-1][1]
+                self.assertEqual(last_call["tool_choice"], {"type": "none"})
+                self.assertEqual(ai_gen.usage.stats()["loop_stops"], {stop_reason: 1})
+
+    @patch('ai_generator.anthropic.Anthropic')
+    def test_tool_calls_time_out_at_deadline(self, mock_anthropic):
+        """Test that a tool call running past the deadline is answered with an error"""
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = [
+            self._tool_use_response("tool_1"),
+            Mock(content=[Mock(text="Best effort")], stop_reason="end_turn"),
+        ]
+        mock_anthropic.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = lambda name, query: time.sleep(0.5)
+
+        ai_gen = AIGenerator(self.api_key, self.model, tool_deadline=0.1)
+        started = time.perf_counter()
+        result = ai_gen.generate_response(
+            "Compare", tools=[{"name": "search_course_content"}], tool_manager=tool_manager
+        )
+
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(result, "Best effort")
+        last_call = mock_client.messages.create.call_args_list[-1][1]
+        self.assertEqual(last_call["tool_choice"], {"type": "none"})
+        tool_result = last_call["messages"][2]["content"][0]
+        self.assertTrue(tool_result["is_error"])
+        self.assertIn("timed out", tool_result["content"])
+        self.assertEqual(ai_gen.usage.stats()["loop_stops"], {"deadline": 1})
+
+class TestAIGeneratorAsync(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AIGenerator.agenerate_response"""
+
+    @patch('ai_generator.anthropic.AsyncAnthropic')
+    async def test_agenerate_response_runs_async_tools(self, mock_async_anthropic):
+        """Test that async generation awaits the API and async tool execution"""
+        mock_tool_content = Mock()
+        mock_tool_content.type = "tool_use"
+        mock_tool_content.name = "search_course_content"
+        mock_tool_content.input = {"query": "test query"}
+        mock_tool_content.id = "tool_123"
+        mock_initial_response = Mock(content=[mock_tool_content], stop_reason="tool_use")
+        mock_final_response = Mock(content=[Mock(text="Async answer")])
+
+        mock_client = Mock()
+        mock_client.messages.create = AsyncMock(
+            side_effect=[mock_initial_response, mock_final_response]
+        )
+        mock_async_anthropic.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.aexecute_tool = AsyncMock(return_value="Tool result")
+
+        ai_gen = AIGenerator("test_key", "claude-sonnet-4-20250514")
+        result = await ai_gen.agenerate_response(
+            "Search", tools=[{"name": "search_course_content"}], tool_manager=tool_manager
+        )
+
+        self.assertEqual(result, "Async answer")
+        tool_manager.aexecute_tool.assert_awaited_once_with(
+            "search_course_content", query="test query"
+        )
+        final_messages = mock_client.messages.create.call_args_list[1][1]["messages"]
+        self.assertEqual(final_messages[2]["content"][0]["content"], "Tool result")
+
+
+    @patch('ai_generator.anthropic.AsyncAnthropic')
+    async def test_astream_response_streams_after_tools(self, mock_async_anthropic):
+        """Test that streaming runs tools, signals it, then streams the answer"""
+        mock_tool_content = Mock()
+        mock_tool_content.type = "tool_use"
+        mock_tool_content.name = "search_course_content"
+        mock_tool_content.input = {"query": "test query"}
+        mock_tool_content.id = "tool_123"
+        tool_response = Mock(content=[mock_tool_content], stop_reason="tool_use")
+        answer_response = Mock(content=[], stop_reason="end_turn")
+
+        mock_client = Mock()
+        mock_client.messages.stream = Mock(side_effect=[
+            FakeStream([], tool_response),
+            FakeStream(["Streamed ", "answer"], answer_response),
+        ])
+        mock_async_anthropic.return_value = mock_client
+        tool_manager = Mock()
+        tool_manager.aexecute_tool = AsyncMock(return_value="Tool result")
+
+        ai_gen = AIGenerator("test_key", "claude-sonnet-4-20250514")
+        events = [
+            event async for event in ai_gen.astream_response(
+                "Search", tools=[{"name": "search_course_content"}], tool_manager=tool_manager
+            )
+        ]
+
+        self.assertEqual(events, [
+            ("tool_results", None), ("text", "Streamed "), ("text", "answer")
+        ])
+        tool_manager.aexecute_tool.assert_awaited_once_with(
+            "search_course_content", query="test query"
+        )
+        final_messages = mock_client.messages.stream.call_args_list[1][1]["messages"]
+        self.assertEqual(final_messages[2]["content"][0]["content"], "Tool result")
+
+
+    @patch('ai_generator.anthropic.AsyncAnthropic')
+    async def test_async_tool_calls_run_concurrently(self, mock_async_anthropic):
+        """Test that async tool calls are gathered and keep their order"""
+        tool_uses = []
+        for i, delay in enumerate([0.3, 0.1]):
+            tool_use = Mock(type="tool_use", input={"delay": delay}, id=f"tool_{i}")
+            tool_use.name = "search_course_content"
+            tool_uses.append(tool_use)
+
+        async def aexecute_tool(name, delay):
+            await asyncio.sleep(delay)
+            return f"slept {delay}"
+
+        tool_manager = Mock()
+        tool_manager.aexecute_tool = aexecute_tool
+
+        ai_gen = AIGenerator("test_key", "claude-sonnet-4-20250514")
+        started = time.perf_counter()
+        results = await ai_gen._arun_tools(Mock(content=tool_uses), tool_manager)
+
+        self.assertLess(time.perf_counter() - started, 0.38)
+        self.assertEqual([r["content"] for r in results], ["slept 0.3", "slept 0.1"])
+
+    @patch('ai_generator.anthropic.AsyncAnthropic')
+    async def test_async_tool_calls_time_out(self, mock_async_anthropic):
+        """Test that async tool calls still running at the timeout are cancelled"""
+        tool_uses = []
+        for i, delay in enumerate([0.5, 0.01]):
+            tool_use = Mock(type="tool_use", input={"delay": delay}, id=f"tool_{i}")
+            tool_use.name = "search_course_content"
+            tool_uses.append(tool_use)
+
+        async def aexecute_tool(name, delay):
+            await asyncio.sleep(delay)
+            return f"slept {delay}"
+
+        tool_manager = Mock()
+        tool_manager.aexecute_tool = aexecute_tool
+
+        ai_gen = AIGenerator("test_key", "claude-sonnet-4-20250514")
+        started = time.perf_counter()
+        results = await ai_gen._arun_tools(Mock(content=tool_uses), tool_manager, 0.1)
+
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertTrue(results[0]["is_error"])
+        self.assertIn("timed out", results[0]["content"])
+        self.assertEqual(results[1]["content"], "slept 0.01")
+        self.assertNotIn("is_error", results[1])
+
+class FakeStream:
+    """Stand-in for the async client's message stream context manager"""
+
+    def __init__(self, texts, final_message):
+        self.texts = texts
+        self.final_message = final_message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for text in self.texts:
+            yield text
+
+    async def get_final_message(self):
+        return self.final_message
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
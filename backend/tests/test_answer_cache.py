@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+
+from answer_cache import AnswerCache
+
+
+class TestAnswerCache(unittest.TestCase):
+    """Test cases for the semantic answer cache"""
+
+    def test_similar_question_hits(self):
+        """Test that only questions above the similarity threshold match"""
+        cache = AnswerCache(4, threshold=0.95)
+        cache.put([1.0, 0.0, 0.0], "Answer", [{"text": "Course A", "link": None}], 0)
+
+        self.assertEqual(
+            cache.lookup([0.99, 0.05, 0.0], 0),
+            ("Answer", [{"text": "Course A", "link": None}]),
+        )
+        self.assertIsNone(cache.lookup([0.6, 0.8, 0.0], 0))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_scope_must_match(self):
+        """Test that identical embeddings with another scope miss"""
+        cache = AnswerCache(4)
+        cache.put([1.0, 0.0], "Lesson 1 of MCP", [], 0, (("1",), "MCP"))
+
+        self.assertIsNone(cache.lookup([1.0, 0.0], 0, (("2",), "MCP")))
+        self.assertIsNone(cache.lookup([1.0, 0.0], 0, (("1",), "Chroma")))
+        self.assertEqual(
+            cache.lookup([1.0, 0.0], 0, (("1",), "MCP")), ("Lesson 1 of MCP", [])
+        )
+
+    def test_newer_index_version_invalidates(self):
+        """Test that answers are dropped once the index changes"""
+        cache = AnswerCache(4)
+        cache.put([1.0, 0.0], "Old answer", [], 0)
+
+        self.assertIsNone(cache.lookup([1.0, 0.0], 1))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+        # An answer generated before the change is not cached afterwards
+        cache.put([1.0, 0.0], "Stale answer", [], 0)
+        self.assertIsNone(cache.lookup([1.0, 0.0], 1))
+
+    def test_lru_and_ttl_eviction(self):
+        """Test eviction of the least recently used and expired answers"""
+        cache = AnswerCache(2, ttl=60)
+        with patch("answer_cache.time.monotonic", return_value=0.0):
+            cache.put([1.0, 0.0, 0.0], "A", [], 0)
+            cache.put([0.0, 1.0, 0.0], "B", [], 0)
+            self.assertEqual(cache.lookup([1.0, 0.0, 0.0], 0)[0], "A")
+            cache.put([0.0, 0.0, 1.0], "C", [], 0)
+            self.assertIsNone(cache.lookup([0.0, 1.0, 0.0], 0))
+
+        with patch("answer_cache.time.monotonic", return_value=61.0):
+            self.assertIsNone(cache.lookup([1.0, 0.0, 0.0], 0))
+            self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
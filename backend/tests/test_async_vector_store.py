@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import Mock
+
+from async_vector_store import AsyncVectorStore
+from search_tools import CourseSearchTool, ToolManager
+from vector_store import SearchResults, VectorStore
+
+
+class TestAsyncVectorStore(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the awaitable VectorStore facade"""
+
+    def setUp(self):
+        self.mock_vector_store = Mock(spec=VectorStore)
+        self.async_store = AsyncVectorStore(self.mock_vector_store, max_workers=2)
+
+    def tearDown(self):
+        self.async_store.shutdown()
+
+    async def test_calls_run_on_the_pool_without_blocking_the_loop(self):
+        """Test that a slow search leaves the event loop free"""
+        threads = []
+
+        def slow_search(*args):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return SearchResults.empty("done")
+
+        self.mock_vector_store.search.side_effect = slow_search
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        results = await asyncio.gather(
+            self.async_store.search("one"), self.async_store.search("two")
+        )
+        ticking.cancel()
+
+        self.assertEqual([r.error for r in results], ["done", "done"])
+        self.assertGreater(ticks, 5)
+        self.assertTrue(all(name.startswith("vector-store") for name in threads))
+        self.mock_vector_store.search.assert_any_call("one", None, None, None, None)
+
+    async def test_lesson_links_resolved_in_one_pool_call(self):
+        """Test that a batch of lesson links takes a single thread pool trip"""
+        threads = set()
+
+        def get_lesson_link(title, lesson):
+            threads.add(threading.get_ident())
+            return f"https://example.com/{title}/{lesson}"
+
+        self.mock_vector_store.get_lesson_link.side_effect = get_lesson_link
+        links = await self.async_store.get_lesson_links(
+            [("A", 1), ("A", None), ("B", 2)]
+        )
+
+        self.assertEqual(
+            links, ["https://example.com/A/1", None, "https://example.com/B/2"]
+        )
+        self.assertEqual(self.mock_vector_store.get_lesson_link.call_count, 2)
+        self.assertEqual(len(threads), 1)
+
+    async def test_concurrent_tool_calls_collect_their_own_sources(self):
+        """Test that concurrent requests don't share search sources"""
+
+        def search(query, *args):
+            return SearchResults(
+                documents=[f"content for {query}"],
+                metadata=[{"course_title": query, "lesson_number": 1}],
+                distances=[0.1],
+            )
+
+        self.mock_vector_store.search.side_effect = search
+        self.mock_vector_store.get_lesson_link.side_effect = (
+            lambda title, lesson: f"https://example.com/{title}/{lesson}"
+        )
+        tool_manager = ToolManager()
+        tool_manager.register_tool(
+            CourseSearchTool(self.mock_vector_store, self.async_store)
+        )
+
+        async def request(query):
+            with tool_manager.collect_sources() as sources:
+                result = await tool_manager.aexecute_tool(
+                    "search_course_content", query=query
+                )
+            return result, sources
+
+        (result_a, sources_a), (result_b, sources_b) = await asyncio.gather(
+            request("A"), request("B")
+        )
+
+        self.assertIn("[A - Lesson 1]", result_a)
+        self.assertEqual(
+            sources_a, [{"text": "A - Lesson 1", "link": "https://example.com/A/1"}]
+        )
+        self.assertEqual(
+            sources_b, [{"text": "B - Lesson 1", "link": "https://example.com/B/1"}]
+        )
+        self.assertEqual(tool_manager.get_last_sources(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
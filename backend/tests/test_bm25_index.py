@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from bm25_index import BM25Index, tokenize
+
+
+def _meta(course="Course A", lesson=1):
+    return {"course_title": course, "lesson_number": lesson}
+
+
+class TestBM25Index(unittest.TestCase):
+    """Test cases for the in-memory BM25 index"""
+
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.add(
+            ["a0", "a1", "b0"],
+            [
+                "Use the tool_use block to call tools",
+                "Prompt caching reduces latency",
+                "Tools are defined with a JSON schema",
+            ],
+            [_meta(), _meta(lesson=2), _meta("Course B")],
+        )
+
+    def test_tokenize_keeps_identifiers_and_parts(self):
+        """Test that compound identifiers are indexed whole and split"""
+        tokens = list(tokenize("client.messages.create uses tool_use"))
+        self.assertIn("client.messages.create", tokens)
+        self.assertIn("messages", tokens)
+        self.assertIn("tool_use", tokens)
+        self.assertIn("tool", tokens)
+
+    def test_search_ranks_matching_documents(self):
+        """Test that rarer exact terms rank their documents first"""
+        results = self.index.search("tool_use tools", 10)
+        self.assertEqual(results[0][0], "a0")
+        self.assertEqual({doc_id for doc_id, _ in results}, {"a0", "b0"})
+        self.assertEqual(self.index.search("unrelated words", 10), [])
+
+    def test_search_filters_by_course_and_lesson(self):
+        """Test that course and lesson filters restrict results"""
+        self.assertEqual(
+            [doc_id for doc_id, _ in self.index.search("tools", 10, "Course B")], ["b0"]
+        )
+        self.assertEqual(self.index.search("caching", 10, "Course A", 1), [])
+        self.assertEqual(self.index.search("tools", 10, "Missing Course"), [])
+
+    def test_replace_and_remove_documents(self):
+        """Test that re-adding replaces a document and removal drops it"""
+        self.index.add(["a1"], ["Now about tool_use"], [_meta(lesson=2)])
+        self.assertEqual(self.index.search("caching", 10), [])
+        self.assertEqual(len(self.index), 3)
+
+        self.index.remove_course("Course A")
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(
+            [doc_id for doc_id, _ in self.index.search("tools", 10)], ["b0"]
+        )
+
+    def test_compaction_preserves_results(self):
+        """Test that compacting tombstones keeps live documents searchable"""
+        index = BM25Index()
+        ids = [f"d{i}" for i in range(2100)]
+        index.add(ids, [f"common word{i}" for i in range(2100)], [_meta()] * 2100)
+        index.remove(ids[:2000])
+
+        self.assertEqual(len(index._doc_ids), 100)
+        self.assertEqual(index.search("word2050", 5)[0][0], "d2050")
+        self.assertEqual(len(index.search("common", 500)), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import Mock
+
+from course_resolver import CourseResolver
+
+TITLES = [
+    "MCP: Build Rich-Context AI Apps with Anthropic",
+    "Advanced Retrieval for AI with Chroma",
+    "Building Towards Computer Use with Anthropic",
+]
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 0.5]]
+
+
+class TestCourseResolver(unittest.TestCase):
+    """Test cases for in-memory course name resolution"""
+
+    def setUp(self):
+        self.embed = Mock(return_value=[[0.1, 0.9, 0.2]])
+        self.resolver = CourseResolver(TITLES, EMBEDDINGS, self.embed)
+
+    def test_lexical_matches_do_not_embed(self):
+        """Test exact, case-insensitive, prefix and fuzzy matches"""
+        cases = {
+            "Advanced Retrieval for AI with Chroma": TITLES[1],
+            "advanced retrieval  for ai with CHROMA": TITLES[1],
+            "MCP": TITLES[0],
+            "building towards": TITLES[2],
+            "computer use": TITLES[2],
+            "Retreival for AI": TITLES[1],  # typo
+        }
+        for name, expected in cases.items():
+            self.assertEqual(self.resolver.resolve(name), expected, name)
+        self.embed.assert_not_called()
+
+    def test_semantic_fallback_uses_cached_title_embeddings(self):
+        """Test that unmatched names are resolved by cosine similarity"""
+        self.assertEqual(self.resolver.resolve("vector databases"), TITLES[1])
+        self.embed.assert_called_once_with(["vector databases"])
+
+    def test_empty_catalog(self):
+        """Test that nothing resolves against an empty catalog"""
+        resolver = CourseResolver([], [], self.embed)
+        self.assertIsNone(resolver.resolve("MCP"))
+        self.embed.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
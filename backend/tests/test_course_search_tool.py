@@ -4,7 +4,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from unittest.mock import Mock, patch
-from search_tools import CourseSearchTool
+from models import Course, Lesson
+from search_tools import CourseOutlineTool, CourseSearchTool
 from vector_store import VectorStore, SearchResults
 
 
@@ -170,5 +171,46 @@ class TestCourseSearchTool(unittest.TestCase):
         self.assertEqual(schema["required"], ["query"])
 
 
+
+class TestCourseOutlineTool(unittest.TestCase):
+    """Test cases for CourseOutlineTool.execute method"""
+
+    def setUp(self):
+        self.mock_vector_store = Mock(spec=VectorStore)
+        self.outline_tool = CourseOutlineTool(self.mock_vector_store)
+
+    def test_execute_formats_cached_course(self):
+        """Test that the outline is built from the cached catalog course"""
+        self.mock_vector_store._resolve_course_name.return_value = "Test Course"
+        self.mock_vector_store.get_course.return_value = Course(
+            title="Test Course",
+            course_link="https://example.com/course",
+            instructor="Test Instructor",
+            lessons=[Lesson(lesson_number=0, title="Intro"),
+                     Lesson(lesson_number=1, title="Details")],
+        )
+
+        result = self.outline_tool.execute(course_name="test")
+
+        self.mock_vector_store.get_course.assert_called_once_with("Test Course")
+        self.assertEqual(
+            result,
+            "Course: Test Course\n"
+            "Instructor: Test Instructor\n"
+            "Course Link: https://example.com/course\n\n"
+            "Lessons:\n"
+            "  Lesson 0: Intro\n"
+            "  Lesson 1: Details\n",
+        )
+
+    def test_execute_unknown_course(self):
+        """Test that an unresolvable name is reported"""
+        self.mock_vector_store._resolve_course_name.return_value = None
+
+        result = self.outline_tool.execute(course_name="Nope")
+
+        self.assertEqual(result, "No course found matching 'Nope'")
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import Mock, patch
+
+from config import Config
+from docs_watcher import DocsWatcher
+from rag_system import RAGSystem
+
+
+class TestDocsWatcher(unittest.TestCase):
+    """Test cases for the polling docs folder watcher"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.rag_system = Mock()
+        self.rag_system.index_files.return_value = (1, 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, text):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_existing_files_are_not_reindexed(self):
+        """Test that files present when watching starts are left alone"""
+        self._write("course.txt", "Course Title: Existing")
+        watcher = DocsWatcher(self.rag_system, self.temp_dir, debounce=0)
+        watcher._snapshot = watcher._scan()
+
+        watcher.poll()
+
+        self.rag_system.index_files.assert_not_called()
+        self.rag_system.remove_files.assert_not_called()
+
+    def test_added_changed_and_deleted_files(self):
+        """Test that additions and edits are indexed and deletions removed"""
+        watcher = DocsWatcher(self.rag_system, self.temp_dir, debounce=0)
+        path = self._write("course.txt", "Course Title: New")
+        self._write("notes.md", "not a course document")
+
+        watcher.poll()
+        self.rag_system.index_files.assert_called_once_with([path])
+        status = watcher.status()
+        self.assertEqual(status["queue_depth"], 0)
+        self.assertIn("course.txt", status["last_indexed"])
+
+        self._write("course.txt", "Course Title: New and longer")
+        watcher.poll()
+        self.assertEqual(self.rag_system.index_files.call_count, 2)
+
+        os.remove(path)
+        watcher.poll()
+        self.rag_system.remove_files.assert_called_once_with([path])
+
+    def test_debounce_waits_for_file_to_settle(self):
+        """Test that a freshly changed file stays queued until the debounce passes"""
+        watcher = DocsWatcher(self.rag_system, self.temp_dir, debounce=60)
+        self._write("course.txt", "Course Title: Busy")
+
+        watcher.poll()
+
+        self.rag_system.index_files.assert_not_called()
+        self.assertEqual(watcher.status()["queue_depth"], 1)
+
+    @patch("rag_system.AIGenerator")
+    @patch("rag_system.VectorStore")
+    def test_deleting_one_of_two_files_with_same_title(
+        self, mock_vector_store, mock_ai_generator
+    ):
+        """Test that a course stays indexed while a duplicate file remains"""
+        titles = set()
+        store = mock_vector_store.return_value
+        store.get_existing_course_titles.side_effect = lambda: list(titles)
+        store.add_course_content.side_effect = list
+        store.add_course_metadata.side_effect = lambda course: titles.add(course.title)
+        store.delete_course.side_effect = titles.discard
+
+        config = Config()
+        config.CHROMA_PATH = os.path.join(self.temp_dir, "chroma_db")
+        docs_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(docs_dir)
+        text = "Course Title: Shared\n\nLesson 1: Intro\nLesson content.\n"
+        paths = []
+        for name in ("a.txt", "b.txt"):
+            paths.append(os.path.join(docs_dir, name))
+            with open(paths[-1], "w") as f:
+                f.write(text)
+
+        rag_system = RAGSystem(config)
+        watcher = DocsWatcher(rag_system, docs_dir, debounce=0)
+        watcher.poll()
+        self.assertEqual(titles, {"Shared"})
+        owner = next(p for p in paths if rag_system.manifest.get(p).chunk_ids)
+
+        os.remove(owner)
+        watcher.poll()
+
+        self.assertEqual(titles, {"Shared"})
+        remaining = next(p for p in paths if p != owner)
+        self.assertTrue(rag_system.manifest.get(remaining).chunk_ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
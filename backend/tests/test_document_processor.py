@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_chunking import load_lesson_texts, reference_chunk_text
+from document_processor import DocumentProcessor
+
+COURSE_TEXT = """Course Title: Streaming Course
+Course Link: https://example.com/course
+Course Instructor: Test Instructor
+
+Lesson 0: Introduction
+Lesson Link: https://example.com/lesson0
+Welcome to the course. This lesson introduces the topic.
+Lesson 1: Details
+Lesson Link: https://example.com/lesson1
+Here are the details. They span a few sentences! Is that enough?
+"""
+
+
+class TestDocumentProcessor(unittest.TestCase):
+    """Test cases for DocumentProcessor parsing"""
+
+    def setUp(self):
+        """Write a small course document to a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "course.txt")
+        with open(self.file_path, "w") as f:
+            f.write(COURSE_TEXT)
+        self.processor = DocumentProcessor(chunk_size=800, chunk_overlap=100)
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_iter_course_document_streams_lessons(self):
+        """Test that chunks are yielded lesson by lesson as the file is read"""
+        course, chunk_batches = self.processor.iter_course_document(self.file_path)
+
+        # Header metadata is available before any lesson is parsed
+        self.assertEqual(course.title, "Streaming Course")
+        self.assertEqual(course.instructor, "Test Instructor")
+        self.assertEqual(course.lessons, [])
+
+        first_batch = next(chunk_batches)
+        self.assertEqual({chunk.lesson_number for chunk in first_batch}, {0})
+        self.assertTrue(first_batch[0].content.startswith("Lesson 0 content: "))
+        self.assertEqual(len(course.lessons), 1)
+
+        second_batch = next(chunk_batches)
+        self.assertEqual({chunk.lesson_number for chunk in second_batch}, {1})
+        self.assertEqual(course.lessons[1].lesson_link, "https://example.com/lesson1")
+        self.assertEqual(
+            [chunk.chunk_index for chunk in first_batch + second_batch],
+            list(range(len(first_batch) + len(second_batch))),
+        )
+        self.assertIsNone(next(chunk_batches, None))
+
+    def test_process_course_document_matches_stream(self):
+        """Test that the eager parser returns the streamed chunks"""
+        course, chunks = self.processor.process_course_document(self.file_path)
+        _, chunk_batches = self.processor.iter_course_document(self.file_path)
+
+        self.assertEqual(chunks, [chunk for batch in chunk_batches for chunk in batch])
+        self.assertEqual(len(course.lessons), 2)
+
+    def test_document_without_lessons(self):
+        """Test that a document without lesson markers is chunked as a whole"""
+        with open(self.file_path, "w") as f:
+            f.write("Course Title: Plain\nCourse Link: x\n\nJust some text. More text.")
+
+        course, chunks = self.processor.process_course_document(self.file_path)
+
+        self.assertEqual(course.title, "Plain")
+        self.assertEqual(course.lessons, [])
+        self.assertEqual(chunks[0].content, "Just some text. More text.")
+        self.assertIsNone(chunks[0].lesson_number)
+
+    def test_chunk_text_matches_reference_implementation(self):
+        """Test that the prefix-sum chunker reproduces the previous chunks exactly"""
+        docs_path = os.path.join(os.path.dirname(__file__), "..", "..", "docs")
+        texts = load_lesson_texts(docs_path) + [
+            "",
+            "No sentence break here",
+            "Dr. Smith met Mr. Jones. They talked! Did it help? e.g. Not really.",
+            "A" * 1200 + ". Short one. Another short one.",
+        ]
+
+        for chunk_size, chunk_overlap in [(800, 100), (200, 0), (120, 90), (1, 1)]:
+            processor = DocumentProcessor(chunk_size, chunk_overlap)
+            for text in texts:
+                self.assertEqual(
+                    processor.chunk_text(text),
+                    reference_chunk_text(text, chunk_size, chunk_overlap),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
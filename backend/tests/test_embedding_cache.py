@@ -0,0 +1,53 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for the persistent embedding cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "cache", "embeddings.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip_and_persistence(self):
+        """Test that vectors survive reopening and are keyed by model"""
+        cache = EmbeddingCache(self.db_path, max_entries=10)
+        cache.put_many("model-a", {"h1": [0.5, 1.5], "h2": np.array([2.0, 3.0])})
+        cache.close()
+
+        cache = EmbeddingCache(self.db_path, max_entries=10)
+        found = cache.get_many("model-a", ["h1", "h3"])
+        self.assertEqual(list(found), ["h1"])
+        np.testing.assert_array_equal(
+            found["h1"], np.array([0.5, 1.5], dtype=np.float32)
+        )
+        self.assertEqual(cache.get_many("model-b", ["h1"]), {})
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "entries": 2})
+
+    def test_evicts_least_recently_used(self):
+        """Test that the size cap evicts the entries used longest ago"""
+        cache = EmbeddingCache(self.db_path, max_entries=2)
+        cache.put_many("model", {"h1": [1.0]})
+        cache.put_many("model", {"h2": [2.0]})
+        cache.get_many("model", ["h1"])  # h2 is now least recently used
+        cache.put_many("model", {"h3": [3.0]})
+
+        self.assertEqual(
+            sorted(cache.get_many("model", ["h1", "h2", "h3"])), ["h1", "h3"]
+        )
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the bounded LRU cache"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_stats(self):
+        """Test hit/miss counters and hit rate"""
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        self.assertEqual(
+            cache.stats(),
+            {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "size": 1, "max_size": 4},
+        )
+
+    def test_zero_size_disables_cache(self):
+        """Test that a zero-size cache stores nothing"""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from numpy_backend import NumpyCollection
+
+
+def _vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+class TestNumpyCollection(unittest.TestCase):
+    """Test cases for the memory-mapped brute-force collection"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "content")
+        self.collection = NumpyCollection(self.path)
+        self.collection.add(
+            ids=["a0", "a1", "b0"],
+            documents=["alpha", "beta", "gamma"],
+            metadatas=[
+                {"course_title": "A", "lesson_number": 0},
+                {"course_title": "A", "lesson_number": 1},
+                {"course_title": "B", "lesson_number": 0},
+            ],
+            embeddings=[_vector(1, 0), _vector(0, 1), _vector(1, 1)],
+        )
+
+    def tearDown(self):
+        self.collection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_query_ranks_by_squared_l2_distance(self):
+        """Test that queries return the nearest rows first with Chroma's shape"""
+        results = self.collection.query(
+            query_embeddings=[_vector(1, 0), _vector(0, 1)], n_results=2
+        )
+        self.assertEqual(results["ids"], [["a0", "b0"], ["a1", "b0"]])
+        self.assertEqual(results["documents"][0], ["alpha", "gamma"])
+        np.testing.assert_allclose(results["distances"][0], [0.0, 1.0], atol=1e-6)
+
+    def test_filters_are_applied_as_masks(self):
+        """Test course and lesson filters, alone and combined with $and"""
+        query = [_vector(1, 1)]
+        self.assertEqual(
+            self.collection.query(
+                query_embeddings=query, n_results=5, where={"course_title": "A"}
+            )["ids"],
+            [["a0", "a1"]],
+        )
+        where = {"$and": [{"course_title": "A"}, {"lesson_number": 1}]}
+        self.assertEqual(
+            self.collection.query(query_embeddings=query, n_results=5, where=where)[
+                "ids"
+            ],
+            [["a1"]],
+        )
+        self.assertEqual(
+            self.collection.query(
+                query_embeddings=query, n_results=5, where={"course_title": "Missing"}
+            )["ids"],
+            [[]],
+        )
+        self.assertEqual(
+            self.collection.get(where={"lesson_number": 0})["ids"], ["a0", "b0"]
+        )
+
+    def test_upsert_delete_and_reopen(self):
+        """Test that writes persist and deleted rows are reused"""
+        self.collection.upsert(
+            ids=["a1"],
+            documents=["beta v2"],
+            metadatas=[{"course_title": "A", "lesson_number": 1}],
+            embeddings=[_vector(2, 2)],
+        )
+        self.collection.delete(where={"course_title": "B"})
+        self.collection.add(
+            ids=["c0"],
+            documents=["delta"],
+            metadatas=[{"course_title": "C", "lesson_number": None}],
+            embeddings=[_vector(0, 3)],
+        )
+        self.assertEqual(self.collection.count(), 3)
+        self.assertEqual(self.collection._size, 3)  # c0 took b0's free row
+        self.collection.close()
+
+        self.collection = NumpyCollection(self.path)
+        stored = self.collection.get(
+            ids=["a1", "c0", "b0"], include=["documents", "embeddings"]
+        )
+        self.assertEqual(stored["ids"], ["a1", "c0"])
+        self.assertEqual(stored["documents"], ["beta v2", "delta"])
+        np.testing.assert_array_equal(stored["embeddings"], [[2, 2], [0, 3]])
+        self.assertEqual(
+            self.collection.query(query_embeddings=[_vector(0, 3)], n_results=1)["ids"],
+            [["c0"]],
+        )
+
+    def test_grows_past_initial_capacity(self):
+        """Test that the memory-mapped columns grow as rows are added"""
+        ids = [f"x{i}" for i in range(1500)]
+        vectors = np.random.default_rng(0).random((1500, 2), dtype=np.float32)
+        self.collection.add(
+            ids=ids,
+            documents=ids,
+            metadatas=[{"course_title": "X", "lesson_number": 0}] * 1500,
+            embeddings=vectors,
+        )
+        self.assertEqual(self.collection.count(), 1503)
+        results = self.collection.query(
+            query_embeddings=[vectors[1234]], n_results=1, where={"course_title": "X"}
+        )
+        self.assertEqual(results["ids"], [["x1234"]])
+
+        self.collection.reset()
+        self.assertEqual(self.collection.count(), 0)
+        self.assertEqual(self.collection.get()["ids"], [])
+
+
+class TestQuantizedNumpyCollection(unittest.TestCase):
+    """Test cases for quantized first-pass search with exact re-ranking"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((500, 32), dtype=np.float32)
+        self.ids = [f"x{i}" for i in range(500)]
+        self.metadatas = [
+            {"course_title": f"C{i % 2}", "lesson_number": 0} for i in range(500)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make(self, quantization):
+        collection = NumpyCollection(
+            os.path.join(self.temp_dir, quantization), quantization=quantization
+        )
+        collection.add(
+            ids=self.ids,
+            documents=self.ids,
+            metadatas=self.metadatas,
+            embeddings=self.vectors,
+        )
+        return collection
+
+    def test_quantized_results_are_reranked_exactly(self):
+        """Test that quantized search finds exact matches with exact distances"""
+        exact = self._make("none")
+        queries = self.vectors[0:40:2] + 0.01
+        expected = exact.query(
+            query_embeddings=queries, n_results=5, where={"course_title": "C0"}
+        )
+
+        for quantization in ("int8", "binary"):
+            with self.subTest(quantization=quantization):
+                collection = self._make(quantization)
+                results = collection.query(
+                    query_embeddings=queries, n_results=5, where={"course_title": "C0"}
+                )
+                self.assertEqual(
+                    [ids[0] for ids in results["ids"]],
+                    [ids[0] for ids in expected["ids"]],
+                )
+                np.testing.assert_allclose(
+                    [d[0] for d in results["distances"]],
+                    [d[0] for d in expected["distances"]],
+                    atol=1e-3,
+                )
+                self.assertLess(
+                    collection.first_pass_nbytes(), exact.first_pass_nbytes() / 3
+                )
+                collection.close()
+        exact.close()
+
+    def test_codes_are_rebuilt_on_reopen(self):
+        """Test that a reopened quantized collection searches correctly"""
+        self._make("binary").close()
+        collection = NumpyCollection(
+            os.path.join(self.temp_dir, "binary"), quantization="binary"
+        )
+        results = collection.query(query_embeddings=[self.vectors[42]], n_results=1)
+        self.assertEqual(results["ids"], [["x42"]])
+        self.assertEqual(collection.first_pass_nbytes(), 500 * 4)
+        collection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
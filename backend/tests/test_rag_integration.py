@@ -3,11 +3,13 @@ import sys
 import os
 import tempfile
 import shutil
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from unittest.mock import Mock, patch, MagicMock
 from rag_system import RAGSystem
 from config import Config
+from vector_store import SearchResults
 
 
 class TestRAGIntegration(unittest.TestCase):
@@ -65,6 +67,44 @@ class TestRAGIntegration(unittest.TestCase):
         self.assertEqual(response, "Test response")
         self.assertIsInstance(sources, list)
 
+    @patch('rag_system.AIGenerator')
+    def test_query_reuses_cached_answer_until_index_changes(self, mock_ai_generator):
+        """Test that a similar question is answered from the answer cache"""
+        mock_ai_instance = Mock()
+        mock_ai_instance.generate_response.side_effect = ["First answer", "Second answer"]
+        mock_ai_generator.return_value = mock_ai_instance
+
+        rag_system = RAGSystem(self.test_config)
+        rag_system.vector_store.embed_query = Mock(return_value=[1.0, 0.0])
+
+        self.assertEqual(rag_system.query("What is RAG?")[0], "First answer")
+        self.assertEqual(rag_system.query("what is rag")[0], "First answer")
+        self.assertEqual(mock_ai_instance.generate_response.call_count, 1)
+
+        # Any index write makes cached answers stale
+        rag_system.vector_store.clear_all_data()
+        self.assertEqual(rag_system.query("What is RAG?")[0], "Second answer")
+        self.assertEqual(rag_system.get_cache_stats()["answers"]["hits"], 1)
+
+    @patch('rag_system.AIGenerator')
+    def test_query_cache_misses_other_lesson_or_course(self, mock_ai_generator):
+        """Test that near-duplicate questions about another lesson or course miss"""
+        mock_ai_instance = Mock()
+        mock_ai_instance.generate_response.side_effect = ["Lesson 1", "Lesson 2", "Chroma"]
+        mock_ai_generator.return_value = mock_ai_instance
+
+        rag_system = RAGSystem(self.test_config)
+        rag_system.vector_store.embed_query = Mock(return_value=[1.0, 0.0])
+        rag_system.vector_store.closest_course = Mock(
+            side_effect=["MCP", "MCP", "Chroma", "MCP"]
+        )
+
+        self.assertEqual(rag_system.query("What is in lesson 1 of MCP?")[0], "Lesson 1")
+        self.assertEqual(rag_system.query("What is in lesson 2 of MCP?")[0], "Lesson 2")
+        self.assertEqual(rag_system.query("What is in lesson 1 of Chroma?")[0], "Chroma")
+        self.assertEqual(rag_system.query("what is in lesson 1 of MCP")[0], "Lesson 1")
+        self.assertEqual(rag_system.get_cache_stats()["answers"]["hits"], 1)
+
     @patch('rag_system.AIGenerator')
     def test_query_with_existing_session(self, mock_ai_generator):
         """Test that query uses existing session for history"""
@@ -125,6 +165,116 @@ class TestRAGIntegration(unittest.TestCase):
         # Verify sources were retrieved and reset
         self.assertIsInstance(sources, list)
 
+    @patch('ai_generator.anthropic.Anthropic')
+    @patch('rag_system.VectorStore')
+    def test_query_returns_sources_of_concurrent_searches(self, mock_vector_store, mock_anthropic):
+        """Test that both searches of one turn contribute their sources"""
+        def search(query, course_name=None, lesson_number=None):
+            # The first search finishes last
+            time.sleep(0.2 if query == "first" else 0.05)
+            return SearchResults(
+                documents=[f"{query} content"],
+                metadata=[{"course_title": f"Course {query}", "lesson_number": 1}],
+                distances=[0.1],
+            )
+
+        mock_vs_instance = Mock()
+        mock_vs_instance.search.side_effect = search
+        mock_vs_instance.get_lesson_link.return_value = None
+        mock_vector_store.return_value = mock_vs_instance
+
+        tool_uses = []
+        for query in ["first", "second"]:
+            tool_use = Mock(type="tool_use", input={"query": query}, id=f"tool_{query}")
+            tool_use.name = "search_course_content"
+            tool_uses.append(tool_use)
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = [
+            Mock(content=tool_uses, stop_reason="tool_use"),
+            Mock(content=[Mock(text="Combined answer")], stop_reason="end_turn"),
+        ]
+        mock_anthropic.return_value = mock_client
+
+        self.test_config.ANSWER_CACHE_SIZE = 0
+        rag_system = RAGSystem(self.test_config)
+        response, sources = rag_system.query("Compare both courses")
+
+        self.assertEqual(response, "Combined answer")
+        self.assertEqual(sorted(source["text"] for source in sources),
+                         ["Course first - Lesson 1", "Course second - Lesson 1"])
+
+    @patch('ai_generator.anthropic.Anthropic')
+    @patch('rag_system.VectorStore')
+    def test_query_drops_sources_of_searches_past_deadline(self, mock_vector_store, mock_anthropic):
+        """Test that a search finishing after the deadline doesn't change the sources"""
+        def search(query, course_name=None, lesson_number=None):
+            time.sleep(0.4 if query == "slow" else 0.01)
+            return SearchResults(
+                documents=[f"{query} content"],
+                metadata=[{"course_title": f"Course {query}", "lesson_number": 1}],
+                distances=[0.1],
+            )
+
+        mock_vs_instance = Mock()
+        mock_vs_instance.search.side_effect = search
+        mock_vs_instance.get_lesson_link.return_value = None
+        mock_vector_store.return_value = mock_vs_instance
+
+        tool_uses = []
+        for query in ["slow", "fast"]:
+            tool_use = Mock(type="tool_use", input={"query": query}, id=f"tool_{query}")
+            tool_use.name = "search_course_content"
+            tool_uses.append(tool_use)
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = [
+            Mock(content=tool_uses, stop_reason="tool_use"),
+            Mock(content=[Mock(text="Partial answer")], stop_reason="end_turn"),
+        ]
+        mock_anthropic.return_value = mock_client
+
+        self.test_config.ANSWER_CACHE_SIZE = 0
+        self.test_config.TOOL_DEADLINE = 0.15
+        rag_system = RAGSystem(self.test_config)
+        response, sources = rag_system.query("Compare both courses")
+        returned = list(sources)
+        rag_system.ai_generator._tool_executor.shutdown(wait=True)  # Slow search ends
+
+        self.assertEqual(response, "Partial answer")
+        self.assertEqual([source["text"] for source in returned], ["Course fast - Lesson 1"])
+        self.assertEqual(sources, returned)
+
+    @patch('ai_generator.anthropic.Anthropic')
+    @patch('rag_system.VectorStore')
+    def test_query_returns_sources_of_every_tool_round(self, mock_vector_store, mock_anthropic):
+        """Test that sources found in earlier tool rounds are kept"""
+        mock_vs_instance = Mock()
+        mock_vs_instance.search.side_effect = lambda query, course_name=None, lesson_number=None: SearchResults(
+            documents=[f"{query} content"],
+            metadata=[{"course_title": f"Course {query}", "lesson_number": 2}],
+            distances=[0.1],
+        )
+        mock_vs_instance.get_lesson_link.return_value = None
+        mock_vector_store.return_value = mock_vs_instance
+
+        responses = []
+        for query in ["first", "second"]:
+            tool_use = Mock(type="tool_use", input={"query": query}, id=f"tool_{query}")
+            tool_use.name = "search_course_content"
+            responses.append(Mock(content=[tool_use], stop_reason="tool_use"))
+        responses.append(Mock(content=[Mock(text="Answer")], stop_reason="end_turn"))
+        mock_client = Mock()
+        mock_client.messages.create.side_effect = responses
+        mock_anthropic.return_value = mock_client
+
+        self.test_config.ANSWER_CACHE_SIZE = 0
+        self.test_config.MAX_TOOL_ROUNDS = 3
+        rag_system = RAGSystem(self.test_config)
+        response, sources = rag_system.query("Compare both courses")
+
+        self.assertEqual(mock_client.messages.create.call_count, 3)
+        self.assertEqual([source["text"] for source in sources],
+                         ["Course first - Lesson 2", "Course second - Lesson 2"])
+
     @patch('rag_system.AIGenerator')
     def test_query_handles_ai_generator_exception(self, mock_ai_generator):
         """Test that query handles AI generator exceptions gracefully"""
@@ -254,6 +404,133 @@ class TestRAGIntegration(unittest.TestCase):
         self.assertEqual(total_courses, 3)
         self.assertEqual(total_chunks, 6)  # 2 + 1 + 3 chunks
 
+    @patch('rag_system.VectorStore')
+    def test_add_course_folder_parallel_matches_sequential(self, mock_vector_store):
+        """Test that parallel ingestion indexes the same chunks as in-process ingestion"""
+        docs_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(docs_dir)
+        for n in range(3):
+            with open(os.path.join(docs_dir, f"course{n}.txt"), "w") as f:
+                f.write(
+                    f"Course Title: Course {n}\n"
+                    "Course Link: https://example.com\n"
+                    "Course Instructor: Test Instructor\n\n"
+                    "Lesson 0: Introduction\n"
+                    f"This is course {n}. It has a couple of sentences.\n"
+                )
+
+        indexed = {}
+        totals = {}
+        for workers in (1, 2):
+            mock_vs_instance = Mock()
+            mock_vs_instance.get_existing_course_titles.return_value = ["Course 2"]
+            # Chunks are streamed lazily, so consume them like the real store
+            added = []
+            mock_vs_instance.add_course_content.side_effect = added.extend
+            mock_vector_store.return_value = mock_vs_instance
+            rag_system = RAGSystem(self.test_config)
+
+            total_courses, total_chunks = rag_system.add_course_folder(
+                docs_dir, workers=workers
+            )
+
+            self.assertEqual(total_courses, 2)  # Course 2 already exists
+            totals[workers] = total_chunks
+            indexed[workers] = sorted(chunk.content for chunk in added)
+
+        self.assertEqual(totals[1], len(indexed[1]))
+        self.assertEqual(totals[1], totals[2])
+        self.assertEqual(indexed[1], indexed[2])
+
+    @patch('rag_system.VectorStore')
+    def test_add_course_folder_skips_unchanged_and_updates_changed(self, mock_vector_store):
+        """Test that the ingest manifest skips unchanged files and updates changed ones"""
+        docs_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(docs_dir)
+        file_path = os.path.join(docs_dir, "course.txt")
+        course_text = (
+            "Course Title: Manifest Course\n"
+            "Course Link: https://example.com\n"
+            "Course Instructor: Test Instructor\n\n"
+            "Lesson 0: Introduction\n"
+            "Original lesson content.\n"
+        )
+        with open(file_path, "w") as f:
+            f.write(course_text)
+
+        mock_vs_instance = Mock()
+        mock_vs_instance.add_course_content.side_effect = list  # Consume the chunks
+        mock_vector_store.return_value = mock_vs_instance
+        rag_system = RAGSystem(self.test_config)
+        processor = rag_system.document_processor
+        processor.iter_course_document = Mock(wraps=processor.iter_course_document)
+
+        # First run indexes the file
+        mock_vs_instance.get_existing_course_titles.return_value = []
+        self.assertEqual(rag_system.add_course_folder(docs_dir)[0], 1)
+
+        # Second run (new process, same manifest) skips it without parsing
+        mock_vs_instance.get_existing_course_titles.return_value = ["Manifest Course"]
+        rag_system = RAGSystem(self.test_config)
+        rag_system.document_processor = processor
+        processor.iter_course_document.reset_mock()
+        self.assertEqual(rag_system.add_course_folder(docs_dir), (0, 0))
+        processor.iter_course_document.assert_not_called()
+
+        # Changing the file applies a delta update to the indexed course
+        mock_vs_instance.update_course.return_value = {
+            "embedded": 1, "reused": 0, "unchanged": 0, "deleted": 0
+        }
+        with open(file_path, "w") as f:
+            f.write(course_text.replace("Original", "Edited"))
+        self.assertEqual(rag_system.add_course_folder(docs_dir), (1, 1))
+        mock_vs_instance.delete_course.assert_not_called()
+        updated_chunks = mock_vs_instance.update_course.call_args[0][1]
+        self.assertIn("Edited lesson content.", updated_chunks[0].content)
+
+        # Deleting the file removes its course and forgets the file
+        os.remove(file_path)
+        self.assertEqual(rag_system.remove_files([file_path]), ["Manifest Course"])
+        mock_vs_instance.delete_course.assert_called_once_with("Manifest Course")
+        self.assertIsNone(rag_system.manifest.get(file_path))
+
+    @patch('rag_system.VectorStore')
+    def test_editing_duplicate_file_leaves_indexed_course_alone(self, mock_vector_store):
+        """Test that editing a file skipped as a duplicate title keeps the original course"""
+        docs_dir = os.path.join(self.temp_dir, "docs")
+        os.makedirs(docs_dir)
+        course_text = (
+            "Course Title: Shared Course\n"
+            "Course Link: https://example.com\n\n"
+            "Lesson 0: Introduction\n"
+            "Original lesson content.\n"
+        )
+        paths = [os.path.join(docs_dir, name) for name in ("a.txt", "b.txt")]
+        for path in paths:
+            with open(path, "w") as f:
+                f.write(course_text)
+
+        titles = set()
+        mock_vs_instance = Mock()
+        mock_vs_instance.get_existing_course_titles.side_effect = lambda: list(titles)
+        mock_vs_instance.add_course_content.side_effect = list
+        mock_vs_instance.add_course_metadata.side_effect = lambda course: titles.add(course.title)
+        mock_vector_store.return_value = mock_vs_instance
+        rag_system = RAGSystem(self.test_config)
+        self.assertEqual(rag_system.add_course_folder(docs_dir)[0], 1)
+        owner, duplicate = sorted(paths, key=lambda p: not rag_system.manifest.get(p).chunk_ids)
+
+        with open(duplicate, "w") as f:
+            f.write(course_text.replace("Original", "Edited"))
+        self.assertEqual(rag_system.add_course_folder(docs_dir), (0, 0))
+
+        mock_vs_instance.update_course.assert_not_called()
+        mock_vs_instance.delete_course.assert_not_called()
+        self.assertEqual(mock_vs_instance.add_course_metadata.call_count, 1)
+        self.assertEqual(mock_vs_instance.add_course_content.call_count, 1)
+        self.assertTrue(rag_system.manifest.get(owner).chunk_ids)
+        self.assertEqual(rag_system.manifest.get(duplicate).chunk_ids, [])
+
     @patch('rag_system.os.path.exists')
     def test_add_course_folder_nonexistent(self, mock_exists):
         """Test handling of nonexistent folder"""
@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from result_diversity import merge_passage_text, select_passages
+
+
+def _meta(chunk_index, lesson=1, course="Course"):
+    return {"course_title": course, "lesson_number": lesson, "chunk_index": chunk_index}
+
+
+class TestSelectPassages(unittest.TestCase):
+    """Test cases for MMR selection with adjacent-chunk merging"""
+
+    def setUp(self):
+        # Candidates 0 and 1 are near duplicates; 2 is relevant but different
+        self.vectors = np.array([[1.0, 0.0], [0.99, 0.1], [0.6, 0.8]], dtype=np.float32)
+        self.relevance = np.array([0.95, 0.94, 0.7], dtype=np.float32)
+
+    def test_relevance_only_keeps_ranking(self):
+        """Test that lambda 1.0 selects by relevance alone"""
+        metadatas = [_meta(0, lesson=1), _meta(0, lesson=2), _meta(0, lesson=3)]
+        passages = select_passages(
+            self.relevance,
+            self.vectors,
+            metadatas,
+            2,
+            lambda_mult=1.0,
+            merge_adjacent=False,
+        )
+        self.assertEqual(passages, [[0], [1]])
+
+    def test_mmr_skips_near_duplicates(self):
+        """Test that MMR prefers a different candidate over a near duplicate"""
+        metadatas = [_meta(0, lesson=1), _meta(0, lesson=2), _meta(0, lesson=3)]
+        passages = select_passages(
+            self.relevance,
+            self.vectors,
+            metadatas,
+            2,
+            lambda_mult=0.5,
+            merge_adjacent=False,
+        )
+        self.assertEqual(passages, [[0], [2]])
+
+    def test_adjacent_hits_merge_without_taking_a_slot(self):
+        """Test that neighbouring chunks of a lesson become one passage"""
+        metadatas = [_meta(5), _meta(4), _meta(9)]
+        passages = select_passages(
+            self.relevance,
+            self.vectors,
+            metadatas,
+            2,
+            lambda_mult=1.0,
+            merge_adjacent=True,
+        )
+        self.assertEqual(passages, [[1, 0], [2]])
+
+    def test_merge_is_capped(self):
+        """Test that passages stop growing at max_merged chunks"""
+        vectors = np.eye(4, dtype=np.float32)
+        metadatas = [_meta(0), _meta(1), _meta(2), _meta(3)]
+        passages = select_passages(
+            np.array([0.9, 0.8, 0.7, 0.6]),
+            vectors,
+            metadatas,
+            5,
+            lambda_mult=1.0,
+            max_merged=2,
+        )
+        self.assertEqual(passages, [[0, 1], [2, 3]])
+
+
+class TestMergePassageText(unittest.TestCase):
+    """Test cases for joining overlapping chunk texts"""
+
+    def test_drops_overlap_and_context_prefix(self):
+        """Test that repeated sentences and lesson prefixes are removed"""
+        merged = merge_passage_text(
+            [
+                "Course X Lesson 2 content: One. Two. Three.",
+                "Course X Lesson 2 content: Three. Four.",
+            ]
+        )
+        self.assertEqual(merged, "Course X Lesson 2 content: One. Two. Three. Four.")
+
+    def test_joins_without_overlap(self):
+        """Test that chunks sharing no whole words are joined with a space"""
+        self.assertEqual(
+            merge_passage_text(["Ends here", "ere we go"]), "Ends here ere we go"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
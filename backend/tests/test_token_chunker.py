@@ -0,0 +1,147 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from document_processor import DocumentProcessor
+from token_chunker import TokenChunker
+from tokenizers import Tokenizer
+from tokenizers.models import WordPiece
+from tokenizers.normalizers import BertNormalizer
+from tokenizers.pre_tokenizers import Whitespace
+from tokenizers.processors import BertProcessing
+
+
+def build_tokenizer() -> Tokenizer:
+    """Small WordPiece tokenizer: known words are one token, others split per letter"""
+    words = [
+        "course",
+        "lesson",
+        "content",
+        "the",
+        "a",
+        "is",
+        "this",
+        "sentence",
+        "word",
+    ]
+    letters = [chr(c) for c in range(ord("a"), ord("z") + 1)]
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", ".", ":", "!", "?"] + words + letters
+    vocab += [f"##{letter}" for letter in letters] + [str(n) for n in range(10)]
+    tokenizer = Tokenizer(
+        WordPiece({token: i for i, token in enumerate(vocab)}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.post_processor = BertProcessing(("[SEP]", 3), ("[CLS]", 2))
+    return tokenizer
+
+
+class TestTokenChunker(unittest.TestCase):
+    """Test cases for token-budgeted chunking"""
+
+    def setUp(self):
+        self.chunker = TokenChunker(build_tokenizer(), max_tokens=12, overlap_tokens=4)
+
+    def test_count_tokens_excludes_special_tokens(self):
+        """Counting uses the model's tokenization without [CLS]/[SEP]"""
+        self.assertEqual(self.chunker.special_tokens, 2)
+        self.assertEqual(self.chunker.count_tokens("this is a sentence."), 5)
+        # Unknown word is split into word pieces
+        self.assertEqual(self.chunker.count_tokens("xyz"), 3)
+
+    def test_chunks_fit_model_length(self):
+        """Every chunk including special tokens fits max_tokens"""
+        sentences = [f"this is sentence {n}." for n in range(10)]
+        chunks = self.chunker.chunk_sentences(sentences)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(self.chunker.tokenizer.encode(chunk).ids), 12)
+        # No sentence is lost and the last chunk ends the text
+        self.assertTrue(chunks[-1].endswith("sentence 9."))
+        for sentence in sentences:
+            self.assertTrue(any(sentence in chunk for chunk in chunks))
+
+    def test_overlap_repeats_trailing_sentence(self):
+        """The next chunk starts with the previous chunk's trailing sentences"""
+        sentences = ["this is a word.", "the word is a.", "this is the content."]
+        chunks = TokenChunker(build_tokenizer(), 12, 5).chunk_sentences(sentences)
+
+        self.assertEqual(
+            chunks,
+            ["this is a word. the word is a.", "the word is a. this is the content."],
+        )
+
+    def test_oversized_sentence_split_on_word_boundaries(self):
+        """A sentence longer than the budget is split without breaking words"""
+        sentence = "this " * 6 + "xyzzy " + "word " * 6
+        chunker = TokenChunker(build_tokenizer(), 12, 0)
+        chunks = chunker.chunk_sentences([sentence.strip()])
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks).split(), sentence.split())
+        for chunk in chunks:
+            self.assertLessEqual(self.chunker.count_tokens(chunk), 10)
+
+    def test_token_less_text_is_kept(self):
+        """Text the tokenizer drops stays in the chunk of a neighbouring sentence"""
+        tokenizer = build_tokenizer()
+        tokenizer.normalizer = BertNormalizer(
+            clean_text=True,
+            handle_chinese_chars=False,
+            strip_accents=False,
+            lowercase=False,
+        )
+        chunker = TokenChunker(tokenizer, max_tokens=12, overlap_tokens=0)
+        sentences = ["\x07", "this is a sentence.", "\u200b", "\x07the word."]
+        self.assertEqual(chunker.count_tokens("\u200b"), 0)
+
+        chunks = chunker.chunk_sentences(sentences)
+
+        self.assertEqual(chunks, ["\x07 this is a sentence. \u200b \x07the word."])
+
+    def test_reserved_tokens_shrink_budget(self):
+        """Reserved tokens leave room for context added to the chunk"""
+        sentences = [f"this is sentence {n}." for n in range(10)]
+        for chunk in self.chunker.chunk_sentences(sentences, reserved_tokens=4):
+            self.assertLessEqual(self.chunker.count_tokens(chunk), 6)
+
+
+class TestDocumentProcessorTokenMode(unittest.TestCase):
+    """Test DocumentProcessor with a token chunker"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "course.txt")
+        body = " ".join(f"this is sentence {n}." for n in range(12))
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write(
+                "Course Title: Word\n"
+                "Course Link: https://example.com/course\n"
+                "Course Instructor: Test Instructor\n\n"
+                f"Lesson 1: Intro\n{body}\n"
+                f"Lesson 2: More\n{body}\n"
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_chunks_with_context_fit_model_length(self):
+        """Chunks stay within max_tokens after the lesson context prefix is added"""
+        chunker = TokenChunker(build_tokenizer(), max_tokens=24, overlap_tokens=4)
+        processor = DocumentProcessor(800, 100, chunker)
+
+        course, chunks = processor.process_course_document(self.file_path)
+
+        self.assertEqual(course.title, "Word")
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunker.tokenizer.encode(chunk.content).ids), 24)
+        self.assertEqual([c.chunk_index for c in chunks], list(range(len(chunks))))
+
+
+if __name__ == "__main__":
+    unittest.main()
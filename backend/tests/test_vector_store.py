@@ -0,0 +1,492 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from unittest.mock import patch
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from models import Course, CourseChunk, Lesson
+from vector_store import ResidentEmbeddingFunction, VectorStore
+
+
+class FakeEmbeddingFunction(ResidentEmbeddingFunction):
+    """Deterministic bag-of-words embeddings so tests don't need the ONNX model"""
+
+    embedded_texts = []
+
+    def __call__(self, input):
+        FakeEmbeddingFunction.embedded_texts.extend(input)
+        embeddings = []
+        for text in input:
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1
+            embeddings.append(vector / (np.linalg.norm(vector) or 1.0))
+        return embeddings
+
+
+@patch("vector_store.ResidentEmbeddingFunction", FakeEmbeddingFunction)
+class TestVectorStore(unittest.TestCase):
+    """Test cases for VectorStore indexing against a real ChromaDB"""
+
+    def setUp(self):
+        """Set up a vector store in a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        FakeEmbeddingFunction.embedded_texts = []
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_store(self):
+        return VectorStore(os.path.join(self.temp_dir, "chroma"), "all-MiniLM-L6-v2")
+
+    def _make_chunks(self, texts):
+        return [
+            CourseChunk(
+                content=text,
+                course_title="Delta Course",
+                lesson_number=1,
+                chunk_index=i,
+            )
+            for i, text in enumerate(texts)
+        ]
+
+    def test_update_course_only_embeds_changed_chunks(self):
+        """Test that a delta update re-embeds only new text and drops stale chunks"""
+        store = self._make_store()
+        course = Course(
+            title="Delta Course",
+            course_link="https://example.com",
+            instructor="Test Instructor",
+            lessons=[
+                Lesson(
+                    lesson_number=1, title="Intro", lesson_link="https://example.com/1"
+                )
+            ],
+        )
+        store.add_course_metadata(course)
+        store.add_course_content(
+            self._make_chunks(["alpha one", "beta two", "gamma three"])
+        )
+        FakeEmbeddingFunction.embedded_texts = []
+
+        # Insert a chunk at the front (shifting the rest) and drop the last one
+        course.lessons.append(
+            Lesson(lesson_number=2, title="More", lesson_link="https://example.com/2")
+        )
+        delta = store.update_course(
+            course, self._make_chunks(["new zero", "alpha one"])
+        )
+
+        self.assertEqual(
+            delta, {"embedded": 1, "reused": 1, "unchanged": 0, "deleted": 1}
+        )
+        self.assertEqual(FakeEmbeddingFunction.embedded_texts, ["new zero"])
+
+        stored = store.course_content.get(where={"course_title": "Delta Course"})
+        self.assertEqual(sorted(stored["documents"]), ["alpha one", "new zero"])
+        catalog = store.course_catalog.get(ids=["Delta Course"])
+        self.assertEqual(catalog["metadatas"][0]["lesson_count"], 2)
+
+        # Re-applying the same parse is a no-op
+        delta = store.update_course(
+            course, self._make_chunks(["new zero", "alpha one"])
+        )
+        self.assertEqual(
+            delta, {"embedded": 0, "reused": 0, "unchanged": 2, "deleted": 0}
+        )
+
+    def test_delete_course(self):
+        """Test that deleting a course removes its catalog entry and chunks"""
+        store = self._make_store()
+        store.add_course_metadata(
+            Course(
+                title="Delta Course",
+                course_link="https://example.com",
+                instructor="Test Instructor",
+            )
+        )
+        store.add_course_content(self._make_chunks(["alpha one", "beta two"]))
+
+        store.delete_course("Delta Course")
+
+        self.assertEqual(store.get_existing_course_titles(), [])
+        self.assertEqual(store.course_content.count(), 0)
+
+    def test_rebuild_reuses_cached_embeddings(self):
+        """Test that a rebuild after clear_all_data is served from the embedding cache"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"),
+            "all-MiniLM-L6-v2",
+            embedding_cache_size=100,
+        )
+        chunks = self._make_chunks(["alpha one", "beta two", "alpha one"])
+        store.add_course_content(chunks[:2])
+        self.assertEqual(
+            FakeEmbeddingFunction.embedded_texts, ["alpha one", "beta two"]
+        )
+
+        store.clear_all_data()
+        FakeEmbeddingFunction.embedded_texts = []
+        store.add_course_content(chunks)
+
+        self.assertEqual(FakeEmbeddingFunction.embedded_texts, [])
+        self.assertEqual(store.course_content.count(), 3)
+        self.assertEqual(
+            store.embedding_cache.stats(), {"hits": 3, "misses": 2, "entries": 2}
+        )
+        results = store.search("beta two", limit=1)
+        self.assertEqual(results.documents, ["beta two"])
+
+    def test_add_course_content_streams_batches(self):
+        """Test that a lazy chunk stream is embedded and written in batches"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"),
+            "all-MiniLM-L6-v2",
+            batch_size=2,
+            queue_size=1,
+        )
+        texts = [f"chunk number {n}" for n in range(5)]
+        writes = []
+        add = store.course_content.add
+
+        def record_add(**batch):
+            writes.append(len(batch["ids"]))
+            add(**batch)
+
+        with patch.object(store.course_content, "add", side_effect=record_add):
+            added = store.add_course_content(iter(self._make_chunks(texts)))
+
+        self.assertEqual(added, 5)
+        self.assertEqual(writes, [2, 2, 1])
+        self.assertEqual(store.course_content.count(), 5)
+
+    def test_add_course_content_propagates_producer_errors(self):
+        """Test that a failure while producing chunks surfaces in the caller"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"),
+            "all-MiniLM-L6-v2",
+            batch_size=1,
+            queue_size=1,
+        )
+
+        def failing_chunks():
+            yield from self._make_chunks(["alpha one", "beta two"])
+            raise ValueError("parse failed")
+
+        with self.assertRaises(ValueError):
+            store.add_course_content(failing_chunks())
+        self.assertEqual(store.course_content.count(), 2)
+
+    def test_opens_collections_created_with_default_embedding_function(self):
+        """Test that the resident model matches collections persisted as "default" """
+        chroma_path = os.path.join(self.temp_dir, "chroma")
+        client = chromadb.PersistentClient(
+            path=chroma_path, settings=Settings(anonymized_telemetry=False)
+        )
+        client.get_or_create_collection(
+            "course_catalog", embedding_function=DefaultEmbeddingFunction()
+        )
+
+        store = VectorStore(chroma_path, "all-MiniLM-L6-v2")
+        store.warmup()
+
+        self.assertEqual(FakeEmbeddingFunction.embedded_texts, ["warmup", "warmup"])
+
+    def test_catalog_cache_serves_links_until_catalog_changes(self):
+        """Test that catalog lookups are served from memory and invalidated on writes"""
+        store = self._make_store()
+        store.add_course_metadata(
+            Course(
+                title="Delta Course",
+                course_link="https://example.com",
+                instructor="Test Instructor",
+                lessons=[
+                    Lesson(
+                        lesson_number=1,
+                        title="One",
+                        lesson_link="https://example.com/1",
+                    )
+                ],
+            )
+        )
+
+        with patch.object(
+            store.course_catalog, "get", wraps=store.course_catalog.get
+        ) as get:
+            for _ in range(3):
+                self.assertEqual(
+                    store.get_lesson_link("Delta Course", 1), "https://example.com/1"
+                )
+            self.assertIsNone(store.get_lesson_link("Delta Course", 2))
+            self.assertEqual(
+                store.get_course_link("Delta Course"), "https://example.com"
+            )
+            self.assertEqual(get.call_count, 1)
+
+        store.add_course_metadata(
+            Course(
+                title="Other Course",
+                course_link="https://example.com/o",
+                instructor="Test Instructor",
+            )
+        )
+        self.assertEqual(store.get_course_count(), 2)
+        metadata = {m["title"]: m for m in store.get_all_courses_metadata()}
+        self.assertEqual(
+            metadata["Delta Course"]["lessons"],
+            [
+                {
+                    "lesson_number": 1,
+                    "lesson_title": "One",
+                    "lesson_link": "https://example.com/1",
+                }
+            ],
+        )
+
+        store.clear_all_data()
+        self.assertIsNone(store.get_lesson_link("Delta Course", 1))
+        self.assertEqual(store.get_existing_course_titles(), [])
+
+    def test_catalog_loaded_during_clear_is_dropped(self):
+        """Test that a catalog cached by a reader while clearing doesn't survive"""
+        store = self._make_store()
+        store.add_course_metadata(
+            Course(
+                title="Delta Course",
+                course_link="https://example.com",
+                instructor="Test Instructor",
+            )
+        )
+        delete_collection = store.client.delete_collection
+
+        def delete_while_reading(name):
+            if name == "course_catalog":
+                store.get_existing_course_titles()  # A concurrent query
+            delete_collection(name)
+
+        with patch.object(
+            store.client, "delete_collection", side_effect=delete_while_reading
+        ):
+            store.clear_all_data()
+
+        self.assertEqual(store.get_existing_course_titles(), [])
+        self.assertIsNone(store._resolve_course_name("Delta"))
+
+    def test_search_many_batches_embeddings_and_groups_filters(self):
+        """Test that search_many embeds once, queries once per filter and keeps order"""
+        store = self._make_store()
+        store.add_course_metadata(
+            Course(
+                title="Delta Course",
+                course_link="https://example.com",
+                instructor="Test Instructor",
+            )
+        )
+        store.add_course_content(
+            self._make_chunks(["alpha one", "beta two", "gamma three"])
+        )
+        requests = [
+            ("alpha one", None, None),
+            ("beta two", "delta", None),
+            ("gamma three", "Delta Course", None),
+            ("alpha one", None, None),
+        ]
+
+        with (
+            patch.object(store, "_embed_queries", wraps=store._embed_queries) as embed,
+            patch.object(
+                store.course_content, "query", wraps=store.course_content.query
+            ) as query,
+        ):
+            results = store.search_many(requests, limit=1)
+
+        embed.assert_called_once_with(["alpha one", "beta two", "gamma three"])
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual(
+            [r.documents for r in results],
+            [["alpha one"], ["beta two"], ["gamma three"], ["alpha one"]],
+        )
+        self.assertEqual(
+            results[1].documents, store.search("beta two", "delta", limit=1).documents
+        )
+
+    def test_query_embeddings_are_cached_by_normalized_text(self):
+        """Test that repeated queries reuse their embedding"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"),
+            "all-MiniLM-L6-v2",
+            query_cache_size=2,
+        )
+        store.add_course_content(self._make_chunks(["alpha one", "beta two"]))
+        FakeEmbeddingFunction.embedded_texts = []
+
+        store.search("Alpha one")
+        store.search("  alpha   ONE ")
+        store.search_many([("alpha one", None, None), ("beta two", None, None)])
+
+        self.assertEqual(
+            FakeEmbeddingFunction.embedded_texts, ["Alpha one", "beta two"]
+        )
+        stats = store.query_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 2, 2))
+
+    def test_hybrid_search_fuses_lexical_matches_and_respects_filters(self):
+        """Test that hybrid search finds identifier matches within the filter"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"),
+            "all-MiniLM-L6-v2",
+            search_mode="hybrid",
+        )
+        texts = [f"filler text number {i}" for i in range(30)]
+        texts.append("call client.messages.create with tool_choice")
+        store.add_course_content(self._make_chunks(texts))
+        store.add_course_content(
+            [
+                CourseChunk(
+                    content="other course mentions tool_choice too",
+                    course_title="Other Course",
+                    lesson_number=1,
+                    chunk_index=0,
+                )
+            ]
+        )
+
+        results = store.search("how is tool_choice set", course_name=None, limit=2)
+        self.assertEqual(
+            set(results.documents),
+            {
+                "call client.messages.create with tool_choice",
+                "other course mentions tool_choice too",
+            },
+        )
+        self.assertEqual(results.distances, sorted(results.distances))
+
+        # Lexical ranking honours course and lesson filters
+        hits = store._get_lexical_index().search("tool_choice", 5, "Delta Course", 1)
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(
+            store._get_lexical_index().search("tool_choice", 5, None, 2), []
+        )
+
+        # Deleting a course keeps the lexical index in sync
+        store.delete_course("Other Course")
+        results = store.search("tool_choice", limit=2)
+        self.assertNotIn("other course mentions tool_choice too", results.documents)
+        self.assertEqual(
+            store.search("tool_choice", limit=2, mode="vector").documents,
+            store.search_many([("tool_choice", None, None)], 2, "vector")[0].documents,
+        )
+
+    def test_numpy_backend_supports_updates_and_search(self):
+        """Test that the NumPy content backend works behind the VectorStore API"""
+        store = VectorStore(
+            os.path.join(self.temp_dir, "chroma"), "all-MiniLM-L6-v2", backend="numpy"
+        )
+        course = Course(
+            title="Delta Course",
+            course_link="https://example.com",
+            instructor="Test Instructor",
+        )
+        store.add_course_metadata(course)
+        store.add_course_content(
+            self._make_chunks(["alpha one", "beta two", "gamma three"])
+        )
+
+        delta = store.update_course(
+            course, self._make_chunks(["new zero", "alpha one"])
+        )
+        self.assertEqual(
+            delta, {"embedded": 1, "reused": 1, "unchanged": 0, "deleted": 1}
+        )
+        self.assertEqual(
+            store.search("alpha one", "Delta", limit=1).documents, ["alpha one"]
+        )
+        self.assertEqual(
+            store.search("new zero", limit=1, mode="hybrid").documents, ["new zero"]
+        )
+
+        store.clear_all_data()
+        self.assertEqual(store.course_content.count(), 0)
+        self.assertTrue(store.search("alpha one").is_empty())
+
+    def test_hnsw_config_applies_per_collection(self):
+        """Test that HNSW settings are used at creation and ef_search is updatable"""
+        path = os.path.join(self.temp_dir, "chroma")
+        hnsw = {"space": "cosine", "max_neighbors": 32, "ef_search": 40}
+        store = VectorStore(
+            path, "all-MiniLM-L6-v2", hnsw_config={"course_content": hnsw}
+        )
+        store.add_course_content(self._make_chunks(["alpha one", "beta two"]))
+        content_hnsw = store.course_content.configuration["hnsw"]
+        self.assertEqual(
+            (
+                content_hnsw["space"],
+                content_hnsw["max_neighbors"],
+                content_hnsw["ef_search"],
+            ),
+            ("cosine", 32, 40),
+        )
+        self.assertEqual(store.course_catalog.configuration["hnsw"]["space"], "l2")
+
+        # Reopening changes ef_search in place but cannot rebuild the graph
+        with patch("builtins.print") as mock_print:
+            reopened = VectorStore(
+                path,
+                "all-MiniLM-L6-v2",
+                hnsw_config={"course_content": {"max_neighbors": 16, "ef_search": 80}},
+            )
+        content_hnsw = reopened.course_content.configuration["hnsw"]
+        self.assertEqual(
+            (content_hnsw["max_neighbors"], content_hnsw["ef_search"]), (32, 80)
+        )
+        self.assertIn("max_neighbors=32", mock_print.call_args[0][0])
+        self.assertEqual(reopened.search("alpha one", limit=1).documents, ["alpha one"])
+
+    def test_search_merges_adjacent_chunk_hits(self):
+        """Test that neighbouring hits become one passage on both backends"""
+        for backend in ("chroma", "numpy"):
+            with self.subTest(backend=backend):
+                store = VectorStore(
+                    os.path.join(self.temp_dir, backend),
+                    "all-MiniLM-L6-v2",
+                    backend=backend,
+                    mmr_lambda=1.0,
+                    merge_adjacent=True,
+                )
+                store.add_course_content(
+                    self._make_chunks(
+                        [
+                            "alpha beta gamma. delta epsilon.",
+                            "delta epsilon. zeta eta theta.",
+                            "unrelated words about iota kappa",
+                            "more unrelated words",
+                        ]
+                    )
+                )
+
+                results = store.search("alpha beta delta epsilon zeta", limit=2)
+                self.assertEqual(
+                    results.documents[0],
+                    "alpha beta gamma. delta epsilon. zeta eta theta.",
+                )
+                self.assertEqual(results.metadata[0]["chunk_index"], 0)
+                self.assertEqual(len(results.documents), 2)
+
+                hybrid = store.search(
+                    "alpha beta delta epsilon zeta", limit=2, mode="hybrid"
+                )
+                self.assertEqual(hybrid.documents[0], results.documents[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import bisect
+import itertools
+import os
+
+from tokenizers import Tokenizer
+
+
+class TokenChunker:
+    """Packs sentences into chunks measured in embedding-model tokens"""
+
+    def __init__(self, tokenizer: Tokenizer, max_tokens: int, overlap_tokens: int):
+        """
+        Args:
+            tokenizer: Tokenizer of the embedding model
+            max_tokens: Model's maximum sequence length, including special tokens
+            overlap_tokens: Tokens of trailing sentences repeated in the next chunk
+        """
+        # Count every token: no truncation or padding to the model's length
+        self.tokenizer = Tokenizer.from_str(tokenizer.to_str())
+        self.tokenizer.no_truncation()
+        self.tokenizer.no_padding()
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.special_tokens = self.tokenizer.num_special_tokens_to_add(is_pair=False)
+
+    @classmethod
+    def for_embedding_model(
+        cls, model_name: str, max_tokens: int, overlap_tokens: int
+    ) -> "TokenChunker":
+        """Create a chunker from the local tokenizer of ChromaDB's ONNX embedding model"""
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+        if model_name != ONNXMiniLM_L6_V2.MODEL_NAME:
+            raise ValueError(
+                f"Token chunking needs the tokenizer of '{model_name}', but only "
+                f"'{ONNXMiniLM_L6_V2.MODEL_NAME}' is available locally"
+            )
+
+        embedding_model = ONNXMiniLM_L6_V2()
+        embedding_model._download_model_if_not_exists()
+        tokenizer_path = os.path.join(
+            embedding_model.DOWNLOAD_PATH,
+            embedding_model.EXTRACTED_FOLDER_NAME,
+            "tokenizer.json",
+        )
+        return cls(Tokenizer.from_file(tokenizer_path), max_tokens, overlap_tokens)
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens the model sees for text, excluding special tokens"""
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def chunk_sentences(
+        self, sentences: list[str], reserved_tokens: int = 0
+    ) -> list[str]:
+        """
+        Greedily pack sentences into chunks that fit the model's sequence length.
+
+        Sentences longer than the budget are split at token boundaries using the
+        tokenizer's offset mapping. Text the tokenizer drops entirely (e.g. a
+        sentence of control characters) costs no tokens and is kept with the
+        preceding piece, or the next one at the start.
+
+        Args:
+            sentences: Sentences to pack, in order
+            reserved_tokens: Tokens kept free for context added to each chunk later
+
+        Returns:
+            List of chunk texts
+        """
+        budget = max(self.max_tokens - self.special_tokens - reserved_tokens, 1)
+        encodings = self.tokenizer.encode_batch(sentences, add_special_tokens=False)
+
+        # Split oversized sentences into pieces of at most `budget` tokens,
+        # preferring not to break inside a word
+        pieces = []
+        piece_tokens = []
+        leading = ""  # Token-less text seen before the first piece
+        for sentence, encoding in zip(sentences, encodings, strict=True):
+            offsets = encoding.offsets
+            word_ids = encoding.word_ids
+            if not offsets:
+                text = sentence.strip()
+                if text and pieces:
+                    pieces[-1] = f"{pieces[-1]} {text}"
+                elif text:
+                    leading = f"{leading} {text}".lstrip()
+                continue
+            start = 0
+            while start < len(offsets):
+                end = min(start + budget, len(offsets))
+                if end < len(offsets):
+                    word_end = end
+                    while (
+                        word_end > start + 1
+                        and word_ids[word_end] == word_ids[word_end - 1]
+                    ):
+                        word_end -= 1
+                    if word_ids[word_end] != word_ids[word_end - 1]:
+                        end = word_end
+                # Keep token-less characters at either end of the sentence
+                char_start = offsets[start][0] if start else 0
+                char_end = offsets[end][0] if end < len(offsets) else len(sentence)
+                pieces.append(sentence[char_start:char_end].strip())
+                piece_tokens.append(end - start)
+                start = end
+
+        if leading:
+            if pieces:
+                pieces[0] = f"{leading} {pieces[0]}"
+            else:
+                pieces.append(leading)
+                piece_tokens.append(0)
+
+        # prefix[k] is the token count of the first k pieces
+        prefix = list(itertools.accumulate(piece_tokens, initial=0))
+
+        chunks = []
+        i = 0
+        while i < len(pieces):
+            # Take as many pieces as fit in the budget (always at least one)
+            end = bisect.bisect_right(prefix, prefix[i] + budget, lo=i + 1)
+            end = max(end - 1, i + 1)
+            chunks.append(" ".join(pieces[i:end]))
+
+            if end == len(pieces):
+                break
+
+            # Start the next chunk at the trailing pieces that fit in the overlap
+            overlap_start = bisect.bisect_left(
+                prefix, prefix[end] - self.overlap_tokens, lo=i, hi=end
+            )
+            i = max(overlap_start, i + 1)
+
+        return chunks
@@ -0,0 +1,103 @@
+import time
+from typing import Any
+
+from prompt_usage import prompt_tokens
+
+
+class ToolLoop:
+    """
+    Conversation state and budget of one query's tool-use rounds.
+
+    Each round sends the conversation so far, runs the tool calls of the
+    response and appends both to the conversation. Tools stay available until
+    max_rounds rounds have run, the deadline has passed, or the next request
+    would likely push the cumulative input tokens past the budget; the next
+    request then sets tool_choice "none" so Claude answers from what the
+    tools returned so far. Tool calls get the time left before the deadline
+    (see remaining) and are answered with an error once it runs out.
+    """
+
+    def __init__(
+        self,
+        api_params: dict[str, Any],
+        max_rounds: int,
+        deadline: float,
+        input_token_budget: int,
+    ):
+        """
+        Args:
+            api_params: Parameters of the query's first request
+            max_rounds: Maximum rounds of tool calls
+            deadline: Seconds after which no further tool round starts
+            input_token_budget: Input tokens (cached or not) the query's
+                requests may use in total
+        """
+        self.api_params = api_params
+        self.max_rounds = max_rounds
+        self.deadline = deadline
+        self.input_token_budget = input_token_budget
+        self.messages = list(api_params["messages"])
+        self.rounds = 0
+        self.input_tokens = 0
+        self.stop_reason: str | None = None  # Limit that ended the tool rounds
+        self._last_input_tokens = 0
+        self._started = time.perf_counter()
+        self._round_started = self._started
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (tool calls time out after this)"""
+        return max(0.0, self.deadline - (time.perf_counter() - self._started))
+
+    def next_params(self) -> dict[str, Any]:
+        """Parameters of the next request, without tool use once a limit is hit"""
+        params = {**self.api_params, "messages": self.messages}
+        if self.stop_reason and "tools" in params:
+            # Keep the tools so the request shares the cached prompt prefix
+            params["tool_choice"] = {"type": "none"}
+        return params
+
+    def record_response(self, response) -> bool:
+        """
+        Account for a response's input tokens.
+
+        Returns:
+            Whether the response's tool calls should be run
+        """
+        self._last_input_tokens = prompt_tokens(response.usage)
+        self.input_tokens += self._last_input_tokens
+        return response.stop_reason == "tool_use" and self.stop_reason is None
+
+    def add_round(self, response, tool_results: list[dict[str, Any]]):
+        """Append a round's tool calls and results, then check the limits"""
+        self.rounds += 1
+        self.messages.append({"role": "assistant", "content": response.content})
+        if tool_results:
+            self.messages.append({"role": "user", "content": tool_results})
+
+        now = time.perf_counter()
+        elapsed = now - self._started
+        print(
+            f"Tool round {self.rounds}: {len(tool_results)} tool calls, "
+            f"{self._last_input_tokens} input tokens "
+            f"({self.input_tokens} so far), {now - self._round_started:.2f}s"
+        )
+        self._round_started = now
+
+        # The next request resends everything, so it needs at least as many
+        # input tokens as this one did
+        if self.rounds >= self.max_rounds:
+            self.stop_reason = "max_rounds"
+        elif elapsed >= self.deadline:
+            self.stop_reason = "deadline"
+        elif self.input_tokens + self._last_input_tokens > self.input_token_budget:
+            self.stop_reason = "token_budget"
+
+    def finish(self) -> str:
+        """Log the loop's totals and return why it ended"""
+        stop_reason = self.stop_reason or "answered"
+        print(
+            f"Answered after {self.rounds} tool rounds ({stop_reason}): "
+            f"{self.input_tokens} input tokens, "
+            f"{time.perf_counter() - self._started:.2f}s"
+        )
+        return stop_reason
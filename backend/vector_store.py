@@ -1,9 +1,77 @@
+import hashlib
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, NamedTuple
 
 import chromadb
+import numpy as np
+from bm25_index import BM25Index
 from chromadb.config import Settings
-from models import Course, CourseChunk
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+from course_resolver import CourseResolver
+from embedding_cache import EmbeddingCache
+from lru_cache import LRUCache
+from models import Course, CourseChunk, Lesson
+from numpy_backend import NumpyCollection
+from result_diversity import merge_passage_text, select_passages, unit_rows
+
+# HNSW settings fixed when an index is built; the others can be changed later
+HNSW_BUILD_SETTINGS = ("space", "max_neighbors", "ef_construction")
+
+# Reciprocal rank fusion constant: a result at rank r contributes 1 / (RRF_K + r)
+RRF_K = 60
+# Hybrid search fuses this many candidates per ranking for each result returned
+HYBRID_CANDIDATE_FACTOR = 4
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text, used to detect changed chunks"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResidentEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    ChromaDB's default embedding model, kept loaded between calls.
+
+    DefaultEmbeddingFunction builds a new ONNXMiniLM_L6_V2 on every call,
+    reloading the model and tokenizer each time. This is the same model with
+    its session cached, registered under the "default" name so collections
+    created with DefaultEmbeddingFunction still match.
+    """
+
+    @staticmethod
+    def name() -> str:
+        return "default"
+
+    def get_config(self) -> dict[str, Any]:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> "ResidentEmbeddingFunction":
+        return ResidentEmbeddingFunction()
+
+
+class SearchRequest(NamedTuple):
+    """One query for VectorStore.search_many"""
+
+    query: str
+    course_name: str | None = None
+    lesson_number: int | None = None
+
+
+@dataclass
+class CatalogCache:
+    """Course catalog parsed once and kept in memory"""
+
+    courses: dict[str, Course]  # Title -> course with its lessons
+    lesson_links: dict[tuple[str, int], str | None]  # (title, lesson) -> link
+    resolver: CourseResolver  # Maps partial course names to titles
 
 
 @dataclass
@@ -16,17 +84,23 @@ class SearchResults:
     error: str | None = None
 
     @classmethod
-    def from_chroma(cls, chroma_results: dict) -> "SearchResults":
-        """Create SearchResults from ChromaDB query results"""
+    def from_chroma(cls, chroma_results: dict, index: int = 0) -> "SearchResults":
+        """Create SearchResults from ChromaDB query results for the index-th query"""
         return cls(
             documents=(
-                chroma_results["documents"][0] if chroma_results["documents"] else []
+                chroma_results["documents"][index]
+                if chroma_results["documents"]
+                else []
             ),
             metadata=(
-                chroma_results["metadatas"][0] if chroma_results["metadatas"] else []
+                chroma_results["metadatas"][index]
+                if chroma_results["metadatas"]
+                else []
             ),
             distances=(
-                chroma_results["distances"][0] if chroma_results["distances"] else []
+                chroma_results["distances"][index]
+                if chroma_results["distances"]
+                else []
             ),
         )
 
@@ -43,17 +117,70 @@ class SearchResults:
 class VectorStore:
     """Vector storage using ChromaDB for course content and metadata"""
 
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    def __init__(
+        self,
+        chroma_path: str,
+        embedding_model: str,
+        max_results: int = 5,
+        embedding_cache_size: int = 0,
+        batch_size: int = 64,
+        queue_size: int = 2,
+        query_cache_size: int = 1024,
+        search_mode: str = "vector",
+        backend: str = "chroma",
+        quantization: str = "none",
+        rerank_factor: int = 8,
+        hnsw_config: dict[str, dict[str, Any]] | None = None,
+        mmr_lambda: float = 1.0,
+        mmr_fetch_factor: int = 4,
+        merge_adjacent: bool = False,
+    ):
+        if quantization != "none" and backend != "numpy":
+            raise ValueError("Embedding quantization requires the numpy backend")
         self.max_results = max_results
+        self.backend = backend  # Course content store: "chroma" or "numpy"
+        self.quantization = quantization  # First-pass codes (numpy backend)
+        self.rerank_factor = rerank_factor  # Candidates re-scored per result
+        self.hnsw_config = hnsw_config or {}  # Collection name -> HNSW settings
+        self.mmr_lambda = mmr_lambda  # Relevance weight in MMR (1.0 = off)
+        self.mmr_fetch_factor = mmr_fetch_factor  # Candidates per result for MMR
+        self.merge_adjacent = merge_adjacent  # Merge neighbouring chunk hits
+        self.chroma_path = chroma_path
+        self.search_mode = search_mode  # "vector" or "hybrid"
+        self.embedding_model = embedding_model
+        self.batch_size = batch_size  # Chunks embedded and written per batch
+        self.queue_size = queue_size  # Embedded batches waiting to be written
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
             path=chroma_path, settings=Settings(anonymized_telemetry=False)
         )
 
         # Use default embedding function (no external dependencies)
-        self.embedding_function = (
-            chromadb.utils.embedding_functions.DefaultEmbeddingFunction()
-        )
+        self.embedding_function = ResidentEmbeddingFunction()
+
+        # Cache chunk embeddings across rebuilds and re-ingests (0 = disabled)
+        self.embedding_cache = None
+        if embedding_cache_size > 0:
+            self.embedding_cache = EmbeddingCache(
+                os.path.join(chroma_path, "embedding_cache.sqlite3"),
+                embedding_cache_size,
+            )
+
+        # Recent query embeddings, keyed by normalized query text
+        self.query_cache = LRUCache(query_cache_size)
+
+        # Lexical index for hybrid search, built from ChromaDB on first use and
+        # then kept in sync with every content write
+        self._lexical_index: BM25Index | None = None
+        self._lexical_lock = threading.Lock()
+
+        # Built lazily from the catalog; reset whenever the catalog changes
+        self._catalog: CatalogCache | None = None
+        self._catalog_version = 0
+
+        # Bumped on every catalog or content write, so caches of answers
+        # derived from the index can tell when they went stale
+        self.index_version = 0
 
         # Create collections for different types of data
         self.course_catalog = self._create_collection(
@@ -64,10 +191,57 @@ class VectorStore:
         )  # Actual course material
 
     def _create_collection(self, name: str):
-        """Create or get a ChromaDB collection"""
-        return self.client.get_or_create_collection(
-            name=name, embedding_function=self.embedding_function
+        """Create or get a collection (course content may use the NumPy backend)"""
+        if name == "course_content" and self.backend == "numpy":
+            return NumpyCollection(
+                os.path.join(self.chroma_path, "numpy_content"),
+                self.embedding_function,
+                self.quantization,
+                self.rerank_factor,
+            )
+        hnsw = self.hnsw_config.get(name)
+        collection = self.client.get_or_create_collection(
+            name=name,
+            embedding_function=self.embedding_function,
+            configuration={"hnsw": hnsw} if hnsw else None,
         )
+        if hnsw:
+            self._apply_hnsw_config(collection, hnsw)
+        return collection
+
+    def _apply_hnsw_config(self, collection, hnsw: dict[str, Any]):
+        """
+        Bring an existing collection's HNSW search settings in line with hnsw.
+
+        ChromaDB reads ef_search when it loads the index, so this must run
+        before the collection is first queried or written to.
+        """
+        current = (collection.configuration or {}).get("hnsw") or {}
+        changed = {
+            key: value
+            for key, value in hnsw.items()
+            if key not in HNSW_BUILD_SETTINGS and current.get(key) != value
+        }
+        if changed:
+            collection.modify(configuration={"hnsw": changed})
+
+        stale = [
+            f"{key}={current.get(key)}"
+            for key in HNSW_BUILD_SETTINGS
+            if key in hnsw and current.get(key) != hnsw[key]
+        ]
+        if stale:
+            print(
+                f"{collection.name} index was built with {', '.join(stale)}; "
+                "clear and rebuild it to apply the configured HNSW settings"
+            )
+
+    def warmup(self):
+        """Load the embedding model, the course resolver and the content index
+        so the first user query doesn't pay for model loading or cold caches"""
+        self.embedding_function(["warmup"])
+        self._get_catalog()
+        self.course_content.query(query_texts=["warmup"], n_results=1)
 
     def search(
         self,
@@ -75,6 +249,7 @@ class VectorStore:
         course_name: str | None = None,
         lesson_number: int | None = None,
         limit: int | None = None,
+        mode: str | None = None,
     ) -> SearchResults:
         """
         Main search interface that handles course resolution and content search.
@@ -84,45 +259,365 @@ class VectorStore:
             course_name: Optional course name/title to filter by
             lesson_number: Optional lesson number to filter by
             limit: Maximum results to return
+            mode: "vector" or "hybrid" (defaults to the store's search mode)
 
         Returns:
             SearchResults object with documents and metadata
         """
-        # Step 1: Resolve course name if provided
-        course_title = None
-        if course_name:
-            course_title = self._resolve_course_name(course_name)
-            if not course_title:
-                return SearchResults.empty(f"No course found matching '{course_name}'")
+        return self.search_many(
+            [SearchRequest(query, course_name, lesson_number)], limit, mode
+        )[0]
 
-        # Step 2: Build filter for content search
-        filter_dict = self._build_filter(course_title, lesson_number)
+    def search_many(
+        self,
+        requests: list[SearchRequest | tuple[str, str | None, int | None]],
+        limit: int | None = None,
+        mode: str | None = None,
+    ) -> list[SearchResults]:
+        """
+        Run several searches with one embedding call.
 
-        # Step 3: Search course content
+        All query texts are embedded in a single batch, and requests that share
+        a filter (resolved course and lesson) go to ChromaDB as one query.
+
+        In hybrid mode each query is also ranked by BM25 over the same filter,
+        and the lexical and vector rankings are combined with reciprocal rank
+        fusion, so exact identifiers and API names are found even when their
+        embeddings are not close to the query's.
+
+        With MMR or adjacent-chunk merging enabled, more candidates are fetched
+        and re-ranked for diversity, and hits on neighbouring chunks of a
+        lesson are returned as one merged passage, so overlapping chunks don't
+        fill several result slots with the same text.
+
+        Args:
+            requests: (query, course_name, lesson_number) tuples
+            limit: Maximum results to return per query
+            mode: "vector" or "hybrid" (defaults to the store's search mode)
+
+        Returns:
+            One SearchResults per request, in request order
+        """
+        requests = [SearchRequest(*request) for request in requests]
+        results: list[SearchResults | None] = [None] * len(requests)
+
+        # Step 1: Resolve course names and group requests by filter
+        groups: dict[str, tuple[dict | None, str | None, int | None, list[int]]] = {}
+        for i, request in enumerate(requests):
+            course_title = None
+            if request.course_name:
+                course_title = self._resolve_course_name(request.course_name)
+                if not course_title:
+                    results[i] = SearchResults.empty(
+                        f"No course found matching '{request.course_name}'"
+                    )
+                    continue
+            filter_dict = self._build_filter(course_title, request.lesson_number)
+            key = json.dumps(filter_dict, sort_keys=True)
+            groups.setdefault(
+                key, (filter_dict, course_title, request.lesson_number, [])
+            )[3].append(i)
+
+        if not groups:
+            return results
+
+        # Step 2: Embed every distinct query text in one batch
         # Use provided limit or fall back to configured max_results
         search_limit = limit if limit is not None else self.max_results
-
         try:
-            results = self.course_content.query(
-                query_texts=[query], n_results=search_limit, where=filter_dict
+            texts = list(
+                dict.fromkeys(
+                    requests[i].query
+                    for *_, indexes in groups.values()
+                    for i in indexes
+                )
             )
-            return SearchResults.from_chroma(results)
+            embeddings = dict(zip(texts, self._embed_queries(texts), strict=True))
         except Exception as e:
-            return SearchResults.empty(f"Search error: {str(e)}")
+            error = SearchResults.empty(f"Search error: {str(e)}")
+            return [result or error for result in results]
+
+        # Step 3: Search course content, one ChromaDB query per filter
+        hybrid = (mode or self.search_mode) == "hybrid"
+        diversify = self.mmr_lambda < 1.0 or self.merge_adjacent
+        fetch_limit = (
+            search_limit * self.mmr_fetch_factor if diversify else search_limit
+        )
+        candidates = fetch_limit * HYBRID_CANDIDATE_FACTOR if hybrid else fetch_limit
+        include = ["documents", "metadatas", "distances"]
+        if diversify:
+            include.append("embeddings")
+        for filter_dict, course_title, lesson_number, indexes in groups.values():
+            try:
+                chroma_results = self.course_content.query(
+                    query_embeddings=[embeddings[requests[i].query] for i in indexes],
+                    n_results=candidates,
+                    where=filter_dict,
+                    include=include,
+                )
+                for position, i in enumerate(indexes):
+                    results[i] = SearchResults.from_chroma(chroma_results, position)
+                    vectors = (
+                        chroma_results["embeddings"][position] if diversify else None
+                    )
+                    if hybrid:
+                        lexical_hits = self._get_lexical_index().search(
+                            requests[i].query, candidates, course_title, lesson_number
+                        )
+                        results[i], vectors = self._fuse_rankings(
+                            chroma_results["ids"][position],
+                            results[i],
+                            vectors,
+                            [chunk_id for chunk_id, _ in lexical_hits],
+                            fetch_limit,
+                        )
+                    if diversify:
+                        results[i] = self._diversify(
+                            embeddings[requests[i].query],
+                            results[i],
+                            vectors,
+                            search_limit,
+                            hybrid,
+                        )
+            except Exception as e:
+                for i in indexes:
+                    results[i] = SearchResults.empty(f"Search error: {str(e)}")
+
+        return results
+
+    def _fuse_rankings(
+        self,
+        vector_ids: list[str],
+        vector_results: SearchResults,
+        vector_embeddings: list | None,
+        lexical_ids: list[str],
+        limit: int,
+    ) -> tuple[SearchResults, list | None]:
+        """
+        Combine vector and lexical rankings with reciprocal rank fusion.
+
+        Distances of fused results are 1 minus the fused score relative to the
+        best possible score (ranked first by both), so 0 is the best match.
+
+        Returns:
+            Fused results, and their embeddings if vector_embeddings was given
+        """
+        scores: dict[str, float] = {}
+        for ranking in (vector_ids, lexical_ids):
+            for rank, chunk_id in enumerate(ranking, start=1):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1 / (RRF_K + rank)
+        fused = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+
+        # Chunks found only lexically are fetched from ChromaDB
+        with_embeddings = vector_embeddings is not None
+        found = {
+            chunk_id: (document, metadata, embedding)
+            for chunk_id, document, metadata, embedding in zip(
+                vector_ids,
+                vector_results.documents,
+                vector_results.metadata,
+                vector_embeddings if with_embeddings else [None] * len(vector_ids),
+                strict=True,
+            )
+        }
+        missing = [chunk_id for chunk_id in fused if chunk_id not in found]
+        if missing:
+            include = ["documents", "metadatas"]
+            if with_embeddings:
+                include.append("embeddings")
+            fetched = self.course_content.get(ids=missing, include=include)
+            found.update(
+                zip(
+                    fetched["ids"],
+                    zip(
+                        fetched["documents"],
+                        fetched["metadatas"],
+                        (
+                            fetched["embeddings"]
+                            if with_embeddings
+                            else [None] * len(fetched["ids"])
+                        ),
+                        strict=True,
+                    ),
+                    strict=True,
+                )
+            )
+
+        fused = [chunk_id for chunk_id in fused if chunk_id in found]
+        best_score = 2 / (RRF_K + 1)
+        results = SearchResults(
+            documents=[found[chunk_id][0] for chunk_id in fused],
+            metadata=[found[chunk_id][1] for chunk_id in fused],
+            distances=[1 - scores[chunk_id] / best_score for chunk_id in fused],
+        )
+        embeddings = [found[chunk_id][2] for chunk_id in fused]
+        return results, embeddings if with_embeddings else None
+
+    def _diversify(
+        self,
+        query_embedding: Any,
+        results: SearchResults,
+        embeddings: list,
+        limit: int,
+        hybrid: bool,
+    ) -> SearchResults:
+        """
+        Re-rank over-fetched results by MMR and merge neighbouring chunks.
+
+        Relevance is the cosine similarity to the query, or in hybrid mode the
+        fused score. A merged passage keeps the metadata of its first chunk and
+        the distance of its best one.
+        """
+        if results.is_empty():
+            return results
+        if hybrid:
+            relevance = 1 - np.asarray(results.distances, dtype=np.float32)
+        else:
+            relevance = unit_rows(embeddings) @ unit_rows(query_embedding)
+
+        passages = select_passages(
+            relevance,
+            embeddings,
+            results.metadata,
+            limit,
+            self.mmr_lambda,
+            self.merge_adjacent,
+        )
+        return SearchResults(
+            documents=[
+                merge_passage_text([results.documents[i] for i in passage])
+                for passage in passages
+            ],
+            metadata=[results.metadata[passage[0]] for passage in passages],
+            distances=[
+                min(results.distances[i] for i in passage) for passage in passages
+            ],
+        )
+
+    def _get_lexical_index(self) -> BM25Index:
+        """Get the BM25 index, building it from the stored chunks if needed"""
+        with self._lexical_lock:
+            if self._lexical_index is None:
+                stored = self.course_content.get(include=["documents", "metadatas"])
+                index = BM25Index()
+                index.add(stored["ids"], stored["documents"], stored["metadatas"])
+                self._lexical_index = index
+            return self._lexical_index
+
+    def _update_lexical_index(
+        self,
+        ids: list[str],
+        documents: list[str] | None = None,
+        metadatas: list[dict[str, Any]] | None = None,
+        removed_course: str | None = None,
+    ):
+        """Apply a content write to the BM25 index, if it has been built"""
+        self.index_version += 1
+        with self._lexical_lock:
+            if self._lexical_index is None:
+                return
+            if removed_course is not None:
+                self._lexical_index.remove_course(removed_course)
+            elif documents is None:
+                self._lexical_index.remove(ids)
+            else:
+                self._lexical_index.add(ids, documents, metadatas)
+
+    def embed_query(self, text: str):
+        """Embed a query text (cached like search queries)"""
+        return self._embed_queries([text])[0]
+
+    def _embed_queries(self, texts: list[str]) -> list:
+        """
+        Embed query texts, reusing recent embeddings from the query cache.
+
+        Keys are lowercased with whitespace collapsed; the embedding model is
+        uncased and ignores extra whitespace, so equal keys embed identically.
+        """
+        keys = [" ".join(text.lower().split()) for text in texts]
+        embeddings = {}
+        missing = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key in embeddings or key in missing:
+                continue
+            embedding = self.query_cache.get(key)
+            if embedding is None:
+                missing[key] = text
+            else:
+                embeddings[key] = embedding
+
+        if missing:
+            computed = self.embedding_function(list(missing.values()))
+            for key, embedding in zip(missing, computed, strict=True):
+                self.query_cache.put(key, embedding)
+                embeddings[key] = embedding
+
+        return [embeddings[key] for key in keys]
 
     def _resolve_course_name(self, course_name: str) -> str | None:
-        """Use vector search to find best matching course by name"""
+        """Find the best matching course title using the in-memory resolver"""
         try:
-            results = self.course_catalog.query(query_texts=[course_name], n_results=1)
-
-            if results["documents"][0] and results["metadatas"][0]:
-                # Return the title (which is now the ID)
-                return results["metadatas"][0][0]["title"]
+            return self._get_catalog().resolver.resolve(course_name)
         except Exception as e:
             print(f"Error resolving course name: {e}")
 
         return None
 
+    def closest_course(self, embedding) -> str | None:
+        """Find the course title most similar to an embedded text"""
+        try:
+            return self._get_catalog().resolver.closest(embedding)
+        except Exception as e:
+            print(f"Error finding closest course: {e}")
+
+        return None
+
+    def _get_catalog(self) -> CatalogCache:
+        """Get the catalog cache, loading it from ChromaDB if needed"""
+        catalog = self._catalog
+        if catalog is not None:
+            return catalog
+
+        version = self._catalog_version
+        results = self.course_catalog.get(include=["metadatas", "embeddings"])
+        courses = {}
+        lesson_links = {}
+        for title, metadata in zip(results["ids"], results["metadatas"], strict=True):
+            lessons = [
+                Lesson(
+                    lesson_number=lesson["lesson_number"],
+                    title=lesson["lesson_title"],
+                    lesson_link=lesson.get("lesson_link"),
+                )
+                for lesson in json.loads(metadata.get("lessons_json") or "[]")
+            ]
+            courses[title] = Course(
+                title=metadata.get("title", title),
+                course_link=metadata.get("course_link"),
+                instructor=metadata.get("instructor"),
+                lessons=lessons,
+            )
+            for lesson in lessons:
+                lesson_links[(title, lesson.lesson_number)] = lesson.lesson_link
+
+        catalog = CatalogCache(
+            courses=courses,
+            lesson_links=lesson_links,
+            resolver=CourseResolver(
+                results["ids"], results["embeddings"], self.embedding_function
+            ),
+        )
+        # Don't keep a snapshot that an add/delete made stale while loading
+        if version == self._catalog_version:
+            self._catalog = catalog
+        return catalog
+
+    def _invalidate_catalog(self):
+        """Drop the catalog cache after the catalog changes"""
+        self._catalog_version += 1
+        self.index_version += 1
+        self._catalog = None
+
     def _build_filter(
         self, course_title: str | None, lesson_number: int | None
     ) -> dict | None:
@@ -146,10 +641,15 @@ class VectorStore:
 
     def add_course_metadata(self, course: Course):
         """Add course information to the catalog for semantic search"""
-        import json
-
-        course_text = course.title
+        self.course_catalog.add(
+            documents=[course.title],
+            metadatas=[self._build_course_metadata(course)],
+            ids=[course.title],
+        )
+        self._invalidate_catalog()
 
+    def _build_course_metadata(self, course: Course) -> dict[str, Any]:
+        """Build the catalog metadata stored for a course"""
         # Build lessons metadata and serialize as JSON string
         lessons_metadata = []
         for lesson in course.lessons:
@@ -161,63 +661,266 @@ class VectorStore:
                 }
             )
 
-        self.course_catalog.add(
-            documents=[course_text],
-            metadatas=[
-                {
-                    "title": course.title,
-                    "instructor": course.instructor,
-                    "course_link": course.course_link,
-                    "lessons_json": json.dumps(
-                        lessons_metadata
-                    ),  # Serialize as JSON string
-                    "lesson_count": len(course.lessons),
-                }
-            ],
-            ids=[course.title],
-        )
+        return {
+            "title": course.title,
+            "instructor": course.instructor,
+            "course_link": course.course_link,
+            "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
+            "lesson_count": len(course.lessons),
+        }
 
-    def add_course_content(self, chunks: list[CourseChunk]):
-        """Add course content chunks to the vector store"""
-        if not chunks:
-            return
-
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [
-            {
-                "course_title": chunk.course_title,
-                "lesson_number": chunk.lesson_number,
-                "chunk_index": chunk.chunk_index,
-            }
-            for chunk in chunks
-        ]
-        # Use title with chunk index for unique IDs
-        ids = [
-            f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
-            for chunk in chunks
-        ]
+    def add_course_content(self, chunks: Iterable[CourseChunk]) -> int:
+        """
+        Add course content chunks to the vector store.
+
+        Chunks may be a lazy iterable (e.g. a document being parsed); they are
+        consumed, embedded and written in batches of batch_size.
+
+        Returns:
+            Number of chunks added
+        """
+        return self._write_pipelined(chunks, self.course_content.add)
 
-        self.course_content.add(documents=documents, metadatas=metadatas, ids=ids)
+    def _write_pipelined(
+        self, chunks: Iterable[CourseChunk], write: Callable[..., Any]
+    ) -> int:
+        """
+        Embed and write chunks batch by batch, overlapping the two stages.
+
+        A background thread embeds batch N+1 while batch N is written to
+        ChromaDB. The queue between them holds at most queue_size batches, so
+        a fast producer blocks instead of buffering a whole course in memory.
+
+        Args:
+            chunks: Chunks to write
+            write: Collection method called with ids, documents, metadatas
+                and embeddings (add or upsert)
+
+        Returns:
+            Number of chunks written
+        """
+        start = time.perf_counter()
+        batches = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        embed_time = 0.0
+
+        def produce():
+            nonlocal embed_time
+            try:
+                for batch in itertools.batched(chunks, self.batch_size):
+                    if stop.is_set():
+                        return
+                    embed_start = time.perf_counter()
+                    documents = [chunk.content for chunk in batch]
+                    metadatas = [self._build_chunk_metadata(chunk) for chunk in batch]
+                    prepared = {
+                        "ids": [chunk.vector_id() for chunk in batch],
+                        "documents": documents,
+                        "metadatas": metadatas,
+                        "embeddings": self._embed_documents(documents, metadatas),
+                    }
+                    embed_time += time.perf_counter() - embed_start
+                    batches.put(prepared)
+                batches.put(None)
+            except Exception as e:
+                batches.put(e)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        written = 0
+        write_time = 0.0
+        try:
+            while (batch := batches.get()) is not None:
+                if isinstance(batch, Exception):
+                    raise batch
+                write_start = time.perf_counter()
+                write(**batch)
+                self._update_lexical_index(
+                    batch["ids"], batch["documents"], batch["metadatas"]
+                )
+                write_time += time.perf_counter() - write_start
+                written += len(batch["ids"])
+        finally:
+            # Unblock and wait for the producer if the writer stopped early
+            stop.set()
+            while producer.is_alive():
+                try:
+                    batches.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            producer.join()
+
+        elapsed = time.perf_counter() - start
+        if written:
+            print(
+                f"Indexed {written} chunks in {elapsed:.2f}s "
+                f"({written / elapsed:.0f} chunks/sec; "
+                f"embed {embed_time:.2f}s, write {write_time:.2f}s)"
+            )
+        return written
+
+    def _embed_documents(
+        self, documents: list[str], metadatas: list[dict[str, Any]]
+    ) -> list:
+        """
+        Embed chunk texts, reusing vectors from the embedding cache if enabled.
+
+        Args:
+            documents: Chunk texts
+            metadatas: Chunk metadata, carrying each text's content hash
+
+        Returns:
+            One embedding per document
+        """
+        if not self.embedding_cache:
+            return self.embedding_function(documents)
+
+        hashes = [metadata["content_hash"] for metadata in metadatas]
+        vectors = self.embedding_cache.get_many(self.embedding_model, hashes)
+
+        missing = {}
+        for text_hash, document in zip(hashes, documents, strict=True):
+            if text_hash not in vectors:
+                missing.setdefault(text_hash, document)
+        if missing:
+            computed = dict(
+                zip(
+                    missing,
+                    self.embedding_function(list(missing.values())),
+                    strict=True,
+                )
+            )
+            self.embedding_cache.put_many(self.embedding_model, computed)
+            vectors.update(computed)
+
+        return [vectors[text_hash] for text_hash in hashes]
+
+    def _build_chunk_metadata(self, chunk: CourseChunk) -> dict[str, Any]:
+        """Build the metadata stored alongside a content chunk"""
+        return {
+            "course_title": chunk.course_title,
+            "lesson_number": chunk.lesson_number,
+            "chunk_index": chunk.chunk_index,
+            "content_hash": content_hash(chunk.content),
+        }
+
+    def update_course(
+        self, course: Course, chunks: list[CourseChunk]
+    ) -> dict[str, int]:
+        """
+        Bring an indexed course in line with a fresh parse of its document.
+
+        Chunks are matched by content hash, so only new or edited text is
+        re-embedded. Text that merely moved (e.g. shifted chunk indexes after an
+        insertion) is re-written with its stored embedding, stale chunk IDs are
+        deleted and the catalog entry is updated in place.
+
+        Args:
+            course: Freshly parsed course metadata
+            chunks: Freshly parsed course chunks
+
+        Returns:
+            Counts of "embedded", "reused", "unchanged" and "deleted" chunks
+        """
+        stored = self.course_content.get(
+            where={"course_title": course.title}, include=["metadatas", "embeddings"]
+        )
+        stored_metadata = dict(zip(stored["ids"], stored["metadatas"], strict=True))
+        stored_embeddings = {
+            metadata.get("content_hash"): embedding
+            for metadata, embedding in zip(
+                stored["metadatas"], stored["embeddings"], strict=True
+            )
+        }
+
+        embed = []
+        reuse = {"ids": [], "documents": [], "metadatas": [], "embeddings": []}
+        unchanged = 0
+        for chunk in chunks:
+            chunk_id = chunk.vector_id()
+            metadata = self._build_chunk_metadata(chunk)
+            previous = stored_metadata.get(chunk_id)
+            if previous and all(previous.get(k) == v for k, v in metadata.items()):
+                unchanged += 1
+                continue
+
+            if metadata["content_hash"] not in stored_embeddings:
+                embed.append(chunk)
+                continue
+            reuse["ids"].append(chunk_id)
+            reuse["documents"].append(chunk.content)
+            reuse["metadatas"].append(metadata)
+            reuse["embeddings"].append(stored_embeddings[metadata["content_hash"]])
+
+        if reuse["ids"]:
+            self.course_content.upsert(**reuse)
+            self._update_lexical_index(
+                reuse["ids"], reuse["documents"], reuse["metadatas"]
+            )
+        if embed:
+            self._write_pipelined(embed, self.course_content.upsert)
+
+        stale_ids = set(stored_metadata) - {chunk.vector_id() for chunk in chunks}
+        if stale_ids:
+            self.course_content.delete(ids=list(stale_ids))
+            self._update_lexical_index(list(stale_ids))
+
+        # The title (catalog document) is unchanged, so only update its metadata
+        if self.course_catalog.get(ids=[course.title])["ids"]:
+            self.course_catalog.update(
+                ids=[course.title], metadatas=[self._build_course_metadata(course)]
+            )
+            self._invalidate_catalog()
+        else:
+            self.add_course_metadata(course)
+
+        return {
+            "embedded": len(embed),
+            "reused": len(reuse["ids"]),
+            "unchanged": unchanged,
+            "deleted": len(stale_ids),
+        }
+
+    def describe_embedding_cache(self) -> str | None:
+        """Summarize embedding cache hits and misses, if the cache is enabled"""
+        if not self.embedding_cache:
+            return None
+        stats = self.embedding_cache.stats()
+        return (
+            f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['entries']} vectors cached)"
+        )
+
+    def delete_course(self, course_title: str):
+        """Remove a course's catalog entry and all of its content chunks"""
+        self.course_catalog.delete(ids=[course_title])
+        self.course_content.delete(where={"course_title": course_title})
+        self._update_lexical_index([], removed_course=course_title)
+        self._invalidate_catalog()
 
     def clear_all_data(self):
         """Clear all data from both collections"""
+        with self._lexical_lock:
+            self._lexical_index = None
         try:
             self.client.delete_collection("course_catalog")
-            self.client.delete_collection("course_content")
-            # Recreate collections
             self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            if self.backend == "numpy":
+                self.course_content.reset()
+            else:
+                self.client.delete_collection("course_content")
+                self.course_content = self._create_collection("course_content")
         except Exception as e:
             print(f"Error clearing data: {e}")
+        # Invalidate afterwards, so a catalog (or answer) cached by a concurrent
+        # reader while the collections were being cleared is dropped too
+        self._invalidate_catalog()
 
     def get_existing_course_titles(self) -> list[str]:
         """Get all existing course titles from the vector store"""
         try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return results["ids"]
-            return []
+            return list(self._get_catalog().courses)
         except Exception as e:
             print(f"Error getting existing course titles: {e}")
             return []
@@ -225,66 +928,52 @@ class VectorStore:
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
         try:
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return len(results["ids"])
-            return 0
+            return len(self._get_catalog().courses)
         except Exception as e:
             print(f"Error getting course count: {e}")
             return 0
 
+    def get_course(self, course_title: str) -> Course | None:
+        """Get a course and its lessons by exact title"""
+        try:
+            return self._get_catalog().courses.get(course_title)
+        except Exception as e:
+            print(f"Error getting course: {e}")
+            return None
+
     def get_all_courses_metadata(self) -> list[dict[str, Any]]:
         """Get metadata for all courses in the vector store"""
-        import json
-
         try:
-            results = self.course_catalog.get()
-            if results and "metadatas" in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results["metadatas"]:
-                    course_meta = metadata.copy()
-                    if "lessons_json" in course_meta:
-                        course_meta["lessons"] = json.loads(course_meta["lessons_json"])
-                        del course_meta[
-                            "lessons_json"
-                        ]  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
+            return [
+                {
+                    "title": course.title,
+                    "instructor": course.instructor,
+                    "course_link": course.course_link,
+                    "lesson_count": len(course.lessons),
+                    "lessons": [
+                        {
+                            "lesson_number": lesson.lesson_number,
+                            "lesson_title": lesson.title,
+                            "lesson_link": lesson.lesson_link,
+                        }
+                        for lesson in course.lessons
+                    ],
+                }
+                for course in self._get_catalog().courses.values()
+            ]
         except Exception as e:
             print(f"Error getting courses metadata: {e}")
             return []
 
     def get_course_link(self, course_title: str) -> str | None:
         """Get course link for a given course title"""
-        try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                return metadata.get("course_link")
-            return None
-        except Exception as e:
-            print(f"Error getting course link: {e}")
-            return None
+        course = self.get_course(course_title)
+        return course.course_link if course else None
 
     def get_lesson_link(self, course_title: str, lesson_number: int) -> str | None:
         """Get lesson link for a given course title and lesson number"""
-        import json
-
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                lessons_json = metadata.get("lessons_json")
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get("lesson_number") == lesson_number:
-                            return lesson.get("lesson_link")
-            return None
+            return self._get_catalog().lesson_links.get((course_title, lesson_number))
         except Exception as e:
             print(f"Error getting lesson link: {e}")
+            return None
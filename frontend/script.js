@@ -76,7 +76,7 @@ async function sendMessage() {
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
     try {
-        const response = await fetch(`${API_URL}/query`, {
+        const response = await fetch(`${API_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -87,18 +87,41 @@ async function sendMessage() {
             })
         });
 
-        if (!response.ok) throw new Error('Query failed');
+        if (!response.ok || !response.body) throw new Error('Query failed');
 
-        const data = await response.json();
-        
-        // Update session ID if new
-        if (!currentSessionId) {
-            currentSessionId = data.session_id;
-        }
+        // The assistant message replaces the loading indicator on the first event
+        let messageDiv = null;
+        let answer = '';
+        const showMessage = () => {
+            if (!messageDiv) {
+                loadingMessage.remove();
+                messageDiv = createStreamingMessage();
+            }
+            return messageDiv;
+        };
 
-        // Replace loading message with response
-        loadingMessage.remove();
-        addMessage(data.answer, 'assistant', data.sources);
+        await readEventStream(response, (event, data) => {
+            if (event === 'session') {
+                // Update session ID if new
+                if (!currentSessionId) {
+                    currentSessionId = data.session_id;
+                }
+            } else if (event === 'sources') {
+                // Text streamed before a search is not part of the answer
+                answer = '';
+                updateStreamingMessage(showMessage(), answer);
+                setMessageSources(messageDiv, data.sources);
+            } else if (event === 'token') {
+                answer += data.text;
+                updateStreamingMessage(showMessage(), answer);
+            } else if (event === 'done') {
+                console.log(`First token after ${data.ttft_ms} ms, answer complete after ${data.total_ms} ms`);
+            } else if (event === 'error') {
+                throw new Error(data.detail || 'Query failed');
+            }
+        });
+
+        showMessage();
 
     } catch (error) {
         // Replace loading message with error
@@ -111,6 +134,57 @@ async function sendMessage() {
     }
 }
 
+// Read a server-sent event stream, calling onEvent(event, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line; keep any partial event buffered
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
+function createStreamingMessage() {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = 'message assistant';
+    messageDiv.id = `message-${Date.now()}`;
+    messageDiv.innerHTML = '<div class="message-content"></div>';
+    chatMessages.appendChild(messageDiv);
+    return messageDiv;
+}
+
+function updateStreamingMessage(messageDiv, content) {
+    messageDiv.querySelector('.message-content').innerHTML = marked.parse(content);
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+}
+
+function setMessageSources(messageDiv, sources) {
+    const existing = messageDiv.querySelector('.sources-collapsible');
+    if (existing) existing.remove();
+    messageDiv.insertAdjacentHTML('beforeend', renderSources(sources));
+}
+
 function createLoadingMessage() {
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message assistant';
@@ -137,31 +211,7 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     
     let html = `<div class="message-content">${displayContent}</div>`;
     
-    if (sources && sources.length > 0) {
-        // Handle both old format (strings) and new format (objects with text/link)
-        const sourcesHtml = sources.map(source => {
-            if (typeof source === 'string') {
-                // Old format - just display as text
-                return escapeHtml(source);
-            } else if (source && source.text) {
-                // New format - create clickable link if link is available
-                if (source.link) {
-                    return `<a href="${escapeHtml(source.link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(source.text)}</a>`;
-                } else {
-                    // No link available, display as text
-                    return escapeHtml(source.text);
-                }
-            }
-            return '';
-        }).filter(Boolean).join(', ');
-        
-        html += `
-            <details class="sources-collapsible">
-                <summary class="sources-header">Sources</summary>
-                <div class="sources-content">${sourcesHtml}</div>
-            </details>
-        `;
-    }
+    html += renderSources(sources);
     
     messageDiv.innerHTML = html;
     chatMessages.appendChild(messageDiv);
@@ -170,6 +220,35 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     return messageId;
 }
 
+// Build the collapsible sources block, or an empty string without sources
+function renderSources(sources) {
+    if (!sources || sources.length === 0) return '';
+
+    // Handle both old format (strings) and new format (objects with text/link)
+    const sourcesHtml = sources.map(source => {
+        if (typeof source === 'string') {
+            // Old format - just display as text
+            return escapeHtml(source);
+        } else if (source && source.text) {
+            // New format - create clickable link if link is available
+            if (source.link) {
+                return `<a href="${escapeHtml(source.link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(source.text)}</a>`;
+            } else {
+                // No link available, display as text
+                return escapeHtml(source.text);
+            }
+        }
+        return '';
+    }).filter(Boolean).join(', ');
+
+    return `
+        <details class="sources-collapsible">
+            <summary class="sources-header">Sources</summary>
+            <div class="sources-content">${sourcesHtml}</div>
+        </details>
+    `;
+}
+
 // Helper function to escape HTML for user messages
 function escapeHtml(text) {
     const div = document.createElement('div');